@@ -19,6 +19,13 @@ class IssueGet(BaseModel):
     title: str | None
     author: dict[str, object] | None
     not_found: bool = False
+    error: dict[str, object] | None = None
+
+
+class IssueGetBatch(BaseModel):
+    repo: str
+    items: list[IssueGet]
+    count: int
 
 
 class CommentResult(BaseModel):
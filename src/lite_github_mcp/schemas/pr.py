@@ -19,6 +19,13 @@ class PRGet(BaseModel):
     title: str | None
     author: dict[str, object] | None
     not_found: bool = False
+    error: dict[str, object] | None = None
+
+
+class PRGetBatch(BaseModel):
+    repo: str
+    items: list[PRGet]
+    count: int
 
 
 class PRTimeline(BaseModel):
@@ -15,6 +15,8 @@ class BranchList(BaseModel):
 class TreeEntry(BaseModel):
     path: str
     blob_sha: str
+    mode: str | None = None
+    size: int | None = None
 
 
 class TreeList(BaseModel):
@@ -2,12 +2,14 @@ from fastmcp.server.server import FastMCP
 
 from lite_github_mcp import __version__ as pkg_version
 from lite_github_mcp.tools.router import register_tools
+from lite_github_mcp.utils.metrics import start_metrics_export
 
 app = FastMCP(name="lite-github-mcp", version=pkg_version)
 register_tools(app)
 
 
 def main() -> None:
+    start_metrics_export()
     app.run()
 
 
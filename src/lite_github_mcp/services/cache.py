@@ -1,38 +1,144 @@
 from __future__ import annotations
 
 import json
+import math
 import os
-from dataclasses import dataclass
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import Any
 
-if TYPE_CHECKING:  # mypy: avoid importing third-party lib without stubs
-    _diskcache: Any = None
-else:
-    try:
-        import diskcache as _diskcache
-    except Exception as exc:  # pragma: no cover - import error surfaced at runtime
-        raise RuntimeError(
-            "diskcache is required for caching; add it to runtime dependencies"
-        ) from exc
-
-
-# TTLs by category (seconds)
-_TTLS: dict[str, int] = {
-    "lists": 30,
-    "meta": 300,
-    "blobs": 3600,
+from lite_github_mcp.services.cache_backend import (
+    BackendFactory,
+    CacheBackend,
+    CacheBackendError,
+    _env_float,
+    backends_from_env,
+)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """How long a category's entries are served, and what happens once they go stale.
+
+    Within ``fresh`` seconds an entry is served as is. After that it is kept until
+    ``retain`` seconds: with ``background`` set, the stale value is served at once
+    while a refresh (revalidating with the stored ETag) runs behind it; otherwise the
+    caller revalidates before answering.
+
+    With ``min_fresh`` and ``max_fresh`` set, ``fresh`` is only the starting point:
+    each resource's window moves between those bounds with how often it changes
+    (see ``ChurnTracker``).
+    """
+
+    fresh: int
+    retain: int
+    background: bool = True
+    min_fresh: int | None = None
+    max_fresh: int | None = None
+
+
+# Policies by category (seconds)
+_TTLS: dict[str, CachePolicy] = {
+    "lists": CachePolicy(fresh=30, retain=600, min_fresh=10, max_fresh=300),
+    "meta": CachePolicy(fresh=300, retain=3600, min_fresh=60, max_fresh=1800),
+    "blobs": CachePolicy(fresh=3600, retain=3600, background=False),
 }
 
 
+def policy_for_category(category: str) -> CachePolicy:
+    return _TTLS.get(category) or CachePolicy(fresh=300, retain=300, background=False)
+
+
 def ttl_for_category(category: str, default: int | None = None) -> int:
     if category in _TTLS:
-        return _TTLS[category]
+        return _TTLS[category].fresh
     if default is not None:
         return default
     return 300
 
 
+# Weight of the latest revalidation in a resource's change ratio
+_CHURN_ALPHA = 0.3
+# Resources whose change ratio is remembered (least recently revalidated dropped first)
+_CHURN_MAX_RESOURCES = 4096
+
+
+def _adaptive(policy: CachePolicy) -> bool:
+    return (
+        policy.min_fresh is not None
+        and policy.max_fresh is not None
+        and policy.max_fresh > policy.min_fresh > 0
+        and os.environ.get("LGMCP_ADAPTIVE_TTL", "1") in {"1", "true", "TRUE", "yes"}
+    )
+
+
+def _bounds(policy: CachePolicy) -> tuple[float, float]:
+    return float(policy.min_fresh or 1), float(policy.max_fresh or 1)
+
+
+def _initial_ratio(policy: CachePolicy) -> float:
+    # The ratio at which the policy's own ``fresh`` comes out, so learning starts there
+    low, high = _bounds(policy)
+    fresh = min(max(float(policy.fresh), low), high)
+    return 1.0 - math.log(fresh / low) / math.log(high / low)
+
+
+class ChurnTracker:
+    """Learns how often each resource changes from its ETag revalidations.
+
+    A 200 with a new ETag counts as a change, a 304 as none. The exponentially
+    weighted change ratio maps geometrically onto the policy's bounds: a resource
+    that never changes stays fresh for ``max_fresh``, one that changes at every
+    check for ``min_fresh``. Resources are whatever key the caller picks.
+    """
+
+    def __init__(
+        self, alpha: float = _CHURN_ALPHA, max_resources: int = _CHURN_MAX_RESOURCES
+    ) -> None:
+        self.alpha = alpha
+        self.max_resources = max_resources
+        self._ratios: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def observe(self, resource: str, policy: CachePolicy, changed: bool) -> None:
+        if not _adaptive(policy):
+            return
+        with self._lock:
+            ratio = self._ratios.pop(resource, None)
+            if ratio is None:
+                ratio = _initial_ratio(policy)
+            ratio += self.alpha * ((1.0 if changed else 0.0) - ratio)
+            self._ratios[resource] = ratio
+            while len(self._ratios) > self.max_resources:
+                self._ratios.popitem(last=False)
+
+    def fresh_for(self, resource: str, policy: CachePolicy) -> int:
+        """Fresh window for ``resource`` under ``policy``, in whole seconds."""
+        if not _adaptive(policy):
+            return policy.fresh
+        with self._lock:
+            ratio = self._ratios.get(resource)
+        if ratio is None:
+            return policy.fresh
+        low, high = _bounds(policy)
+        return round(low * math.pow(high / low, 1.0 - ratio))
+
+
+_GLOBAL_CHURN: ChurnTracker | None = None
+
+
+def get_churn_tracker() -> ChurnTracker:
+    global _GLOBAL_CHURN
+    if _GLOBAL_CHURN is None:
+        _GLOBAL_CHURN = ChurnTracker()
+    return _GLOBAL_CHURN
+
+
 def _default_cache_dir() -> Path:
     # Respect XDG on *nix; fallback to ~/.cache
     xdg = os.environ.get("XDG_CACHE_HOME")
@@ -43,51 +149,376 @@ def _default_cache_dir() -> Path:
     return base / "lite_github_mcp"
 
 
+_RECORD_VERSION = 1
+
+
+@dataclass(frozen=True)
+class CacheRecord:
+    """A cached value with the ETag that validates it and its lifetimes (epoch seconds)."""
+
+    value: Any
+    etag: str | None
+    fresh_until: float | None  # None: never goes stale
+    evict_after: float | None  # None: kept until evicted for space
+    meta: dict[str, Any] = field(default_factory=dict)
+
+    def is_fresh(self) -> bool:
+        return self.fresh_until is None or time.time() < self.fresh_until
+
+
+# Size budgets: the total disk budget and each category's share of it (bytes). Entries
+# stored without a category count against "other"
+_DEFAULT_SIZE_LIMIT = 1024 * 1024 * 1024
+_SIZE_SHARES = {"lists": 0.25, "meta": 0.15, "blobs": 0.5, "other": 0.1}
+# Encoded records at least this large are stored zlib-compressed
+_COMPRESS_MIN_BYTES = 2048
+
+
+def _decode_text(raw: Any) -> str | None:
+    if isinstance(raw, bytes):
+        try:
+            return zlib.decompress(raw).decode("utf-8")
+        except (zlib.error, UnicodeDecodeError):
+            return None
+    return raw if isinstance(raw, str) else None
+
+
+def _record_from_text(raw: str | None) -> CacheRecord | None:
+    if raw is None:
+        return None
+    try:
+        doc = json.loads(raw)
+    except ValueError:
+        return None
+    # Entries written in another layout read as misses and are simply refetched
+    if not isinstance(doc, dict) or doc.get("v") != _RECORD_VERSION:
+        return None
+    return CacheRecord(
+        value=doc.get("value"),
+        etag=doc.get("etag"),
+        fresh_until=doc.get("fresh_until"),
+        evict_after=doc.get("evict_after"),
+        meta=doc.get("meta") or {},
+    )
+
+
+_L1_MAX_ENTRIES = 4096
+_L1_MAX_BYTES = 64 * 1024 * 1024
+# Over a shared backend, another worker's invalidation only reaches its own memory tier:
+# entries here are then served for at most this long before being read again
+_L1_SHARED_MAX_AGE_SECONDS = 5.0
+
+
+class _MemoryTier:
+    """LRU of decoded records, bounded by entry count and by encoded size in bytes.
+
+    With ``max_age`` set, an entry is also dropped that many seconds after it was put.
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, max_age: float | None = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.bytes = 0
+        # key -> (record, encoded size, tag, time put)
+        self._entries: OrderedDict[str, tuple[CacheRecord, int, str | None, float]] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> CacheRecord | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            record, _size, _tag, put_at = entry
+            # Same expiry as the disk tier: gone once past evict_after
+            expired = record.evict_after is not None and time.time() >= record.evict_after
+            if expired or (self.max_age is not None and time.monotonic() - put_at >= self.max_age):
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return record
+
+    def put(self, key: str, record: CacheRecord, size: int, tag: str | None) -> None:
+        with self._lock:
+            self._remove(key)
+            if size > self.max_bytes or self.max_age == 0:
+                return
+            self._entries[key] = (record, size, tag, time.monotonic())
+            self.bytes += size
+            if tag is not None:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def discard_tag(self, tag: str) -> None:
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def discard_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        _record, size, tag, _put_at = entry
+        self.bytes -= size
+        if tag is not None:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def _category_limits(total: int, overrides: dict[str, int] | None) -> dict[str, int]:
+    limits = {name: int(total * share) for name, share in _SIZE_SHARES.items()}
+    for name in limits:
+        limits[name] = _env_int(f"LGMCP_CACHE_SIZE_LIMIT_{name.upper()}", limits[name])
+    limits.update(overrides or {})
+    return limits
+
+
 @dataclass
 class CacheStore:
+    """Two-tier cache: an in-process LRU of decoded records over ``diskcache``.
+
+    Both tiers hold the same records, so freshness, expiry and invalidation behave
+    identically whichever tier answers. The memory tier is private to this process, so
+    over a shared backend (Redis, or the cache directory) its entries are only served for
+    ``l1_max_age`` seconds (``LGMCP_CACHE_L1_SHARED_MAX_AGE``, default 5; 0 turns the
+    tier off): an invalidation made by another worker then takes effect here within
+    that bound.
+
+    Below that, each category (lists, meta, blobs; anything else is "other") has its
+    own backend and size limit, so a flood of one kind of entry only evicts its own
+    kind. Large records are compressed. The backend defaults to ``diskcache`` under
+    ``path`` (``LGMCP_CACHE_SHARDS`` splits it into independent databases); ``backend``
+    or ``LGMCP_CACHE_BACKEND=redis`` plugs in another, e.g. one shared between hosts.
+    """
+
     path: Path
+    l1_max_entries: int | None = None
+    l1_max_bytes: int | None = None
+    size_limit: int | None = None
+    category_limits: dict[str, int] | None = None
+    eviction_policy: str | None = None  # "lru" or "lfu"
+    compress_min_bytes: int | None = None
+    backend: BackendFactory | None = None
+    l1_max_age: float | None = None
 
     def __post_init__(self) -> None:
-        # Annotate as Any to avoid missing type info
-        self._cache: Any = _diskcache.Cache(str(self.path))
+        total = self.size_limit or _env_int("LGMCP_CACHE_SIZE_LIMIT", _DEFAULT_SIZE_LIMIT)
+        self._limits = _category_limits(total, self.category_limits)
+        policy = self.eviction_policy or os.environ.get("LGMCP_CACHE_EVICTION") or "lru"
+        self._compress_min = self.compress_min_bytes or _env_int(
+            "LGMCP_CACHE_COMPRESS_MIN", _COMPRESS_MIN_BYTES
+        )
+        open_backend = self.backend or backends_from_env(self.path, policy)
+        self._shards: dict[str, CacheBackend] = {
+            name: open_backend(name, limit) for name, limit in self._limits.items()
+        }
+        self._cache = self._shards["other"]
+        max_age = self.l1_max_age
+        if max_age is None and any(shard.shared for shard in self._shards.values()):
+            max_age = _env_float("LGMCP_CACHE_L1_SHARED_MAX_AGE", _L1_SHARED_MAX_AGE_SECONDS)
+        self._l1 = _MemoryTier(
+            self.l1_max_entries or _env_int("LGMCP_CACHE_L1_ENTRIES", _L1_MAX_ENTRIES),
+            self.l1_max_bytes or _env_int("LGMCP_CACHE_L1_BYTES", _L1_MAX_BYTES),
+            max_age,
+        )
+        self._hits = {"l1": 0, "l2": 0, "miss": 0}
+        self._evictions = dict.fromkeys(self._shards, 0)
+        self._dropped_writes = 0
+        self._failed_culls = 0
+        self._failed_invalidations = 0
+        self._compression = {"entries": 0, "raw_bytes": 0, "stored_bytes": 0}
 
-    # JSON helpers
-    def get_json(self, key: str) -> Any | None:
-        raw = self._cache.get(key)
-        if raw is None:
-            return None
+    def _shard(self, category: str | None) -> CacheBackend:
+        return self._shards.get(category or "other", self._cache)
+
+    def _encode(self, text: str) -> str | bytes:
+        if len(text) < self._compress_min:
+            return text
+        raw = text.encode("utf-8")
+        packed = zlib.compress(raw)
+        if len(packed) >= len(raw):
+            return text
+        self._compression["entries"] += 1
+        self._compression["raw_bytes"] += len(raw)
+        self._compression["stored_bytes"] += len(packed)
+        return packed
+
+    def _enforce_limit(self, name: str) -> None:
         try:
-            return json.loads(raw)
-        except Exception:
+            self._evictions[name] += self._shards[name].cull(self._limits[name])
+        except CacheBackendError:
+            self._failed_culls += 1
+
+    # Records: a value with its validator and lifetimes, stored as one JSON document so
+    # that a reader never sees a body from one response and an ETag from another
+    def get_record(self, key: str, category: str | None = None) -> CacheRecord | None:
+        record = self._l1.get(key)
+        if record is not None:
+            self._hits["l1"] += 1
+            return record
+        stored, tag = self._shard(category).get(key)
+        text = _decode_text(stored)
+        record = _record_from_text(text)
+        if text is None or record is None:
+            self._hits["miss"] += 1
             return None
+        self._hits["l2"] += 1
+        # Carry the disk tag along so invalidate_tag reaches the promoted copy too
+        self._l1.put(key, record, len(text), tag)
+        return record
 
-    def set_json(self, key: str, value: Any, ttl_seconds: int) -> None:
-        text = json.dumps(value, separators=(",", ":"))
-        self._cache.set(key, text, expire=ttl_seconds)
+    def put_record(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int | None,
+        retain_seconds: int | None = None,
+        *,
+        etag: str | None = None,
+        meta: dict[str, Any] | None = None,
+        tag: str | None = None,
+        category: str | None = None,
+    ) -> CacheRecord:
+        """Store ``value``: fresh for ``ttl_seconds``, then kept stale until ``retain_seconds``.
 
-    # ETag helpers
-    def get_etag(self, etag_key: str) -> str | None:
-        val = self._cache.get(etag_key)
-        return str(val) if val else None
+        ``ttl_seconds=None`` keeps the entry until evicted (immutable content). ``tag``
+        names the namespace the entry belongs to, for ``invalidate_tag``; ``category``
+        picks the size budget it counts against (read it back with the same category).
+        """
+        now = time.time()
+        fresh_until = None if ttl_seconds is None else now + ttl_seconds
+        expire = None if ttl_seconds is None else max(ttl_seconds, retain_seconds or 0)
+        record = CacheRecord(
+            value=value,
+            etag=etag,
+            fresh_until=fresh_until,
+            evict_after=None if expire is None else now + expire,
+            meta=meta or {},
+        )
+        doc = {
+            "v": _RECORD_VERSION,
+            "value": value,
+            "etag": etag,
+            "fresh_until": record.fresh_until,
+            "evict_after": record.evict_after,
+            "meta": record.meta,
+        }
+        text = json.dumps(doc, separators=(",", ":"))
+        name = category if category in self._shards else "other"
+        if self._shards[name].set(key, self._encode(text), expire=expire, tag=tag):
+            self._enforce_limit(name)
+        else:
+            # The backend was too busy; the entry is simply fetched again next time
+            self._dropped_writes += 1
+        # The memory tier holds what the disk tier would decode, never the caller's object
+        stored = _record_from_text(text)
+        if stored is not None:
+            self._l1.put(key, stored, len(text), tag)
+        return stored or record
+
+    # JSON helpers
+    def get_json(self, key: str, category: str | None = None) -> Any | None:
+        """Return the value stored under ``key`` while it is fresh, else None."""
+        record = self.get_record(key, category)
+        return record.value if record is not None and record.is_fresh() else None
 
-    def set_etag(self, etag_key: str, etag: str) -> None:
-        # Do not expire ETag explicitly; content TTL governs freshness
-        self._cache.set(etag_key, etag)
+    def get_json_entry(self, key: str, category: str | None = None) -> tuple[Any, bool] | None:
+        """Return ``(value, fresh)`` for a retained entry, stale or not."""
+        record = self.get_record(key, category)
+        return None if record is None else (record.value, record.is_fresh())
+
+    def set_json(
+        self,
+        key: str,
+        value: Any,
+        ttl_seconds: int | None,
+        retain_seconds: int | None = None,
+        *,
+        tag: str | None = None,
+        category: str | None = None,
+    ) -> None:
+        self.put_record(key, value, ttl_seconds, retain_seconds, tag=tag, category=category)
 
     # Invalidation helpers
+    def invalidate_tag(self, tag: str) -> int:
+        """Drop every entry stored with ``tag``; cost grows with the matches only."""
+        self._l1.discard_tag(tag)
+        return self._remove_from_shards(lambda shard: shard.evict(tag))
+
     def invalidate_prefix(self, prefix: str) -> int:
+        # Scans every key; prefer tagging entries and invalidate_tag on hot paths
+        self._l1.discard_prefix(prefix)
+        return self._remove_from_shards(lambda shard: shard.delete_prefix(prefix))
+
+    def _remove_from_shards(self, remove: Callable[[CacheBackend], int]) -> int:
         removed = 0
-        # iterkeys yields live view; copy to list first
-        for key in list(self._cache.iterkeys()):
-            key_str = str(key)
-            if key_str.startswith(prefix):
-                try:
-                    del self._cache[key]
-                    removed += 1
-                except Exception:
-                    continue
+        for shard in self._shards.values():
+            try:
+                removed += remove(shard)
+            except CacheBackendError:
+                # Invalidation follows a write that already succeeded: it must not fail
+                # the caller. The entries then live out their TTL; stats() counts these.
+                self._failed_invalidations += 1
         return removed
 
+    def stats(self) -> dict[str, Any]:
+        """Lookup counts and hit ratio per tier (the disk ratio is over L1 misses), plus
+        disk usage, evictions per category and the compression ratio of packed records."""
+        l1, l2, miss = self._hits["l1"], self._hits["l2"], self._hits["miss"]
+        lookups = l1 + l2 + miss
+        packed = self._compression
+        return {
+            "lookups": lookups,
+            "l1": {
+                "hits": l1,
+                "hit_ratio": round(l1 / lookups, 3) if lookups else None,
+                "entries": len(self._l1),
+                "bytes": self._l1.bytes,
+            },
+            "l2": {
+                "hits": l2,
+                "hit_ratio": round(l2 / (l2 + miss), 3) if l2 + miss else None,
+                "categories": {
+                    name: {
+                        "bytes": shard.volume(),
+                        "limit": self._limits[name],
+                        "evictions": self._evictions[name],
+                    }
+                    for name, shard in self._shards.items()
+                },
+                "dropped_writes": self._dropped_writes,
+                "failed_culls": self._failed_culls,
+                "failed_invalidations": self._failed_invalidations,
+                "compressed": packed["entries"],
+                "compression_ratio": (
+                    round(packed["raw_bytes"] / packed["stored_bytes"], 2)
+                    if packed["stored_bytes"]
+                    else None
+                ),
+            },
+        }
+
 
 _GLOBAL_CACHE: CacheStore | None = None
 
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import os
+import re
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol
+
+if TYPE_CHECKING:  # mypy: avoid importing third-party lib without stubs
+    _diskcache: Any = None
+else:
+    try:
+        import diskcache as _diskcache
+    except Exception as exc:  # pragma: no cover - import error surfaced at runtime
+        raise RuntimeError(
+            "diskcache is required for caching; add it to runtime dependencies"
+        ) from exc
+
+_EVICTION_POLICIES = {"lru": "least-recently-used", "lfu": "least-frequently-used"}
+# How long a write waits for a busy shard before it is dropped (a cache write is optional)
+_WRITE_TIMEOUT_SECONDS = 0.1
+# How long an invalidation keeps retrying a busy shard before giving up
+_MAINTENANCE_SECONDS = 2.0
+
+
+class CacheBackendError(Exception):
+    """An eviction or delete could not be completed (backend busy or unreachable)."""
+
+
+class CacheBackend(Protocol):
+    """Where ``CacheStore`` keeps encoded records (text, or compressed bytes)."""
+
+    # True when other processes or hosts write to the same store
+    shared: bool
+
+    def get(self, key: str) -> tuple[str | bytes | None, str | None]:
+        """Return ``(value, tag)``; ``(None, None)`` when missing or unreachable."""
+        ...
+
+    def set(
+        self, key: str, value: str | bytes, expire: float | None = None, tag: str | None = None
+    ) -> bool:
+        """Store ``value`` for ``expire`` seconds (None: no expiry); False if dropped."""
+        ...
+
+    def evict(self, tag: str) -> int:
+        """Remove entries stored with ``tag``; raises ``CacheBackendError`` on failure."""
+        ...
+
+    def delete_prefix(self, prefix: str) -> int:
+        """Remove entries whose key starts with ``prefix``; may raise ``CacheBackendError``."""
+        ...
+
+    def volume(self) -> int | None:
+        """Bytes used, or None when the backend does not track its size."""
+        ...
+
+    def cull(self, limit: int) -> int:
+        """Evict until at most ``limit`` bytes are used; return the number evicted.
+
+        Raises ``CacheBackendError`` when the backend is too busy to evict right now.
+        """
+        ...
+
+
+# Opens the backend for one category with its size limit (bytes)
+BackendFactory = Callable[[str, int], CacheBackend]
+
+
+class DiskBackend:
+    """``diskcache`` on local disk, optionally split into ``shards`` SQLite databases.
+
+    With more than one shard, keys are spread over independent databases (diskcache
+    ``FanoutCache``), so processes sharing the directory rarely wait on the same writer
+    lock. A write that cannot get its lock within ``timeout`` seconds is dropped;
+    invalidations retry for up to ``_MAINTENANCE_SECONDS`` instead, since dropping one
+    would leave stale entries behind.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        size_limit: int,
+        eviction_policy: str = "lru",
+        shards: int = 1,
+        timeout: float = _WRITE_TIMEOUT_SECONDS,
+    ) -> None:
+        settings: dict[str, Any] = {
+            # tag_index: evicting a tag is an indexed lookup instead of a table scan
+            "tag_index": True,
+            "size_limit": size_limit,
+            # cull_limit=0: CacheStore culls explicitly, so evictions can be counted
+            "cull_limit": 0,
+            "eviction_policy": _EVICTION_POLICIES.get(eviction_policy, "least-recently-used"),
+        }
+        if shards > 1:
+            self._cache: Any = _diskcache.FanoutCache(
+                str(directory), shards=shards, timeout=timeout, **settings
+            )
+        else:
+            self._cache = _diskcache.Cache(str(directory), timeout=timeout, **settings)
+        # Worker processes may open the same directory whether or not it is sharded
+        self.shared = True
+
+    def get(self, key: str) -> tuple[str | bytes | None, str | None]:
+        try:
+            found = self._cache.get(key, default=None, tag=True)
+        except _diskcache.Timeout:
+            return None, None
+        # FanoutCache answers a timed-out read with the bare default
+        return found if isinstance(found, tuple) else (None, None)
+
+    def set(
+        self, key: str, value: str | bytes, expire: float | None = None, tag: str | None = None
+    ) -> bool:
+        try:
+            return bool(self._cache.set(key, value, expire=expire, tag=tag))
+        except _diskcache.Timeout:
+            return False
+
+    def _retrying(self, op: Callable[..., Any], *args: Any) -> Any:
+        deadline = time.monotonic() + _MAINTENANCE_SECONDS
+        while True:
+            try:
+                return op(*args)
+            except _diskcache.Timeout as exc:
+                if time.monotonic() >= deadline:
+                    raise CacheBackendError("cache shard stayed busy") from exc
+
+    def evict(self, tag: str) -> int:
+        return int(self._retrying(self._cache.evict, tag))
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        # Iteration yields a live view; copy to a list first
+        for key in list(self._cache):
+            if str(key).startswith(prefix) and self._retrying(self._cache.delete, key):
+                removed += 1
+        return removed
+
+    def volume(self) -> int:
+        return int(self._cache.volume())
+
+    def cull(self, limit: int) -> int:
+        if self._cache.volume() <= limit:
+            return 0
+        try:
+            # Expired entries go first without counting as evictions
+            self._cache.expire()
+            return int(self._cache.cull())
+        except _diskcache.Timeout as exc:
+            # Culling runs on the write path: never wait for a busy shard, try next write
+            raise CacheBackendError("cache shard busy; cull skipped") from exc
+
+
+# Adds a member to a tag set whose lifetime must cover its longest-lived entry: ARGV[2]
+# is that entry's lifetime in ms (-1: no expiry). Plain commands so Redis 6 runs it too
+# (PEXPIRE NX/GT needs Redis 7).
+_ADD_TO_TAG = """
+local existed = redis.call('EXISTS', KEYS[1])
+local old = redis.call('PTTL', KEYS[1])
+redis.call('SADD', KEYS[1], ARGV[1])
+local ms = tonumber(ARGV[2])
+if ms < 0 then
+    redis.call('PERSIST', KEYS[1])
+elseif existed == 0 or (old >= 0 and old < ms) then
+    redis.call('PEXPIRE', KEYS[1], ms)
+end
+return 1
+"""
+
+
+def _glob_escape(text: str) -> str:
+    return re.sub(r"([*?\[\]\\])", r"\\\1", text)
+
+
+class RedisBackend:
+    """Records in Redis, so workers on different hosts share hits.
+
+    Takes a ``redis.Redis`` client (or anything with its API). Sizes and eviction are
+    left to the server's ``maxmemory`` policy; ``volume`` is not tracked. Works with
+    Redis 6 and later.
+    """
+
+    def __init__(self, client: Any, namespace: str) -> None:
+        self._redis = client
+        self._ns = namespace
+        self.shared = True
+        self._errors = _redis_errors()
+
+    def _key(self, key: str) -> str:
+        return f"{self._ns}:v:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._ns}:t:{tag}"
+
+    def get(self, key: str) -> tuple[str | bytes | None, str | None]:
+        try:
+            value, kind, tag = self._redis.hmget(self._key(key), "value", "kind", "tag")
+        except self._errors:
+            # An unreachable cache is a miss, not a failed tool call
+            return None, None
+        if value is None:
+            return None, None
+        stored: str | bytes = value if kind == b"bytes" else value.decode("utf-8")
+        return stored, tag.decode("utf-8") if tag else None
+
+    def set(
+        self, key: str, value: str | bytes, expire: float | None = None, tag: str | None = None
+    ) -> bool:
+        name = self._key(key)
+        fields = {"value": value, "kind": "bytes" if isinstance(value, bytes) else "text"}
+        pipe = self._redis.pipeline()
+        pipe.delete(name)
+        pipe.hset(name, mapping={**fields, **({"tag": tag} if tag else {})})
+        if expire is not None:
+            pipe.pexpire(name, max(1, int(expire * 1000)))
+        if tag:
+            ms = -1 if expire is None else max(1, int(expire * 1000))
+            pipe.eval(_ADD_TO_TAG, 1, self._tag_key(tag), key, ms)
+        try:
+            pipe.execute()
+        except self._errors:
+            return False
+        return True
+
+    def evict(self, tag: str) -> int:
+        tag_key = self._tag_key(tag)
+        try:
+            members = self._redis.smembers(tag_key)
+            removed = 0
+            if members:
+                names = (self._key(m.decode("utf-8")) for m in members)
+                removed = int(self._redis.delete(*names))
+            self._redis.delete(tag_key)
+        except self._errors as exc:
+            raise CacheBackendError(f"redis evict failed: {exc}") from exc
+        return removed
+
+    def delete_prefix(self, prefix: str) -> int:
+        removed = 0
+        try:
+            names = list(self._redis.scan_iter(match=self._key(_glob_escape(prefix)) + "*"))
+            for i in range(0, len(names), 500):
+                removed += int(self._redis.delete(*names[i : i + 500]))
+        except self._errors as exc:
+            raise CacheBackendError(f"redis delete failed: {exc}") from exc
+        return removed
+
+    def volume(self) -> int | None:
+        return None
+
+    def cull(self, limit: int) -> int:
+        return 0
+
+
+def _redis_errors() -> tuple[type[Exception], ...]:
+    try:
+        from redis.exceptions import RedisError
+    except ImportError:
+        return (OSError,)
+    return (RedisError, OSError)
+
+
+def _redis_client(url: str) -> Any:
+    try:
+        import redis
+    except ImportError as exc:  # pragma: no cover - depends on the environment
+        raise RuntimeError(
+            "the redis cache backend needs the redis package; install the redis extra"
+        ) from exc
+    return redis.Redis.from_url(url)
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name) or default)
+    except ValueError:
+        return default
+
+
+def disk_backends(
+    root: Path,
+    *,
+    eviction_policy: str = "lru",
+    shards: int = 1,
+    timeout: float = _WRITE_TIMEOUT_SECONDS,
+) -> BackendFactory:
+    """One ``DiskBackend`` per category: "other" at ``root``, the rest in subdirectories."""
+
+    def open_backend(category: str, size_limit: int) -> CacheBackend:
+        return DiskBackend(
+            root if category == "other" else root / category,
+            size_limit=size_limit,
+            eviction_policy=eviction_policy,
+            shards=shards,
+            timeout=timeout,
+        )
+
+    return open_backend
+
+
+def redis_backends(client: Any, prefix: str = "lgmcp") -> BackendFactory:
+    """One ``RedisBackend`` per category, each in its own key namespace."""
+    return lambda category, _size_limit: RedisBackend(client, f"{prefix}:{category}")
+
+
+def backends_from_env(root: Path, eviction_policy: str) -> BackendFactory:
+    """Backend selected by ``LGMCP_CACHE_BACKEND`` (disk or redis)."""
+    if (os.environ.get("LGMCP_CACHE_BACKEND") or "disk").lower() == "redis":
+        url = os.environ.get("LGMCP_CACHE_URL") or "redis://localhost:6379/0"
+        return redis_backends(_redis_client(url))
+    try:
+        shards = max(1, int(os.environ.get("LGMCP_CACHE_SHARDS") or 1))
+    except ValueError:
+        shards = 1
+    timeout = _env_float("LGMCP_CACHE_WRITE_TIMEOUT", _WRITE_TIMEOUT_SECONDS)
+    return disk_backends(root, eviction_policy=eviction_policy, shards=shards, timeout=timeout)
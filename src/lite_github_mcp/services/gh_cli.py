@@ -1,13 +1,40 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
+import re
+import threading
 import time
-from typing import Any
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import httpx
 
 from lite_github_mcp.services.analytics import compute_tags
-from lite_github_mcp.services.cache import get_cache, ttl_for_category
-from lite_github_mcp.services.pager import decode_cursor, encode_cursor
-from lite_github_mcp.utils.subprocess import CommandResult, run_command
+from lite_github_mcp.services.cache import (
+    get_cache,
+    get_churn_tracker,
+    policy_for_category,
+    ttl_for_category,
+)
+from lite_github_mcp.services.http_client import ApiResponse, api_base_url, get_http_client
+from lite_github_mcp.services.pager import Page, decode_cursor, encode_cursor
+from lite_github_mcp.services.ratelimit import (
+    HIGH,
+    LOW,
+    get_rate_limiter,
+    request_priority,
+    resource_for_args,
+    resource_for_path,
+)
+from lite_github_mcp.services.singleflight import SingleFlight
+from lite_github_mcp.utils.errors import GH_ERROR, ErrorEnvelope
+from lite_github_mcp.utils.subprocess import CommandResult, run_command, run_command_async
+
+T = TypeVar("T")
 
 
 def gh_installed() -> bool:
@@ -22,23 +49,56 @@ def gh_auth_status() -> dict[str, Any]:
     except Exception:
         ver = CommandResult(args=("gh", "--version"), returncode=127, stdout="", stderr="")
     if ver.returncode != 0:
+        if get_http_client() is not None:
+            # No gh binary, but a token is available to the native transport
+            try:
+                me = run_gh_json(["api", "user"]) or {}
+            except RuntimeError as exc:
+                return {"ok": False, "error": str(exc), "code": "GH_NOT_AUTHED"}
+            identity = {"login": me.get("login"), "name": me.get("name")}
+            return {"ok": True, "user": identity, "scopes": [], "host": None}
         return {"ok": False, "error": "gh CLI not installed", "code": "GH_NOT_INSTALLED"}
 
     res = run_command(["gh", "auth", "status"])
+    user_json: Any = None
+    if res.returncode == 0:
+        # gh api to check current user and token scopes (best-effort)
+        try:
+            user_json = run_gh_json(["api", "user"])
+        except Exception:
+            user_json = None
+    return _auth_payload(res, user_json)
+
+
+async def gh_auth_status_async() -> dict[str, Any]:
+    """``gh_auth_status`` without blocking; the auth check and user lookup overlap."""
+    try:
+        ver = await run_command_async(["gh", "--version"])
+    except Exception:
+        ver = CommandResult(args=("gh", "--version"), returncode=127, stdout="", stderr="")
+    if ver.returncode != 0:
+        return await asyncio.to_thread(gh_auth_status)
+    status: CommandResult | BaseException
+    user_json: Any
+    status, user_json = await asyncio.gather(
+        run_command_async(["gh", "auth", "status"]),
+        run_gh_json_async(["api", "user"]),
+        return_exceptions=True,
+    )
+    if isinstance(status, BaseException):
+        status = CommandResult(args=("gh", "auth", "status"), returncode=1, stdout="", stderr="")
+    return _auth_payload(status, None if isinstance(user_json, BaseException) else user_json)
+
+
+def _auth_payload(res: CommandResult, me: Any) -> dict[str, Any]:
     ok = res.returncode == 0
     # Try to get user and scopes when authed; host is inferred from env or gh config
     user = None
     scopes: list[str] = []
     host = None
-    if ok:
-        # gh api to check current user and token scopes (best-effort)
-        try:
-            me = run_gh_json(["api", "user"])
-            if me and isinstance(me, dict):
-                user = {"login": me.get("login"), "name": me.get("name")}
-        except Exception:
-            user = None
-        # scopes are not directly exposed; leave empty unless GH_TOKEN env exposes it elsewhere
+    if ok and me and isinstance(me, dict):
+        user = {"login": me.get("login"), "name": me.get("name")}
+    # scopes are not directly exposed; leave empty unless GH_TOKEN env exposes it elsewhere
     payload: dict[str, Any] = {"ok": ok, "user": user, "scopes": scopes, "host": host}
     if not ok:
         payload.update(
@@ -54,8 +114,57 @@ def _run_gh(args: list[str]) -> CommandResult:
     return run_command(["gh", *args])
 
 
+def _run_gh_write(args: list[str]) -> CommandResult:
+    # User-initiated writes may spend the reserve that reads and background work leave
+    get_rate_limiter().acquire(resource_for_args(args), HIGH)
+    return _run_gh(args)
+
+
+def _parse_api_args(args: list[str]) -> tuple[str, list[str]] | None:
+    # `gh api <path> [-H header]...` maps onto a plain GET; anything else stays on gh
+    if len(args) < 2 or args[0] != "api" or args[1].startswith("-"):
+        return None
+    headers: list[str] = []
+    rest = args[2:]
+    while rest:
+        if rest[0] != "-H" or len(rest) < 2:
+            return None
+        headers.append(rest[1])
+        rest = rest[2:]
+    return args[1], headers
+
+
+# Concurrent identical reads (e.g. a cache stampede) share one upstream call
+_FLIGHTS = SingleFlight()
+
+
+def _flight_key(*parts: str) -> str:
+    return "\x00".join(parts)
+
+
 def run_gh_json(args: list[str]) -> Any:
-    res = _run_gh(args)
+    return _FLIGHTS.do(_flight_key("gh", *args), lambda: _run_gh_json(args))
+
+
+def _run_gh_json(args: list[str]) -> Any:
+    resource = resource_for_args(args)
+    get_rate_limiter().acquire(resource)
+    api = _parse_api_args(args)
+    client = get_http_client() if api is not None else None
+    if api is not None and client is not None:
+        try:
+            resp = client.request("GET", api[0], headers=_header_pairs(api[1]))
+        except httpx.TransportError:
+            resp = None
+        if resp is not None:
+            get_rate_limiter().update(resp.headers, resource)
+            if resp.status >= 400:
+                raise RuntimeError(_http_error_message(resp))
+            return resp.json()
+    return _gh_json_output(_run_gh(args))
+
+
+def _gh_json_output(res: CommandResult) -> Any:
     if res.returncode != 0:
         # Normalize gh errors into a standard exception with minimal message
         msg = res.stderr.strip() or "gh error"
@@ -66,6 +175,20 @@ def run_gh_json(args: list[str]) -> Any:
     return json.loads(text)
 
 
+async def _run_gh_async(args: list[str]) -> CommandResult:
+    return await run_command_async(["gh", *args])
+
+
+async def run_gh_json_async(args: list[str]) -> Any:
+    """``run_gh_json`` for the event loop; the HTTP transport runs in a worker thread."""
+    api = _parse_api_args(args)
+    if api is not None and get_http_client() is not None:
+        return await asyncio.to_thread(run_gh_json, args)
+    # acquire may sleep to pace calls; never on the event loop
+    await asyncio.to_thread(get_rate_limiter().acquire, resource_for_args(args))
+    return _gh_json_output(await _run_gh_async(args))
+
+
 # --- Cached GitHub REST helpers (via `gh api`) ---
 
 
@@ -96,66 +219,404 @@ def _split_headers_body(text: str) -> tuple[dict[str, str], str]:
     return headers, body
 
 
-def _api_get_json_cached(path: str, extra_headers: list[str] | None, category: str) -> Any:
-    cache = get_cache()
-    data_key = f"api:{path}"
-    etag_key = f"etag:{path}"
-    headers_args: list[str] = [
-        "-H",
-        "Accept: application/vnd.github+json",
-    ]
-    # Add If-None-Match when we have a stored etag
-    etag = cache.get_etag(etag_key)
-    if etag:
-        headers_args += ["-H", f"If-None-Match: {etag}"]
-    if extra_headers:
-        for h in extra_headers:
-            headers_args += ["-H", h]
+def _header_pairs(headers: list[str]) -> list[tuple[str, str]]:
+    pairs: list[tuple[str, str]] = []
+    for h in headers:
+        k, _, v = h.partition(":")
+        pairs.append((k.strip(), v.strip()))
+    return pairs
+
 
+def _http_error_message(resp: ApiResponse) -> str:
+    # Mirror gh's "<message> (HTTP <status>)" so callers see the same errors either way
+    message = ""
+    try:
+        body = resp.json()
+        if isinstance(body, dict):
+            message = str(body.get("message") or "")
+    except ValueError:
+        pass
+    return f"{message or 'HTTP error'} (HTTP {resp.status})"
+
+
+def _api_request(path: str, headers: list[str]) -> ApiResponse:
+    """GET ``path`` over the pooled HTTP client, falling back to ``gh api -i``.
+
+    Returns the status, lower-cased response headers and body either way. A non-zero
+    ``gh`` exit raises RuntimeError; native HTTP errors are returned for the caller.
+    Concurrent requests for the same path and headers share one round trip.
+    """
+    key = _flight_key("GET", path, *sorted(headers))
+    return _FLIGHTS.do(key, lambda: _api_request_once(path, headers))
+
+
+def _api_request_once(path: str, headers: list[str]) -> ApiResponse:
+    resource = resource_for_path(path)
+    limiter = get_rate_limiter()
+    limiter.acquire(resource)
+    client = get_http_client()
+    if client is not None:
+        try:
+            resp = client.request("GET", path, headers=_header_pairs(headers))
+            limiter.update(resp.headers, resource)
+            return resp
+        except httpx.TransportError:
+            pass
+    headers_args: list[str] = []
+    for h in headers:
+        headers_args += ["-H", h]
     # Use -i/--include to capture response headers for ETag/304
-    max_retries = 3
-    base_sleep = 1.0
+    res = _run_gh(["api", path, "-i", *headers_args])
+    if res.returncode != 0:
+        msg = res.stderr.strip() or "gh api error"
+        raise RuntimeError(msg)
+    hdrs, body_text = _split_headers_body(res.stdout)
+    status = int(hdrs.pop(":status", "200"))
+    limiter.update(hdrs, resource)
+    return ApiResponse(status=status, headers=hdrs, body=body_text)
+
+
+# Rate-limit responses are retried inline only while the wait stays this short; longer
+# waits surface as RateLimitError (a RATE_LIMIT envelope) instead of stalling the tool call
+_INLINE_RETRIES = 3
+_INLINE_RETRY_MAX_SECONDS = 1.0
+
+
+def _retry_after(resp: ApiResponse) -> float | None:
+    value = resp.headers.get("retry-after") or resp.headers.get("x-ratelimit-reset-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    reset = resp.headers.get("x-ratelimit-reset")
+    if resp.headers.get("x-ratelimit-remaining") == "0" and reset:
+        try:
+            return max(0.0, float(reset) - time.time())
+        except ValueError:
+            pass
+    return None
+
+
+def _is_rate_limited(resp: ApiResponse) -> bool:
+    if resp.status == 429:
+        return True
+    if resp.status != 403:
+        return False
+    # Permission errors carry a JSON message; limits carry limit headers or say so
+    return (
+        "retry-after" in resp.headers
+        or resp.headers.get("x-ratelimit-remaining") == "0"
+        or "rate limit" in resp.body.lower()
+        or not resp.body.strip()
+    )
+
+
+def _api_get(path: str, headers: list[str]) -> ApiResponse:
+    """GET with brief rate-limit retries; returns 2xx/304 responses, raises otherwise.
+
+    Raises ``RateLimitError`` when the limit will not clear within a second or two.
+    """
     attempt = 0
     while True:
-        res = _run_gh(["api", path, "-i", *headers_args])
-        if res.returncode != 0:
-            msg = res.stderr.strip() or "gh api error"
-            raise RuntimeError(msg)
-
-        hdrs, body_text = _split_headers_body(res.stdout)
-        status = int(hdrs.get(":status", "200"))
-
-        # Handle 304 Not Modified via cache
-        if status == 304:
-            cached = cache.get_json(data_key)
-            return cached if cached is not None else []
-
-        # Handle rate limiting/backoff (e.g., 403 with Retry-After or secondary limit)
-        if status == 403:
-            retry_after_hdr = hdrs.get("retry-after") or hdrs.get("x-ratelimit-reset-after")
-            sleep_s: float | None = None
-            if retry_after_hdr:
-                try:
-                    sleep_s = float(retry_after_hdr)
-                except Exception:
-                    sleep_s = None
-            if attempt < max_retries:
-                # Exponential backoff with jitter; prefer server-provided retry_after
-                backoff = sleep_s if sleep_s is not None else min(base_sleep * (2**attempt), 8.0)
-                time.sleep(backoff + (0.05 * backoff))
+        resp = _api_request(path, headers)
+        if _is_rate_limited(resp):
+            retry_after = _retry_after(resp)
+            wait = retry_after if retry_after is not None else 0.25 * (2**attempt)
+            if attempt < _INLINE_RETRIES and wait <= _INLINE_RETRY_MAX_SECONDS:
+                time.sleep(wait)
                 attempt += 1
                 continue
-            # Exhausted retries
-            raise RuntimeError("RATE_LIMIT: secondary limit; retry later")
+            raise get_rate_limiter().block(resource_for_path(path), retry_after)
+        if resp.status >= 400:
+            raise RuntimeError(_http_error_message(resp))
+        return resp
+
+
+# Cache namespaces: everything about one issue/PR number, and a repo's list pages.
+# Entries are tagged with one of these so writes can drop exactly what they affect.
+_ITEM_PATH_RE = re.compile(r"^repos/([^/]+)/([^/]+)/(?:issues|pulls)/(\d+)(?:[/?]|$)")
+_LIST_PATH_RE = re.compile(r"^repos/([^/]+)/([^/]+)/(?:issues|pulls)(?:\?|$)")
+
+
+def _item_tag(owner: str, name: str, number: int) -> str:
+    # Issues and PRs share one number space, so one namespace covers both endpoints
+    return f"item:{owner}/{name}#{number}"
+
 
-        # Parse and cache
-        obj = json.loads(body_text) if body_text.strip() else None
-        # Capture ETag if available
-        etag_value = hdrs.get("etag")
-        if etag_value:
-            cache.set_etag(etag_key, etag_value)
-        cache.set_json(data_key, obj, ttl_for_category(category))
-        return obj
+def _lists_tag(owner: str, name: str) -> str:
+    return f"lists:{owner}/{name}"
+
+
+def _tag_for_path(path: str) -> str | None:
+    item = _ITEM_PATH_RE.match(path)
+    if item:
+        return _item_tag(item.group(1), item.group(2), int(item.group(3)))
+    listing = _LIST_PATH_RE.match(path)
+    if listing:
+        return _lists_tag(listing.group(1), listing.group(2))
+    return None
+
+
+def _churn_resource(category: str, path: str) -> str:
+    # Change rates are learned per endpoint: the query (state, paging) is ignored
+    return f"{category}:{path.split('?', 1)[0]}"
+
+
+def _api_get_cached(
+    path: str,
+    extra_headers: list[str] | None,
+    category: str,
+    tag: str | None = None,
+    *,
+    revalidate: bool = False,
+) -> tuple[Any, str | None]:
+    """Conditional GET of ``path``; returns the body and the ``rel="next"`` page path.
+
+    Body, ETag and Link target are cached per path as one record. Fresh records are
+    served without a request; stale ones, under a background policy, are served at
+    once while a refresh runs behind them. Otherwise an unchanged resource costs a 304
+    (which does not count against the primary rate limit). ``tag`` defaults to the
+    namespace derived from ``path``. ``revalidate`` always asks upstream, for reads
+    that other cache keys are derived from.
+    """
+    tag = tag or _tag_for_path(path)
+    record = None if revalidate else get_cache().get_record(f"api:{path}", category)
+    if record is not None:
+        fresh = record.is_fresh()
+        if fresh or policy_for_category(category).background:
+            if not fresh:
+                _refresh_in_background(path, extra_headers, category, tag)
+            return record.value, record.meta.get("next")
+    return _revalidate(path, extra_headers, category, tag)
+
+
+def _revalidate(
+    path: str, extra_headers: list[str] | None, category: str, tag: str | None
+) -> tuple[Any, str | None]:
+    cache = get_cache()
+    key = f"api:{path}"
+    policy = policy_for_category(category)
+    churn = get_churn_tracker()
+    resource = _churn_resource(category, path)
+    record = cache.get_record(key, category)
+    headers: list[str] = ["Accept: application/vnd.github+json"]
+    # The ETag travels with the body it validates, so a 304 always has a body to serve
+    if record is not None and record.etag:
+        headers.append(f"If-None-Match: {record.etag}")
+    if extra_headers:
+        headers += extra_headers
+
+    resp = _api_get(path, headers)
+    if resp.status == 304 and record is not None:
+        # Not modified: renew the lifetimes of the record we validated
+        churn.observe(resource, policy, changed=False)
+        cache.put_record(
+            key,
+            record.value,
+            churn.fresh_for(resource, policy),
+            policy.retain,
+            etag=record.etag,
+            meta=record.meta,
+            tag=tag,
+            category=category,
+        )
+        return record.value, record.meta.get("next")
+    if resp.status == 304:
+        # Never return an empty body in place of data we do not have
+        raise RuntimeError("Not Modified without a cached body (HTTP 304)")
+    obj = resp.json()
+    next_path = _next_link(resp.headers.get("link"))
+    etag = resp.headers.get("etag")
+    if record is not None and record.etag:
+        churn.observe(resource, policy, changed=etag != record.etag)
+    cache.put_record(
+        key,
+        obj,
+        churn.fresh_for(resource, policy),
+        policy.retain,
+        etag=etag,
+        meta={"next": next_path} if next_path else None,
+        tag=tag,
+        category=category,
+    )
+    return obj, next_path
+
+
+_REFRESHER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lgmcp-refresh")
+_REFRESHING: set[str] = set()
+_REFRESH_LOCK = threading.Lock()
+
+
+def _refresh_in_background(
+    path: str, extra_headers: list[str] | None, category: str, tag: str | None
+) -> None:
+    with _REFRESH_LOCK:
+        if path in _REFRESHING:
+            return
+        _REFRESHING.add(path)
+
+    def refresh() -> None:
+        try:
+            # Background work yields the rate budget to interactive calls
+            with request_priority(LOW):
+                _revalidate(path, extra_headers, category, tag)
+        except Exception:
+            pass  # the stale entry stays until it is retried or evicted
+        finally:
+            with _REFRESH_LOCK:
+                _REFRESHING.discard(path)
+
+    _REFRESHER.submit(refresh)
+
+
+def _api_get_json_cached(path: str, extra_headers: list[str] | None, category: str) -> Any:
+    return _api_get_cached(path, extra_headers, category)[0]
+
+
+# --- Server-side paginated lists (REST Link headers) ---
+
+# Upstream page size; fixed so that cursor offsets stay valid from page to page
+_UPSTREAM_PER_PAGE = 100
+
+
+def _api_relative(url: str) -> str:
+    # Link URLs are absolute; requests are made relative to the configured API root
+    parts = urlsplit(url)
+    root = urlsplit(api_base_url()).path.rstrip("/")
+    path = parts.path
+    if root and path.startswith(root + "/"):
+        path = path[len(root) :]
+    return path.lstrip("/") + (f"?{parts.query}" if parts.query else "")
+
+
+def _next_link(link_header: str | None) -> str | None:
+    for part in (link_header or "").split(","):
+        url, _, params = part.partition(";")
+        if 'rel="next"' in params:
+            return _api_relative(url.strip().strip("<>"))
+    return None
+
+
+def _normalize_path(path: str) -> str:
+    # One cache entry (and ETag) per page regardless of query parameter order
+    base, _, query = path.partition("?")
+    if not query:
+        return base
+    return f"{base}?{urlencode(sorted(parse_qsl(query, keep_blank_values=True)))}"
+
+
+def _list_page(path: str, tag: str | None) -> tuple[list[dict[str, Any]], str | None]:
+    data, next_path = _api_get_cached(_normalize_path(path), None, "lists", tag)
+    if isinstance(data, dict):
+        # Search endpoints wrap results: {"total_count": .., "items": [..]}
+        data = data.get("items")
+    rows = [row for row in data or [] if isinstance(row, dict)]
+    return rows, next_path
+
+
+def _page_path(first_path: str, page: int) -> str:
+    if page <= 1:
+        return first_path
+    base, _, query = first_path.partition("?")
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k != "page"]
+    return f"{base}?{urlencode([*params, ('page', str(page))])}"
+
+
+def _query_key(first_path: str) -> str:
+    return hashlib.sha256(_normalize_path(first_path).encode("utf-8")).hexdigest()[:16]
+
+
+def _upstream_position(upstream: dict[str, Any] | None, query: str) -> tuple[int, int]:
+    """``(page, skip)`` from a cursor, or the start for a cursor of another query."""
+    if not upstream or upstream.get("query") != query:
+        return 1, 0
+    try:
+        return max(int(upstream.get("page") or 1), 1), max(int(upstream.get("skip") or 0), 0)
+    except (TypeError, ValueError):
+        return 1, 0
+
+
+def _paged(
+    first_path: str,
+    convert: Callable[[dict[str, Any]], T | None],
+    *,
+    cursor: str | None,
+    limit: int | None,
+    tag: str | None = None,
+) -> Page[T]:
+    """Collect ``limit`` converted rows, fetching only the upstream pages they span.
+
+    Rows for which ``convert`` returns None are dropped. The cursor carries the
+    upstream position: the number of the page being consumed and how many kept rows
+    of it were already returned, so the next call resumes there instead of
+    re-walking from the first page. Cursors come from clients, so the page URL is
+    always rebuilt from ``first_path`` (never taken from the cursor), and a cursor
+    minted for another query starts over, like a snapshot bound to another key. Pages
+    are cached under ``tag``, by default the one ``first_path`` implies.
+    """
+    decoded = decode_cursor(cursor)
+    query = _query_key(first_path)
+    page, skip = _upstream_position(decoded.upstream, query)
+    tag = tag or _tag_for_path(first_path)
+    want = limit or _UPSTREAM_PER_PAGE
+    items: list[T] = []
+    while True:
+        rows, next_path = _list_page(_page_path(first_path, page), tag)
+        kept = [item for item in map(convert, rows) if item is not None]
+        taken = kept[skip : skip + want - len(items)]
+        items += taken
+        skip += len(taken)
+        if skip < len(kept):
+            has_next = True
+            break
+        if next_path is None:
+            has_next = False
+            break
+        # A rel="next" link means page + 1 exists; its URL (repositories/<id>/...) is not
+        # kept, so the cursor never names an endpoint
+        page, skip = page + 1, 0
+        if len(items) >= want:
+            has_next = True
+            break
+    next_cur = (
+        encode_cursor(
+            decoded.index + len(items), upstream={"query": query, "page": page, "skip": skip}
+        )
+        if has_next
+        else None
+    )
+    return Page(items=items, has_next=has_next, next_cursor=next_cur)
+
+
+def _paged_numbers(
+    first_path: str,
+    *,
+    cursor: str | None,
+    limit: int | None,
+    keep: Callable[[dict[str, Any]], bool] | None = None,
+    tag: str | None = None,
+) -> Page[int]:
+    def number(row: dict[str, Any]) -> int | None:
+        if "number" not in row or (keep is not None and not keep(row)):
+            return None
+        return int(row["number"])
+
+    return _paged(first_path, number, cursor=cursor, limit=limit, tag=tag)
+
+
+def _list_state(state: str | None) -> str | None:
+    # Map "any"/unknown -> "all", matching what gh accepted
+    if not state:
+        return None
+    s = state.lower()
+    if s == "any":
+        return "all"
+    return s if s in {"open", "closed", "merged", "all"} else "all"
+
+
+def _search_qualifier(value: str) -> str:
+    return f'"{value}"' if " " in value else value
 
 
 def pr_list(
@@ -167,69 +628,115 @@ def pr_list(
     limit: int | None,
     cursor: str | None,
 ) -> dict[str, Any]:
-    fields = ["number", "state", "author", "createdAt"]
-    # Normalize state for gh; map "any"/unknown -> "all"
-    normalized_state: str | None = None
-    if state:
-        s = state.lower()
-        if s == "any":
-            normalized_state = "all"
-        elif s in {"open", "closed", "merged", "all"}:
-            normalized_state = s
-        else:
-            normalized_state = "all"
+    normalized_state = _list_state(state)
+    keep: Callable[[dict[str, Any]], bool] | None = None
+    if normalized_state == "merged":
+        # Only search can filter on merged; it also takes the author/label qualifiers
+        terms = [f"repo:{owner}/{name}", "is:pr", "is:merged"]
+        if author:
+            terms.append(f"author:{_search_qualifier(author)}")
+        if label:
+            terms.append(f"label:{_search_qualifier(label)}")
+        query = {"q": " ".join(terms), "sort": "created", "order": "desc"}
+        path = f"search/issues?{urlencode({**query, 'per_page': _UPSTREAM_PER_PAGE})}"
+    elif author or label:
+        # The pulls endpoint cannot filter by author or label; the issues endpoint can,
+        # and lists PRs too (marked by a `pull_request` key)
+        params: dict[str, Any] = {"state": normalized_state or "open"}
+        if author:
+            params["creator"] = author
+        if label:
+            params["labels"] = label
+        params["per_page"] = _UPSTREAM_PER_PAGE
+        path = f"repos/{owner}/{name}/issues?{urlencode(params)}"
 
-    args = [
-        "pr",
-        "list",
-        "--repo",
-        f"{owner}/{name}",
-        "--json",
-        ",".join(fields),
-        "--limit",
-        "100",
-    ]
-    if normalized_state:
-        args += ["--state", normalized_state]
-    if author:
-        args += ["--author", author]
-    if label:
-        args += ["--label", label]
+        def keep(row: dict[str, Any]) -> bool:
+            return "pull_request" in row
+    else:
+        params = {"state": normalized_state or "open", "per_page": _UPSTREAM_PER_PAGE}
+        path = f"repos/{owner}/{name}/pulls?{urlencode(params)}"
 
     try:
-        data = run_gh_json(args) or []
+        # Search pages are tagged too, so a write to the repo drops them with its lists
+        page = _paged_numbers(
+            path, cursor=cursor, limit=limit, keep=keep, tag=_lists_tag(owner, name)
+        )
     except RuntimeError:
         # Return empty list on invalid filter to avoid noisy errors
-        data = []
-    items = [int(item.get("number")) for item in data if "number" in item]
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(items))
-    page = items[start:end]
-    has_next = end < len(items)
-    next_cur = encode_cursor(end) if has_next else None
+        page = Page(items=[], has_next=False, next_cursor=None)
     return {
         "repo": f"{owner}/{name}",
         "filters": {"state": normalized_state or state, "author": author, "label": label},
-        "ids": page,
-        "count": len(page),
-        "has_next": has_next,
-        "next_cursor": next_cur,
+        "ids": page.items,
+        "count": len(page.items),
+        "has_next": page.has_next,
+        "next_cursor": page.next_cursor,
+    }
+
+
+_PR_FIELDS = [
+    "number",
+    "state",
+    "title",
+    "author",
+    "additions",
+    "deletions",
+    "createdAt",
+    "mergedAt",
+]
+_ISSUE_FIELDS = ["number", "state", "title", "author", "body"]
+# Aliased lookups per GraphQL query; keeps each query well under the node/cost limits
+_GRAPHQL_BATCH = 50
+
+
+def _item_key(owner: str, name: str, kind: str, number: int) -> str:
+    # Under the REST path prefix, so the existing per-number invalidation covers it
+    return f"api:repos/{owner}/{name}/{kind}/{number}/meta"
+
+
+def _author(data: dict[str, Any]) -> dict[str, Any] | None:
+    # ``gh ... view`` adds id/name/is_bot to the login GraphQL gives; both writers of an
+    # item's cache entry keep only the login so the record looks the same either way
+    author = data.get("author")
+    if not isinstance(author, dict):
+        return None
+    return {"login": author.get("login")}
+
+
+def _pr_meta(owner: str, name: str, data: dict[str, Any]) -> dict[str, Any]:
+    meta = {
+        "repo": f"{owner}/{name}",
+        "number": data.get("number"),
+        "state": data.get("state"),
+        "title": data.get("title"),
+        "author": _author(data),
+        "additions": data.get("additions"),
+        "deletions": data.get("deletions"),
+        "createdAt": data.get("createdAt"),
+        "mergedAt": data.get("mergedAt"),
+    }
+    meta["tags"] = compute_tags(str(meta.get("title") or ""))
+    return meta
+
+
+def _issue_meta(owner: str, name: str, data: dict[str, Any]) -> dict[str, Any]:
+    meta = {
+        "repo": f"{owner}/{name}",
+        "number": data.get("number"),
+        "state": data.get("state"),
+        "title": data.get("title"),
+        "author": _author(data),
     }
+    meta["tags"] = compute_tags(str(meta.get("title") or ""), str((data.get("body") or "")[:400]))
+    return meta
 
 
 def pr_get(owner: str, name: str, number: int) -> dict[str, Any]:
-    fields = [
-        "number",
-        "state",
-        "title",
-        "author",
-        "additions",
-        "deletions",
-        "createdAt",
-        "mergedAt",
-    ]
+    cache = get_cache()
+    key = _item_key(owner, name, "pulls", number)
+    cached = cache.get_json(key, "meta")
+    if isinstance(cached, dict):
+        return cached
     args = [
         "pr",
         "view",
@@ -237,36 +744,162 @@ def pr_get(owner: str, name: str, number: int) -> dict[str, Any]:
         "--repo",
         f"{owner}/{name}",
         "--json",
-        ",".join(fields),
+        ",".join(_PR_FIELDS),
     ]
     try:
         data = run_gh_json(args) or {}
     except RuntimeError:
         return {}
-    meta = {
-        "repo": f"{owner}/{name}",
-        "number": data.get("number"),
-        "state": data.get("state"),
-        "title": data.get("title"),
-        "author": data.get("author"),
-        "additions": data.get("additions"),
-        "deletions": data.get("deletions"),
-        "createdAt": data.get("createdAt"),
-        "mergedAt": data.get("mergedAt"),
-    }
-    meta["tags"] = compute_tags(str(meta.get("title") or ""))
+    meta = _pr_meta(owner, name, data)
+    cache.set_json(
+        key,
+        meta,
+        ttl_for_category("meta"),
+        tag=_item_tag(owner, name, number),
+        category="meta",
+    )
     return meta
 
 
-def pr_files(
-    owner: str, name: str, number: int, limit: int | None, cursor: str | None
-) -> dict[str, Any]:
-    path = f"repos/{owner}/{name}/pulls/{number}/files?per_page=100"
+def _graphql(query: str, variables: dict[str, str]) -> dict[str, Any]:
+    """POST a GraphQL query; returns the response body, including partial ``data``."""
+    key = _flight_key("graphql", query, json.dumps(variables, sort_keys=True))
+    return _FLIGHTS.do(key, lambda: _graphql_once(query, variables))
+
+
+def _graphql_once(query: str, variables: dict[str, str]) -> dict[str, Any]:
+    get_rate_limiter().acquire("graphql")
+    client = get_http_client()
+    if client is not None:
+        try:
+            resp: ApiResponse | None = client.request(
+                "POST", "graphql", json_body={"query": query, "variables": variables}
+            )
+        except httpx.TransportError:
+            resp = None
+        if resp is not None:
+            get_rate_limiter().update(resp.headers, "graphql")
+            if resp.status >= 400:
+                raise RuntimeError(_http_error_message(resp))
+            body = resp.json()
+            return body if isinstance(body, dict) else {}
+    args = ["api", "graphql", "-f", f"query={query}"]
+    for k, v in variables.items():
+        args += ["-f", f"{k}={v}"]
+    res = _run_gh(args)
+    # gh exits non-zero when any alias errors (e.g. NOT_FOUND) but still prints the data
     try:
-        data = _api_get_json_cached(path, extra_headers=None, category="lists") or []
-    except RuntimeError:
-        data = []
-    files = [
+        payload = json.loads(res.stdout) if res.stdout.strip() else None
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict) or (res.returncode != 0 and not payload.get("data")):
+        raise RuntimeError(res.stderr.strip() or "gh api graphql error")
+    return payload
+
+
+def _batch_get(
+    owner: str,
+    name: str,
+    numbers: list[int],
+    *,
+    kind: str,
+    field: str,
+    selection: str,
+    to_meta: Callable[[str, str, dict[str, Any]], dict[str, Any]],
+) -> dict[str, Any]:
+    cache = get_cache()
+    wanted = list(dict.fromkeys(int(n) for n in numbers))
+    found: dict[int, dict[str, Any]] = {}
+    for number in wanted:
+        cached = cache.get_json(_item_key(owner, name, kind, number), "meta")
+        if isinstance(cached, dict):
+            found[number] = cached
+    errors: dict[int, dict[str, Any]] = {}
+
+    def fetch(chunk: list[int]) -> None:
+        aliases = " ".join(f"n{n}: {field}(number: {n}) {{ {selection} }}" for n in chunk)
+        query = (
+            "query($owner: String!, $name: String!) "
+            f"{{ repository(owner: $owner, name: $name) {{ {aliases} }} }}"
+        )
+        body = _graphql(query, {"owner": owner, "name": name})
+        repo_data = (body.get("data") or {}).get("repository") or {}
+        for number in chunk:
+            node = repo_data.get(f"n{number}")
+            if isinstance(node, dict):
+                meta = to_meta(owner, name, node)
+                cache.set_json(
+                    _item_key(owner, name, kind, number),
+                    meta,
+                    ttl_for_category("meta"),
+                    tag=_item_tag(owner, name, number),
+                    category="meta",
+                )
+                found[number] = meta
+
+    missing = [n for n in wanted if n not in found]
+    for i in range(0, len(missing), _GRAPHQL_BATCH):
+        chunk = missing[i : i + _GRAPHQL_BATCH]
+        try:
+            fetch(chunk)
+        except RuntimeError:
+            # Retry one at a time, so a failing item only fails itself
+            for number in chunk:
+                try:
+                    fetch([number])
+                except RuntimeError as exc:
+                    errors[number] = ErrorEnvelope(
+                        code=GH_ERROR, message=str(exc), details={"number": number}
+                    ).to_dict()
+    items: list[dict[str, Any]] = []
+    for n in wanted:
+        meta = found.get(n)
+        if meta is None:
+            meta = {
+                "repo": f"{owner}/{name}",
+                "number": n,
+                "state": None,
+                "title": None,
+                "author": None,
+            }
+            if n in errors:
+                meta["error"] = errors[n]
+            else:
+                meta["not_found"] = True
+        items.append(meta)
+    return {"repo": f"{owner}/{name}", "items": items, "count": len(items)}
+
+
+def pr_get_batch(owner: str, name: str, numbers: list[int]) -> dict[str, Any]:
+    """Fetch many PRs with one aliased GraphQL query per chunk, caching each item."""
+    selection = "number state title author { login } additions deletions createdAt mergedAt"
+    return _batch_get(
+        owner,
+        name,
+        numbers,
+        kind="pulls",
+        field="pullRequest",
+        selection=selection,
+        to_meta=_pr_meta,
+    )
+
+
+# GitHub lists at most this many files for a pull request
+_PR_FILES_CAP = 3000
+
+
+def _pr_files_page(
+    owner: str, name: str, number: int, base: str, head: str, page_no: int
+) -> list[dict[str, Any]]:
+    # The file list of a (base, head) pair never changes: cache it without expiry
+    cache = get_cache()
+    key = f"pr_files:{owner}/{name}#{number}@{base}..{head}:{page_no}"
+    cached = cache.get_json(key, "blobs")
+    if isinstance(cached, list):
+        return cached
+    path = f"repos/{owner}/{name}/pulls/{number}/files?per_page={_UPSTREAM_PER_PAGE}&page={page_no}"
+    data = _api_get(path, ["Accept: application/vnd.github+json"]).json() or []
+    rows = [
         {
             "path": f.get("filename"),
             "status": f.get("status"),
@@ -274,33 +907,79 @@ def pr_files(
             "deletions": f.get("deletions"),
         }
         for f in data
+        if isinstance(f, dict)
     ]
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(files))
-    page = files[start:end]
-    has_next = end < len(files)
-    next_cur = encode_cursor(end) if has_next else None
+    cache.set_json(key, rows, None, category="blobs")
+    return rows
+
+
+def pr_files(
+    owner: str, name: str, number: int, limit: int | None, cursor: str | None
+) -> dict[str, Any]:
+    """Page through a PR's changed files, fetching only the upstream pages needed.
+
+    Pages are keyed by the PR's base and head SHAs and cached indefinitely; the only
+    request on a revisit is the (usually 304) revalidation of the PR itself. If an
+    upstream page fails, the files before it are returned with an ``error`` envelope
+    and a cursor that retries from the first missing file.
+    """
+    result: dict[str, Any] = {"repo": f"{owner}/{name}", "number": number}
+    try:
+        # The file pages are cached forever under the head SHA, so that SHA must not come
+        # from a stale copy: after a force-push it would keep serving the old files
+        meta, _ = _api_get_cached(
+            f"repos/{owner}/{name}/pulls/{number}", None, "meta", revalidate=True
+        )
+    except RuntimeError:
+        meta = None
+    head = base = None
+    if isinstance(meta, dict):
+        head = (meta.get("head") or {}).get("sha")
+        base = (meta.get("base") or {}).get("sha")
+    if not isinstance(meta, dict) or not head:
+        return {**result, "files": [], "count": 0, "has_next": False, "next_cursor": None}
+
+    total = min(int(meta.get("changed_files") or 0), _PR_FILES_CAP)
+    start = min(max(decode_cursor(cursor).index, 0), total)
+    end = min(start + (limit or total), total)
+    first_page = start // _UPSTREAM_PER_PAGE + 1
+    last_page = max((end - 1) // _UPSTREAM_PER_PAGE + 1, first_page - 1)
+    rows: list[dict[str, Any]] = []
+    error: ErrorEnvelope | None = None
+    for page_no in range(first_page, last_page + 1):
+        try:
+            rows += _pr_files_page(owner, name, number, str(base), str(head), page_no)
+        except RuntimeError as exc:
+            error = ErrorEnvelope(code=GH_ERROR, message=str(exc), details={"page": page_no})
+            break
+    offset = (first_page - 1) * _UPSTREAM_PER_PAGE
+    files = rows[start - offset : end - offset]
+    if error is not None:
+        return {
+            **result,
+            "files": files,
+            "count": len(files),
+            "has_next": True,
+            "next_cursor": encode_cursor(start + len(files)),
+            "error": error.to_dict(),
+        }
+    has_next = end < total and len(files) == end - start
     return {
-        "repo": f"{owner}/{name}",
-        "number": number,
-        "files": page,
-        "count": len(page),
+        **result,
+        "files": files,
+        "count": len(files),
         "has_next": has_next,
-        "next_cursor": next_cur,
+        "next_cursor": encode_cursor(end) if has_next else None,
     }
 
 
 def pr_comment(owner: str, name: str, number: int, body: str) -> dict[str, Any]:
     args = ["pr", "comment", str(number), "--repo", f"{owner}/{name}", "--body", body]
-    res = _run_gh(args)
+    res = _run_gh_write(args)
     ok = res.returncode == 0
     if ok:
-        # Invalidate PR issue timeline endpoints and PR files
-        cache = get_cache()
-        prefix = f"api:repos/{owner}/{name}/issues/{number}/"
-        cache.invalidate_prefix(prefix)
+        # Invalidate the PR's cached meta, timeline and comment pages
+        get_cache().invalidate_tag(_item_tag(owner, name, number))
     return {"ok": ok}
 
 
@@ -315,12 +994,10 @@ def pr_review(owner: str, name: str, number: int, event: str, body: str | None)
         args += ["--comment"]
     if body:
         args += ["--body", body]
-    res = _run_gh(args)
+    res = _run_gh_write(args)
     ok = res.returncode == 0
     if ok:
-        cache = get_cache()
-        cache.invalidate_prefix(f"api:repos/{owner}/{name}/issues/{number}/")
-        cache.invalidate_prefix(f"api:repos/{owner}/{name}/pulls/{number}/")
+        get_cache().invalidate_tag(_item_tag(owner, name, number))
     return {"ok": ok}
 
 
@@ -329,12 +1006,13 @@ def pr_merge(owner: str, name: str, number: int, method: str = "merge") -> dict[
     args = ["pr", "merge", str(number), "--repo", f"{owner}/{name}"]
     if method in {"merge", "squash", "rebase"}:
         args += [f"--{method}"]
-    res = _run_gh(args)
+    res = _run_gh_write(args)
     ok = res.returncode == 0
     if ok:
         cache = get_cache()
-        cache.invalidate_prefix(f"api:repos/{owner}/{name}/issues/{number}/")
-        cache.invalidate_prefix(f"api:repos/{owner}/{name}/pulls/{number}/")
+        cache.invalidate_tag(_item_tag(owner, name, number))
+        # A merged PR leaves the open lists
+        cache.invalidate_tag(_lists_tag(owner, name))
     return {"ok": ok}
 
 
@@ -347,42 +1025,43 @@ def issue_list(
     limit: int | None,
     cursor: str | None,
 ) -> dict[str, Any]:
-    args = [
-        "issue",
-        "list",
-        "--repo",
-        f"{owner}/{name}",
-        "--json",
-        "number,state,author,title",
-        "--limit",
-        "100",
-    ]
-    if state:
-        args += ["--state", state]
+    normalized_state = _list_state(state)
+    if normalized_state == "merged":
+        # The issues endpoint answers 422 to it; merged is only a pull request state
+        raise ValueError("Invalid state for issues: 'merged' (use 'closed')")
+    params: dict[str, Any] = {"state": normalized_state or "open"}
     if author:
-        args += ["--author", author]
+        params["creator"] = author
     if label:
-        args += ["--label", label]
-    data = run_gh_json(args) or []
-    items = [int(item.get("number")) for item in data if "number" in item]
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(items))
-    page = items[start:end]
-    has_next = end < len(items)
-    next_cur = encode_cursor(end) if has_next else None
+        params["labels"] = label
+    params["per_page"] = _UPSTREAM_PER_PAGE
+    path = f"repos/{owner}/{name}/issues?{urlencode(params)}"
+
+    def keep(row: dict[str, Any]) -> bool:
+        # The issues endpoint also returns pull requests
+        return "pull_request" not in row
+
+    try:
+        page = _paged_numbers(path, cursor=cursor, limit=limit, keep=keep)
+    except RuntimeError:
+        # Return empty list on invalid filter to avoid noisy errors, as pr_list does
+        page = Page(items=[], has_next=False, next_cursor=None)
     return {
         "repo": f"{owner}/{name}",
         "filters": {"state": state, "author": author, "label": label},
-        "ids": page,
-        "count": len(page),
-        "has_next": has_next,
-        "next_cursor": next_cur,
+        "ids": page.items,
+        "count": len(page.items),
+        "has_next": page.has_next,
+        "next_cursor": page.next_cursor,
     }
 
 
 def issue_get(owner: str, name: str, number: int) -> dict[str, Any]:
+    cache = get_cache()
+    key = _item_key(owner, name, "issues", number)
+    cached = cache.get_json(key, "meta")
+    if isinstance(cached, dict):
+        return cached
     args = [
         "issue",
         "view",
@@ -390,30 +1069,42 @@ def issue_get(owner: str, name: str, number: int) -> dict[str, Any]:
         "--repo",
         f"{owner}/{name}",
         "--json",
-        "number,state,title,author,body",
+        ",".join(_ISSUE_FIELDS),
     ]
     try:
         data = run_gh_json(args) or {}
     except RuntimeError:
         return {}
-    meta = {
-        "repo": f"{owner}/{name}",
-        "number": data.get("number"),
-        "state": data.get("state"),
-        "title": data.get("title"),
-        "author": data.get("author"),
-    }
-    meta["tags"] = compute_tags(str(meta.get("title") or ""), str((data.get("body") or "")[:400]))
+    meta = _issue_meta(owner, name, data)
+    cache.set_json(
+        key,
+        meta,
+        ttl_for_category("meta"),
+        tag=_item_tag(owner, name, number),
+        category="meta",
+    )
     return meta
 
 
+def issue_get_batch(owner: str, name: str, numbers: list[int]) -> dict[str, Any]:
+    """Fetch many issues with one aliased GraphQL query per chunk, caching each item."""
+    return _batch_get(
+        owner,
+        name,
+        numbers,
+        kind="issues",
+        field="issue",
+        selection="number state title author { login } body",
+        to_meta=_issue_meta,
+    )
+
+
 def issue_comment(owner: str, name: str, number: int, body: str) -> dict[str, Any]:
     args = ["issue", "comment", str(number), "--repo", f"{owner}/{name}", "--body", body]
-    res = _run_gh(args)
+    res = _run_gh_write(args)
     ok = res.returncode == 0
     if ok:
-        cache = get_cache()
-        cache.invalidate_prefix(f"api:repos/{owner}/{name}/issues/{number}/")
+        get_cache().invalidate_tag(_item_tag(owner, name, number))
     return {"ok": ok, "stderr": res.stderr.strip() or None}
 
 
@@ -467,56 +1158,32 @@ def pr_timeline(
     *,
     filter_nulls: bool = False,
 ) -> dict[str, Any]:
-    # Use REST timeline for broad compatibility
+    # REST timeline, walked page by page via Link headers; each page is ETag-cached
+    path = f"repos/{owner}/{name}/issues/{number}/timeline?per_page={_UPSTREAM_PER_PAGE}"
+
+    def event(row: dict[str, Any]) -> dict[str, Any] | None:
+        item = {
+            "type": row.get("event"),
+            "actor": (row.get("actor") or {}).get("login"),
+            "createdAt": row.get("created_at") or row.get("createdAt"),
+        }
+        if filter_nulls and any(v is None for v in item.values()):
+            return None
+        return item
+
     not_found = False
-    args = [
-        "api",
-        f"repos/{owner}/{name}/issues/{number}/timeline?per_page=100",
-        "-H",
-        "Accept: application/vnd.github+json",
-        "-H",
-        "Accept: application/vnd.github.mockingbird-preview+json",
-    ]
     try:
-        data = run_gh_json(args) or []
+        page = _paged(path, event, cursor=cursor, limit=limit)
     except RuntimeError:
-        # Fallback to issue events if timeline preview not available
-        events_args = [
-            "api",
-            f"repos/{owner}/{name}/issues/{number}/events?per_page=100",
-            "-H",
-            "Accept: application/vnd.github+json",
-        ]
-        try:
-            data = run_gh_json(events_args) or []
-        except RuntimeError:
-            # Treat missing issue/PR as not_found
-            data = []
-            not_found = True
-    events: list[dict[str, Any]] = []
-    for n in data:
-        events.append(
-            {
-                "type": n.get("event"),
-                "actor": (n.get("actor") or {}).get("login"),
-                "createdAt": n.get("created_at") or n.get("createdAt"),
-            }
-        )
-    if filter_nulls:
-        events = [e for e in events if all(v is not None for v in e.values())]
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(events))
-    page = events[start:end]
-    has_next = end < len(events)
-    next_cur = encode_cursor(end) if has_next else None
+        # Treat missing issue/PR as not_found
+        page = Page(items=[], has_next=False, next_cursor=None)
+        not_found = True
     return {
         "repo": f"{owner}/{name}",
         "number": number,
-        "events": page,
-        "count": len(page),
-        "has_next": has_next,
-        "next_cursor": next_cur,
+        "events": page.items,
+        "count": len(page.items),
+        "has_next": page.has_next,
+        "next_cursor": page.next_cursor,
         "not_found": not_found,
     }
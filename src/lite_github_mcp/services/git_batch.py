@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import atexit
+import subprocess
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+
+from lite_github_mcp.utils.metrics import observe_subprocess
+from lite_github_mcp.utils.subprocess import process_slot
+
+# Read/discard granularity when streaming object bodies off the batch pipe
+_CHUNK_BYTES = 64 * 1024
+# Names written per round before reading answers back; keeps both pipes from filling
+_PIPELINE_DEPTH = 256
+
+
+@dataclass(frozen=True)
+class ObjectInfo:
+    oid: str
+    type: str
+    size: int
+
+
+class CatFileWorker:
+    """One long-lived ``git cat-file --batch`` or ``--batch-check`` process.
+
+    Requests are written one name per line on stdin; every answer starts with an
+    ``<oid> <type> <size>`` header (or ``<name> missing``). In ``--batch`` mode the
+    header is followed by exactly ``size`` bytes of content and a trailing LF, which
+    lets callers keep only the byte range they need and drain the rest.
+    """
+
+    def __init__(self, repo_path: Path, option: str) -> None:
+        self.option = option
+        self._proc = subprocess.Popen(
+            ["git", "cat-file", option],
+            cwd=str(repo_path),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        # Observed once, at close, as the worker's lifetime
+        self._started: float | None = time.perf_counter()
+
+    @property
+    def _stdin(self) -> IO[bytes]:
+        assert self._proc.stdin is not None
+        return self._proc.stdin
+
+    @property
+    def _stdout(self) -> IO[bytes]:
+        assert self._proc.stdout is not None
+        return self._proc.stdout
+
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def close(self) -> None:
+        if self._proc.poll() is None:
+            try:
+                self._stdin.close()
+                self._proc.wait(timeout=2)
+            except Exception:
+                self._proc.kill()
+                self._proc.wait()
+        for stream in (self._proc.stdin, self._proc.stdout):
+            if stream is not None and not stream.closed:
+                stream.close()
+        if self._started is not None:
+            observe_subprocess("git", time.perf_counter() - self._started)
+            self._started = None
+
+    def _read_header(self) -> ObjectInfo | None:
+        line = self._stdout.readline()
+        if not line:
+            raise OSError("git cat-file exited unexpectedly")
+        text = line.decode("utf-8", errors="replace").rstrip("\n")
+        parts = text.rsplit(" ", 2)
+        if len(parts) != 3 or not parts[2].isdigit():
+            # "<name> missing" / "<name> ambiguous"
+            return None
+        oid, obj_type, size = parts
+        return ObjectInfo(oid=oid, type=obj_type, size=int(size))
+
+    def _discard(self, count: int) -> None:
+        while count > 0:
+            chunk = self._stdout.read(min(count, _CHUNK_BYTES))
+            if not chunk:
+                raise OSError("git cat-file exited mid-object")
+            count -= len(chunk)
+
+    def info_many(self, names: Sequence[str]) -> list[ObjectInfo | None]:
+        results: list[ObjectInfo | None] = []
+        for start in range(0, len(names), _PIPELINE_DEPTH):
+            batch = names[start : start + _PIPELINE_DEPTH]
+            self._stdin.write("".join(f"{_check_name(n)}\n" for n in batch).encode("utf-8"))
+            self._stdin.flush()
+            for _ in batch:
+                info = self._read_header()
+                if info is not None and self.option == "--batch":
+                    self._discard(info.size + 1)
+                results.append(info)
+        return results
+
+    def read_range(
+        self, name: str, offset: int = 0, max_bytes: int | None = None
+    ) -> tuple[ObjectInfo, bytes] | None:
+        if self.option != "--batch":
+            raise ValueError("read_range requires a --batch worker")
+        self._stdin.write(f"{_check_name(name)}\n".encode())
+        self._stdin.flush()
+        info = self._read_header()
+        if info is None:
+            return None
+        start = min(max(offset, 0), info.size)
+        want = info.size - start if max_bytes is None else min(max(max_bytes, 0), info.size - start)
+        self._discard(start)
+        data = self._stdout.read(want) if want else b""
+        if len(data) != want:
+            raise OSError("git cat-file exited mid-object")
+        # Drain the remainder of the object plus the trailing LF
+        self._discard(info.size - start - want + 1)
+        return info, data
+
+
+def _check_name(name: str) -> str:
+    if "\n" in name:
+        raise ValueError("object name must not contain newlines")
+    return name
+
+
+class CatFilePool:
+    """Per-repository pool of idle ``git cat-file`` workers reused across calls.
+
+    A checked-out worker holds one of git's process slots (``LGMCP_MAX_PROCS``); idle
+    workers only wait on stdin and do not count.
+    """
+
+    def __init__(self, max_idle_per_key: int = 4) -> None:
+        self._max_idle = max_idle_per_key
+        self._idle: dict[tuple[str, str], list[CatFileWorker]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def worker(self, repo_path: Path, option: str) -> Iterator[CatFileWorker]:
+        key = (str(repo_path.resolve()), option)
+        with process_slot("git"):
+            worker = self._take_idle(key) or CatFileWorker(repo_path, option)
+            try:
+                yield worker
+            except BaseException:
+                # Protocol state is unknown after a failure mid-request; never reuse
+                worker.close()
+                raise
+            self._put_idle(key, worker)
+
+    def _take_idle(self, key: tuple[str, str]) -> CatFileWorker | None:
+        with self._lock:
+            idle = self._idle.get(key, [])
+            while idle:
+                candidate = idle.pop()
+                if candidate.alive():
+                    return candidate
+                candidate.close()
+        return None
+
+    def _put_idle(self, key: tuple[str, str], worker: CatFileWorker) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if worker.alive() and len(idle) < self._max_idle:
+                idle.append(worker)
+                return
+        worker.close()
+
+    def close_repo(self, repo_path: Path) -> None:
+        prefix = str(repo_path.resolve())
+        with self._lock:
+            keys = [key for key in self._idle if key[0] == prefix]
+            workers = [w for key in keys for w in self._idle.pop(key)]
+        for w in workers:
+            w.close()
+
+    def close_all(self) -> None:
+        with self._lock:
+            workers = [w for idle in self._idle.values() for w in idle]
+            self._idle.clear()
+        for w in workers:
+            w.close()
+
+
+_GLOBAL_POOL: CatFilePool | None = None
+
+
+def get_cat_file_pool() -> CatFilePool:
+    global _GLOBAL_POOL
+    if _GLOBAL_POOL is None:
+        _GLOBAL_POOL = CatFilePool()
+        atexit.register(_GLOBAL_POOL.close_all)
+    return _GLOBAL_POOL
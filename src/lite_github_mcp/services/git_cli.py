@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import os
+import re
+import shutil
+import subprocess
+from collections.abc import Generator, Iterable, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
-from lite_github_mcp.utils.subprocess import run_command
+from lite_github_mcp.services.git_batch import ObjectInfo, get_cat_file_pool
+from lite_github_mcp.services.singleflight import SingleFlight
+from lite_github_mcp.utils.metrics import subprocess_timer
+from lite_github_mcp.utils.subprocess import (
+    CommandResult,
+    process_slot,
+    run_command,
+    run_command_async,
+)
 
 
 @dataclass(frozen=True)
@@ -12,6 +24,24 @@ class GitRepo:
     path: Path
 
 
+@dataclass(frozen=True)
+class TreeItem:
+    path: str
+    mode: str
+    type: str
+    oid: str
+    size: int | None  # None for non-blob entries such as submodule commits
+
+
+_FLIGHTS = SingleFlight()
+
+
+def _read_git(repo: GitRepo, args: list[str]) -> CommandResult:
+    # Identical read-only invocations in flight at the same time share one process
+    key = "\x00".join([str(repo.path), *args])
+    return _FLIGHTS.do(key, lambda: run_command(args, cwd=repo.path))
+
+
 def ensure_repo(path: Path) -> GitRepo:
     path.mkdir(parents=True, exist_ok=True)
     # Initialize if not a git repo
@@ -20,41 +50,68 @@ def ensure_repo(path: Path) -> GitRepo:
     return GitRepo(path=path)
 
 
-def rev_parse(repo: GitRepo, ref: str = "HEAD") -> str | None:
-    result = run_command(["git", "rev-parse", ref], cwd=repo.path)
-    if result.returncode != 0:
-        return None
-    return result.stdout.strip() or None
+_ORIGIN_URL_ARGS = ["git", "remote", "get-url", "origin"]
+_CURRENT_BRANCH_ARGS = ["git", "rev-parse", "--abbrev-ref", "HEAD"]
+_ORIGIN_HEAD_ARGS = ["git", "symbolic-ref", "--quiet", "refs/remotes/origin/HEAD"]
+_BRANCHES_ARGS = ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads"]
 
 
-def get_remote_origin_url(repo: GitRepo) -> str | None:
-    result = run_command(["git", "remote", "get-url", "origin"], cwd=repo.path)
+def _first_line(result: CommandResult) -> str | None:
     if result.returncode != 0:
         return None
     return result.stdout.strip() or None
 
 
-def current_branch(repo: GitRepo) -> str | None:
+def _branch_name(result: CommandResult) -> str | None:
     # Returns current branch name or None if detached
-    result = run_command(["git", "rev-parse", "--abbrev-ref", "HEAD"], cwd=repo.path)
-    if result.returncode != 0:
-        return None
-    name = result.stdout.strip()
+    name = _first_line(result)
     return name if name and name != "HEAD" else None
 
 
+def _origin_head_branch(result: CommandResult) -> str | None:
+    # Output like: refs/remotes/origin/main
+    ref = _first_line(result) or ""
+    return ref.split("/")[-1] if ref.startswith("refs/remotes/origin/") else None
+
+
+_OBJECT_ID_RE = re.compile(r"[0-9a-f]{40}|[0-9a-f]{64}")
+
+
+def is_object_id(ref: str) -> bool:
+    return _OBJECT_ID_RE.fullmatch(ref) is not None
+
+
+def _rev_parse_args(ref: str) -> list[str] | None:
+    # Refs come from tool input: never let one be read as an option
+    if ref.startswith("-"):
+        return None
+    return ["git", "rev-parse", "--verify", "--quiet", "--end-of-options", ref]
+
+
+def _object_id(result: CommandResult) -> str | None:
+    oid = _first_line(result)
+    return oid if oid is not None and is_object_id(oid) else None
+
+
+def rev_parse(repo: GitRepo, ref: str = "HEAD") -> str | None:
+    """Resolve ``ref`` to a full object ID, or None if it does not name an object."""
+    args = _rev_parse_args(ref)
+    return _object_id(_read_git(repo, args)) if args is not None else None
+
+
+def get_remote_origin_url(repo: GitRepo) -> str | None:
+    return _first_line(_read_git(repo, _ORIGIN_URL_ARGS))
+
+
+def current_branch(repo: GitRepo) -> str | None:
+    return _branch_name(_read_git(repo, _CURRENT_BRANCH_ARGS))
+
+
 def default_branch(repo: GitRepo) -> str | None:
     # Try origin/HEAD -> refs/remotes/origin/HEAD -> origin/<branch>
-    result = run_command(
-        ["git", "symbolic-ref", "--quiet", "refs/remotes/origin/HEAD"], cwd=repo.path
-    )
-    if result.returncode == 0:
-        # Output like: refs/remotes/origin/main
-        ref = result.stdout.strip()
-        if ref.startswith("refs/remotes/origin/"):
-            return ref.split("/")[-1]
+    branch = _origin_head_branch(_read_git(repo, _ORIGIN_HEAD_ARGS))
     # Fallback: current local branch
-    return current_branch(repo)
+    return branch or current_branch(repo)
 
 
 def parse_owner_repo_from_url(url: str) -> tuple[str | None, str | None]:
@@ -82,10 +139,7 @@ def parse_owner_repo_from_url(url: str) -> tuple[str | None, str | None]:
     return owner, name
 
 
-def list_branches(repo: GitRepo, prefix: str | None = None) -> list[str]:
-    result = run_command(
-        ["git", "for-each-ref", "--format=%(refname:short)", "refs/heads"], cwd=repo.path
-    )
+def _branch_names(result: CommandResult, prefix: str | None) -> list[str]:
     if result.returncode != 0:
         return []
     names = [line.strip() for line in result.stdout.splitlines() if line.strip()]
@@ -94,44 +148,253 @@ def list_branches(repo: GitRepo, prefix: str | None = None) -> list[str]:
     return sorted(names)
 
 
-def ls_tree(repo: GitRepo, ref: str, path: str = "") -> list[tuple[str, str]]:
-    # Use NUL-delimited format to safely handle spaces/unicode
-    args = ["git", "ls-tree", "-r", "--full-tree", "--name-only", "-z", ref]
+def list_branches(repo: GitRepo, prefix: str | None = None) -> list[str]:
+    return _branch_names(_read_git(repo, _BRANCHES_ARGS), prefix)
+
+
+_PARTIAL: dict[str, bool] = {}
+
+
+def is_partial_clone(repo: GitRepo) -> bool:
+    """True when ``repo`` has a promisor remote, i.e. blobs may be fetched lazily."""
+    key = str(repo.path)
+    cached = _PARTIAL.get(key)
+    if cached is None:
+        dot_git = repo.path / ".git"
+        config = dot_git / "config" if dot_git.is_dir() else repo.path / "config"
+        if config.is_file():
+            # Read the config file directly; a git process here would double a listing's cost
+            text = config.read_text(encoding="utf-8", errors="replace").lower()
+            settings = {line.strip().replace(" ", "") for line in text.splitlines()}
+            cached = "promisor=true" in settings or any(
+                line.startswith("partialclone=") for line in settings
+            )
+        else:
+            result = run_command(
+                [
+                    "git",
+                    "config",
+                    "--get-regexp",
+                    r"^(extensions\.partialclone|remote\..*\.promisor)$",
+                ],
+                cwd=repo.path,
+            )
+            cached = result.returncode == 0 and bool(result.stdout.strip())
+        _PARTIAL[key] = cached
+    return cached
+
+
+def ls_tree(repo: GitRepo, ref: str, path: str = "") -> list[TreeItem]:
+    """List every entry reachable from ``ref`` in a single ``git ls-tree`` process.
+
+    Parses the NUL-delimited long format (``mode type oid size\tpath``) so that blob
+    SHAs, modes and sizes come from one stream regardless of repository size. In a
+    partial clone sizes are left out, since asking for them faults in every blob.
+    Raises RuntimeError when git fails, so a failure is never mistaken for an empty tree.
+    """
+    return _ls_tree_items(_read_git(repo, _ls_tree_args(repo, ref, path)))
+
+
+def _ls_tree_args(repo: GitRepo, ref: str, path: str) -> list[str]:
+    args = ["git", "ls-tree", "-r", "--full-tree", "-z", "--end-of-options", ref]
+    if not is_partial_clone(repo):
+        args.insert(4, "--long")
     if path:
-        args.append(path)
-    result = run_command(args, cwd=repo.path)
+        args.extend(["--", path])
+    return args
+
+
+def _ls_tree_items(result: CommandResult) -> list[TreeItem]:
     if result.returncode != 0:
-        return []
-    names = [n for n in result.stdout.split("\x00") if n]
-    entries: list[tuple[str, str]] = []
-    # Resolve blob sha for each path (slower, but correct; can be optimized later)
-    for name in names:
-        sha_res = run_command(["git", "ls-tree", ref, name], cwd=repo.path)
-        if sha_res.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or "git ls-tree failed")
+    return sorted(_parse_ls_tree(result.stdout), key=lambda item: item.path)
+
+
+def _parse_ls_tree(output: str) -> list[TreeItem]:
+    items: list[TreeItem] = []
+    for record in output.split("\x00"):
+        if not record:
             continue
         try:
-            meta, _filename = sha_res.stdout.split("\t", 1)
-            _mode, _type, object_id = meta.split()
-            entries.append((name, object_id))
-        except Exception:
+            meta, name = record.split("\t", 1)
+            mode, obj_type, object_id, *rest = meta.split()
+        except ValueError:
             continue
-    entries.sort(key=lambda x: x[0])
-    return entries
+        size = rest[0] if rest else ""
+        items.append(
+            TreeItem(
+                path=name,
+                mode=mode,
+                type=obj_type,
+                oid=object_id,
+                size=int(size) if size.isdigit() else None,
+            )
+        )
+    return items
+
+
+def read_blob(
+    repo: GitRepo, blob_sha: str, max_bytes: int | None = None, offset: int = 0
+) -> tuple[bytes, int] | None:
+    """Return ``(data, total_size)`` for a byte range of an object, or None if missing.
+
+    Served by a pooled ``git cat-file --batch`` process: one round-trip per call and
+    only the requested range is kept in memory.
+    """
+    try:
+        with get_cat_file_pool().worker(repo.path, "--batch") as worker:
+            found = worker.read_range(blob_sha, offset=offset, max_bytes=max_bytes)
+    except (OSError, ValueError):
+        return None
+    if found is None:
+        return None
+    info, data = found
+    return data, info.size
 
 
 def show_blob(repo: GitRepo, blob_sha: str, max_bytes: int | None = None, offset: int = 0) -> bytes:
-    # Use `git cat-file -p` and slice client-side; for large blobs we can switch to
-    # `git cat-file --batch` later.
-    result = run_command(["git", "cat-file", "-p", blob_sha], cwd=repo.path)
-    # If invalid sha, return empty bytes
-    if result.returncode != 0:
-        return b""
-    data = result.stdout.encode()
-    if offset > 0:
-        data = data[offset:]
-    if max_bytes is not None and len(data) > max_bytes:
-        return data[:max_bytes]
-    return data
+    found = read_blob(repo, blob_sha, max_bytes=max_bytes, offset=offset)
+    return found[0] if found is not None else b""
+
+
+def object_infos(repo: GitRepo, names: Sequence[str]) -> list[ObjectInfo | None]:
+    """Look up type and size for many objects through a pooled ``--batch-check`` process."""
+    if not names:
+        return []
+    try:
+        with get_cat_file_pool().worker(repo.path, "--batch-check") as worker:
+            return worker.info_many(names)
+    except (OSError, ValueError):
+        return [None] * len(names)
+
+
+class _MatchStream:
+    """Iterate ``path NUL line : text`` records from a search child process.
+
+    The child is killed as soon as the consumer stops iterating, so a caller that
+    only needs the first N matches never pays for the rest of the output. It counts
+    against its binary's process limit except while the iterator is suspended: a parked
+    stream's child just fills its pipe and waits, and must not starve other callers.
+    """
+
+    def __init__(
+        self, args: Sequence[str], cwd: Path, line_sep: bytes, strip_prefix: str = ""
+    ) -> None:
+        self.args = list(args)
+        self.cwd = cwd
+        self.line_sep = line_sep
+        self.strip_prefix = strip_prefix.encode("utf-8")
+        self.returncode: int | None = None
+
+    def __iter__(self) -> Generator[tuple[str, int, str], None, None]:
+        slot = process_slot(self.args[0])
+        slot.acquire()
+        held = True
+        try:
+            with subprocess_timer(self.args[0]):
+                proc = subprocess.Popen(
+                    self.args,
+                    cwd=str(self.cwd),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                )
+                assert proc.stdout is not None
+                try:
+                    for raw in proc.stdout:
+                        match = self._parse(raw)
+                        if match is not None:
+                            slot.release()
+                            held = False
+                            yield match
+                            slot.acquire()
+                            held = True
+                    self.returncode = proc.wait()
+                finally:
+                    if proc.poll() is None:
+                        proc.kill()
+                        proc.wait()
+                    proc.stdout.close()
+        finally:
+            if held:
+                slot.release()
+
+    def _parse(self, raw: bytes) -> tuple[str, int, str] | None:
+        try:
+            path, rest = raw.rstrip(b"\r\n").split(b"\x00", 1)
+            lineno, excerpt = rest.split(self.line_sep, 1)
+            if self.strip_prefix and path.startswith(self.strip_prefix):
+                path = path[len(self.strip_prefix) :]
+            return (
+                path.decode("utf-8", errors="replace"),
+                int(lineno),
+                excerpt.decode("utf-8", errors="replace"),
+            )
+        except ValueError:
+            return None
+
+
+def _grep_threads() -> int:
+    return max(1, min(os.cpu_count() or 1, 8))
+
+
+def grep_iter(
+    repo: GitRepo,
+    pattern: str,
+    paths: Iterable[str] | None = None,
+    *,
+    ref: str | None = None,
+) -> Generator[tuple[str, int, str], None, None]:
+    """Stream (path, line, excerpt) matches using ripgrep if available, else git grep.
+
+    With ``ref`` (a full object ID, e.g. from ``rev_parse``), searches that tree-ish
+    straight from the object store using ``git grep --threads`` (no checkout needed);
+    otherwise searches the working tree.
+    Output is ordered by path so that a count of consumed matches is a stable resume
+    point; a reopened stream skips ahead by that count. That costs ripgrep its
+    parallelism (``--sort path`` runs it on one thread), but an unordered stream would
+    repeat and drop matches across pages. Closing the iterator terminates the
+    underlying process.
+    """
+    targets = list(paths) if paths else []
+    if ref is not None:
+        # git grep only accepts --end-of-options from git 2.44 on; an object ID can never
+        # be mistaken for an option, so require one instead
+        if not is_object_id(ref):
+            raise ValueError(f"Invalid ref for search: {ref!r} is not an object ID")
+        yield from _MatchStream(
+            ["git", "grep", "-n", "-z", f"--threads={_grep_threads()}", "-e", pattern, ref]
+            + ["--", *targets],
+            repo.path,
+            b"\x00",
+            strip_prefix=f"{ref}:",
+        )
+        return
+    targets = targets or ["."]
+    if shutil.which("rg"):
+        rg = _MatchStream(
+            ["rg", "-n", "--null", "--no-heading", "--color", "never", "--sort", "path"]
+            + ["-e", pattern, "--", *targets],
+            repo.path,
+            b":",
+        )
+        produced = False
+        stream = iter(rg)
+        try:
+            for match in stream:
+                produced = True
+                yield match
+        finally:
+            # Propagate early termination to the child process immediately
+            stream.close()
+        if produced or rg.returncode in (0, 1):  # 0=matches, 1=no matches
+            return
+        # Other rg errors (e.g. unsupported regex syntax) fall back to git grep
+    # Fallback: git grep (support working tree via --no-index)
+    yield from _MatchStream(
+        ["git", "grep", "--no-index", "-n", "-z", "-e", pattern, "--", *targets],
+        repo.path,
+        b"\x00",
+    )
 
 
 def grep(
@@ -141,47 +404,29 @@ def grep(
 
     Returns list of (path, line, excerpt).
     """
-    # Prefer ripgrep (rg) if available for speed
-    try:
-        rg_args: list[str] = ["rg", "-n", "--no-heading", "--color", "never", pattern]
-        if paths:
-            rg_args.extend(list(paths))
-        else:
-            rg_args.append(".")
-        rg_result = run_command(rg_args, cwd=repo.path)
-        if rg_result.returncode in (0, 1):  # 0=matches, 1=no matches
-            matches: list[tuple[str, int, str]] = []
-            for line in rg_result.stdout.splitlines():
-                # rg format: file:line:col:excerpt
-                parts = line.split(":", 3)
-                if len(parts) >= 4:
-                    file_path, lineno, _col, excerpt = parts[0], parts[1], parts[2], parts[3]
-                elif len(parts) >= 3:
-                    file_path, lineno, excerpt = parts[0], parts[1], parts[2]
-                else:
-                    continue
-                try:
-                    matches.append((file_path, int(lineno), excerpt))
-                except Exception:
-                    continue
-            return matches
-        # If rg returns other error, fall back to git grep
-    except FileNotFoundError:
-        pass
+    return list(grep_iter(repo, pattern, paths))
 
-    # Fallback: git grep (support working tree via --no-index)
-    gg_args = ["git", "grep", "--no-index", "-n", pattern]
-    if paths:
-        gg_args.extend(paths)
-    else:
-        gg_args.append(".")
-    gg_result = run_command(gg_args, cwd=repo.path)
-    matches2: list[tuple[str, int, str]] = []
-    for line in gg_result.stdout.splitlines():
-        try:
-            file_path, lineno, excerpt = line.split(":", 2)
-            matches2.append((file_path, int(lineno), excerpt))
-        except Exception:
-            continue
-    matches2.sort(key=lambda t: (t[0], t[1]))
-    return matches2
+
+# --- Async variants: same results, awaiting the git child instead of blocking on it ---
+
+
+async def _read_git_async(repo: GitRepo, args: list[str]) -> CommandResult:
+    return await run_command_async(args, cwd=repo.path)
+
+
+async def rev_parse_async(repo: GitRepo, ref: str = "HEAD") -> str | None:
+    args = _rev_parse_args(ref)
+    return _object_id(await _read_git_async(repo, args)) if args is not None else None
+
+
+async def get_remote_origin_url_async(repo: GitRepo) -> str | None:
+    return _first_line(await _read_git_async(repo, _ORIGIN_URL_ARGS))
+
+
+async def current_branch_async(repo: GitRepo) -> str | None:
+    return _branch_name(await _read_git_async(repo, _CURRENT_BRANCH_ARGS))
+
+
+async def default_branch_async(repo: GitRepo) -> str | None:
+    branch = _origin_head_branch(await _read_git_async(repo, _ORIGIN_HEAD_ARGS))
+    return branch or await current_branch_async(repo)
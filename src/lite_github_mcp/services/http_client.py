@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import atexit
+import importlib.util
+import json
+import os
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import httpx
+
+from lite_github_mcp.utils.subprocess import run_command
+
+_DEFAULT_API_URL = "https://api.github.com"
+_TIMEOUT_SECONDS = 30.0
+_MAX_CONNECTIONS = 16
+_TRANSPORTS = {"auto", "http", "gh"}
+
+
+@dataclass(frozen=True)
+class ApiResponse:
+    status: int
+    headers: dict[str, str]  # lower-cased names
+    body: str
+
+    def json(self) -> Any:
+        return json.loads(self.body) if self.body.strip() else None
+
+
+def http_transport() -> str:
+    # auto: native HTTP when a token is available, else gh; http/gh force one
+    mode = (os.environ.get("LGMCP_HTTP_TRANSPORT") or "auto").lower()
+    return mode if mode in _TRANSPORTS else "auto"
+
+
+def api_base_url() -> str:
+    return os.environ.get("LGMCP_GITHUB_API_URL") or _DEFAULT_API_URL
+
+
+_TOKEN_LOCK = threading.Lock()
+_TOKEN_RESOLVED = False
+_TOKEN: str | None = None
+
+
+def resolve_token() -> str | None:
+    """Return the token ``gh`` would use: GH_TOKEN/GITHUB_TOKEN, else ``gh auth token``."""
+    global _TOKEN, _TOKEN_RESOLVED
+    env_token = os.environ.get("GH_TOKEN") or os.environ.get("GITHUB_TOKEN")
+    if env_token:
+        return env_token
+    with _TOKEN_LOCK:
+        if not _TOKEN_RESOLVED:
+            try:
+                res = run_command(["gh", "auth", "token"])
+                _TOKEN = (res.stdout.strip() or None) if res.returncode == 0 else None
+            except OSError:
+                _TOKEN = None
+            _TOKEN_RESOLVED = True
+        return _TOKEN
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+class GitHubHttpClient:
+    """Keep-alive, connection-pooled client for the GitHub REST API.
+
+    Connections (and TLS sessions) are reused across requests; HTTP/2 is negotiated
+    when the optional ``h2`` package is installed.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        token: str,
+        timeout: float = _TIMEOUT_SECONDS,
+        max_connections: int = _MAX_CONNECTIONS,
+    ) -> None:
+        self._client = httpx.Client(
+            base_url=base_url,
+            http2=_http2_available(),
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections, max_keepalive_connections=max_connections
+            ),
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Accept": "application/vnd.github+json",
+                "User-Agent": "lite-github-mcp",
+            },
+        )
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        headers: Sequence[tuple[str, str]] = (),
+        json_body: Any | None = None,
+    ) -> ApiResponse:
+        resp = self._client.request(method, path.lstrip("/"), headers=list(headers), json=json_body)
+        return ApiResponse(
+            status=resp.status_code,
+            headers={k.lower(): v for k, v in resp.headers.items()},
+            body=resp.text,
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+
+_GLOBAL_CLIENT: GitHubHttpClient | None = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_http_client() -> GitHubHttpClient | None:
+    """Shared client, or None when requests should go through the ``gh`` CLI."""
+    global _GLOBAL_CLIENT
+    if http_transport() == "gh":
+        return None
+    with _CLIENT_LOCK:
+        if _GLOBAL_CLIENT is None:
+            token = resolve_token()
+            if not token:
+                return None
+            _GLOBAL_CLIENT = GitHubHttpClient(api_base_url(), token)
+            atexit.register(_GLOBAL_CLIENT.close)
+        return _GLOBAL_CLIENT
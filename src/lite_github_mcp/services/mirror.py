@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from lite_github_mcp.services.cache import _default_cache_dir
+from lite_github_mcp.services.git_batch import get_cat_file_pool
+from lite_github_mcp.services.git_cli import GitRepo, rev_parse
+from lite_github_mcp.utils.subprocess import run_command
+
+_DEFAULT_BASE_URL = "https://github.com"
+_DEFAULT_MAX_BYTES = 10 * 1024**3
+_DEFAULT_FETCH_INTERVAL = 60.0
+# Clones and fetches talk to the network; allow far longer than local git calls
+_NETWORK_TIMEOUT_SECONDS = 600.0
+# Marker touched on every use; its mtime orders mirrors for eviction
+_USED_MARKER = "lgmcp-last-used"
+_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+_MAX_PREFETCHED = 1024
+
+
+def parse_repo_slug(repo: str) -> tuple[str, str]:
+    owner, _, name = repo.partition("/")
+    for part in (owner, name):
+        if not _NAME_RE.match(part) or part in {".", ".."}:
+            raise ValueError("Invalid repo: expected owner/name")
+    return owner, name
+
+
+def _git_env() -> dict[str, str]:
+    # Never block on an interactive credential prompt
+    return {**os.environ, "GIT_TERMINAL_PROMPT": "0"}
+
+
+def _disk_usage(path: Path) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+    return total
+
+
+class MirrorStore:
+    """Bare, blobless (``--filter=blob:none``) clones of remote repositories.
+
+    Commits and trees are cloned up front and kept current with incremental fetches
+    (at most one per ``fetch_interval``); blobs are faulted in from the remote on first
+    read. When the mirrors together exceed ``max_bytes``, the least recently used
+    ones are deleted.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        base_url: str = _DEFAULT_BASE_URL,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        fetch_interval: float = _DEFAULT_FETCH_INTERVAL,
+    ) -> None:
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        self.max_bytes = max_bytes
+        self.fetch_interval = fetch_interval
+        self._fetched_at: dict[str, float] = {}
+        self._prefetched: set[tuple[str, str, tuple[str, ...]]] = set()
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, owner: str, name: str) -> Path:
+        return self.root / owner / f"{name}.git"
+
+    def url_for(self, owner: str, name: str) -> str:
+        return f"{self.base_url}/{owner}/{name}.git"
+
+    def exists(self, owner: str, name: str) -> bool:
+        return (self.path_for(owner, name) / "HEAD").exists()
+
+    def _repo_lock(self, path: Path) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(str(path), threading.Lock())
+
+    def open(self, owner: str, name: str) -> GitRepo:
+        """Return the mirror for ``owner/name``, cloning or fetching it as needed."""
+        path = self.path_for(owner, name)
+        grew = False
+        with self._repo_lock(path):
+            if not (path / "HEAD").exists():
+                self._clone(owner, name, path)
+                grew = True
+            elif time.monotonic() - self._fetched_at.get(str(path), float("-inf")) >= (
+                self.fetch_interval
+            ):
+                self._fetch(path)
+                grew = True
+            (path / _USED_MARKER).touch()
+        if grew:
+            self.enforce_budget(keep=path)
+        return GitRepo(path=path)
+
+    def _clone(self, owner: str, name: str, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Clone beside the final location and rename, so a failed clone leaves nothing
+        staging = Path(tempfile.mkdtemp(prefix=f".{name}-", dir=path.parent))
+        try:
+            result = run_command(
+                [
+                    "git",
+                    "clone",
+                    "--bare",
+                    "--quiet",
+                    "--filter=blob:none",
+                    self.url_for(owner, name),
+                    str(staging),
+                ],
+                timeout_seconds=_NETWORK_TIMEOUT_SECONDS,
+                env=_git_env(),
+            )
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr.strip() or "git clone failed")
+            # Bare clones carry no fetch refspec; track branches and tags for refresh
+            for refspec in ("+refs/heads/*:refs/heads/*", "+refs/tags/*:refs/tags/*"):
+                run_command(["git", "config", "--add", "remote.origin.fetch", refspec], cwd=staging)
+            os.replace(staging, path)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        self._fetched_at[str(path)] = time.monotonic()
+
+    def _fetch(self, path: Path) -> bool:
+        result = run_command(
+            ["git", "fetch", "--quiet", "--prune", "origin"],
+            cwd=path,
+            timeout_seconds=_NETWORK_TIMEOUT_SECONDS,
+            env=_git_env(),
+        )
+        # A failed refresh keeps serving the last fetched state until the next interval
+        self._fetched_at[str(path)] = time.monotonic()
+        return result.returncode == 0
+
+    def ensure_blobs(self, repo: GitRepo, ref: str, paths: list[str] | None = None) -> int:
+        """Fetch every blob under ``paths`` at ``ref`` that is still missing, in one batch.
+
+        Reading blobs one by one would fault each in with its own round trip; bulk
+        readers such as ``git grep`` call this first. Returns the number fetched.
+        """
+        commit = rev_parse(repo, f"{ref}^{{commit}}")
+        if commit is None:
+            return 0
+        key = (str(repo.path), commit, tuple(sorted(paths or [])))
+        if key in self._prefetched:
+            return 0
+        args = ["git", "ls-tree", "-r", "-z", commit]
+        if paths:
+            args.extend(["--", *paths])
+        wanted: set[str] = set()
+        for record in run_command(args, cwd=repo.path).stdout.split("\x00"):
+            fields = record.partition("\t")[0].split()
+            if len(fields) == 3 and fields[1] == "blob":
+                wanted.add(fields[2])
+        missing_out = run_command(
+            ["git", "rev-list", "--objects", "--no-walk", "--missing=print", commit],
+            cwd=repo.path,
+        )
+        missing = [
+            line[1:].strip()
+            for line in missing_out.stdout.splitlines()
+            if line.startswith("?") and line[1:].strip() in wanted
+        ]
+        if missing:
+            # Same invocation git itself uses to fault in promisor objects
+            result = run_command(
+                [
+                    "git",
+                    "-c",
+                    "fetch.negotiationAlgorithm=noop",
+                    "fetch",
+                    "origin",
+                    "--no-tags",
+                    "--no-write-fetch-head",
+                    "--recurse-submodules=no",
+                    "--filter=blob:none",
+                    "--stdin",
+                ],
+                cwd=repo.path,
+                timeout_seconds=_NETWORK_TIMEOUT_SECONDS,
+                env=_git_env(),
+                input_text="\n".join(missing) + "\n",
+            )
+            if result.returncode != 0:
+                return 0
+            self.enforce_budget(keep=repo.path)
+        with self._lock:
+            if len(self._prefetched) >= _MAX_PREFETCHED:
+                self._prefetched.clear()
+            self._prefetched.add(key)
+        return len(missing)
+
+    def enforce_budget(self, keep: Path | None = None) -> list[Path]:
+        """Delete least recently used mirrors until the store fits ``max_bytes``."""
+        mirrors: list[tuple[float, int, Path]] = []
+        for path in self.root.glob("*/*.git"):
+            marker = path / _USED_MARKER
+            used = marker.stat().st_mtime if marker.exists() else 0.0
+            mirrors.append((used, _disk_usage(path), path))
+        total = sum(size for _used, size, _path in mirrors)
+        evicted: list[Path] = []
+        for _used, size, path in sorted(mirrors):
+            if total <= self.max_bytes:
+                break
+            if keep is not None and path == keep:
+                continue
+            lock = self._repo_lock(path)
+            # Never pull a mirror out from under an in-flight clone or fetch
+            if not lock.acquire(blocking=False):
+                continue
+            try:
+                get_cat_file_pool().close_repo(path)
+                shutil.rmtree(path, ignore_errors=True)
+                self._fetched_at.pop(str(path), None)
+            finally:
+                lock.release()
+            total -= size
+            evicted.append(path)
+        return evicted
+
+
+_GLOBAL_MIRRORS: MirrorStore | None = None
+
+
+def get_mirror_store() -> MirrorStore:
+    global _GLOBAL_MIRRORS
+    if _GLOBAL_MIRRORS is None:
+        root = os.environ.get("LGMCP_MIRROR_DIR")
+        _GLOBAL_MIRRORS = MirrorStore(
+            root=Path(root) if root else _default_cache_dir() / "mirrors",
+            base_url=os.environ.get("LGMCP_MIRROR_BASE_URL") or _DEFAULT_BASE_URL,
+            max_bytes=int(os.environ.get("LGMCP_MIRROR_MAX_BYTES") or _DEFAULT_MAX_BYTES),
+            fetch_interval=float(
+                os.environ.get("LGMCP_MIRROR_FETCH_INTERVAL") or _DEFAULT_FETCH_INTERVAL
+            ),
+        )
+    return _GLOBAL_MIRRORS
@@ -2,25 +2,52 @@ from __future__ import annotations
 
 import base64
 import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Generic, TypeVar
 
 CURSOR_VERSION = "v1"
 
+T = TypeVar("T")
+
+# Snapshot store bounds: entry count, total items across entries, and age
+_SNAPSHOT_MAX_ENTRIES = 128
+_SNAPSHOT_MAX_ITEMS = 500_000
+_SNAPSHOT_TTL_SECONDS = 600.0
+_STREAM_MAX_ENTRIES = 16
+_STREAM_TTL_SECONDS = 120.0
+
 
 @dataclass(frozen=True)
 class PageCursor:
     index: int
     filters: dict[str, Any]
     version: str = CURSOR_VERSION
+    snapshot: str | None = None
+    # Opaque resume point of a server-side paginated source (e.g. a REST Link URL)
+    upstream: dict[str, Any] | None = None
 
 
-def encode_cursor(index: int, *, filters: dict[str, Any] | None = None) -> str:
-    payload = {
+def encode_cursor(
+    index: int,
+    *,
+    filters: dict[str, Any] | None = None,
+    snapshot: str | None = None,
+    upstream: dict[str, Any] | None = None,
+) -> str:
+    payload: dict[str, Any] = {
         "index": int(index),
         "filters": filters or {},
         "version": CURSOR_VERSION,
     }
+    if snapshot:
+        payload["snapshot"] = snapshot
+    if upstream:
+        payload["upstream"] = upstream
     raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
     return base64.b64encode(raw).decode("ascii")
 
@@ -31,6 +58,295 @@ def decode_cursor(cursor: str | None) -> PageCursor:
     try:
         raw = base64.b64decode(cursor.encode("ascii"))
         obj = json.loads(raw)
-        return PageCursor(index=int(obj.get("index", 0)), filters=dict(obj.get("filters", {})))
+        snapshot = obj.get("snapshot")
+        upstream = obj.get("upstream")
+        return PageCursor(
+            index=int(obj.get("index", 0)),
+            filters=dict(obj.get("filters", {})),
+            snapshot=str(snapshot) if snapshot else None,
+            upstream=dict(upstream) if isinstance(upstream, dict) else None,
+        )
     except Exception:
         return PageCursor(index=0, filters={})
+
+
+@dataclass
+class _Snapshot:
+    key: str
+    value: Any
+    weight: int
+    expires_at: float
+
+
+class SnapshotStore:
+    """Bounded, TTL-evicted store of materialized result sets referenced by cursors.
+
+    A snapshot is bound to the query key it was taken for, so a cursor replayed
+    against a different query falls back to recomputing instead of serving rows
+    from someone else's result set. Values with a ``close()`` method (live result
+    streams) are closed when evicted. Expired entries are dropped on the next use of
+    the store, or with ``reap_expired`` by a timer as soon as they expire.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = _SNAPSHOT_MAX_ENTRIES,
+        max_items: int = _SNAPSHOT_MAX_ITEMS,
+        ttl_seconds: float = _SNAPSHOT_TTL_SECONDS,
+        *,
+        reap_expired: bool = False,
+    ) -> None:
+        self._max_entries = max_entries
+        self._max_items = max_items
+        self._ttl = ttl_seconds
+        self._entries: OrderedDict[str, _Snapshot] = OrderedDict()
+        self._items = 0
+        self._lock = threading.Lock()
+        self._reap = reap_expired
+        self._reaper: threading.Timer | None = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _drop(self, snapshot_id: str, dropped: list[Any]) -> None:
+        snap = self._entries.pop(snapshot_id, None)
+        if snap is not None:
+            self._items -= snap.weight
+            dropped.append(snap.value)
+
+    def _evict(self, now: float, dropped: list[Any], keep: str | None = None) -> None:
+        for snapshot_id in [s for s, snap in self._entries.items() if snap.expires_at <= now]:
+            self._drop(snapshot_id, dropped)
+        # Oldest first, never the entry being stored
+        for snapshot_id in [s for s in self._entries if s != keep]:
+            if len(self._entries) <= self._max_entries and self._items <= self._max_items:
+                break
+            self._drop(snapshot_id, dropped)
+
+    def _schedule_reap(self) -> None:
+        # Called with the lock held; one timer at a time, armed for the earliest expiry
+        if not self._reap or self._reaper is not None or not self._entries:
+            return
+        due = min(snap.expires_at for snap in self._entries.values())
+        timer = threading.Timer(max(due - time.monotonic(), 0.0), self._reap_expired)
+        timer.daemon = True
+        self._reaper = timer
+        timer.start()
+
+    def _reap_expired(self) -> None:
+        dropped: list[Any] = []
+        with self._lock:
+            self._reaper = None
+            self._evict(time.monotonic(), dropped)
+            self._schedule_reap()
+        self._close(dropped)
+
+    @staticmethod
+    def _close(values: list[Any]) -> None:
+        # Close outside the store lock; closing a stream may wait on its consumer
+        for value in values:
+            close = getattr(value, "close", None)
+            if callable(close):
+                close()
+
+    def put(self, key: str, value: Any, *, weight: int | None = None) -> str | None:
+        """Store ``value`` and return its snapshot ID.
+
+        Returns None without storing anything when ``value`` alone outweighs the
+        store; evicting every other snapshot to make room would still not fit it.
+        """
+        size = len(value) if weight is None else weight
+        if size > self._max_items:
+            return None
+        snapshot_id = secrets.token_hex(8)
+        now = time.monotonic()
+        dropped: list[Any] = []
+        with self._lock:
+            self._entries[snapshot_id] = _Snapshot(key, value, size, now + self._ttl)
+            self._items += size
+            self._evict(now, dropped, keep=snapshot_id)
+            self._schedule_reap()
+        self._close(dropped)
+        return snapshot_id
+
+    def get(self, snapshot_id: str, key: str) -> Any | None:
+        now = time.monotonic()
+        dropped: list[Any] = []
+        with self._lock:
+            snap = self._entries.get(snapshot_id)
+            if snap is None or snap.key != key:
+                return None
+            if snap.expires_at <= now:
+                self._drop(snapshot_id, dropped)
+                value = None
+            else:
+                self._entries.move_to_end(snapshot_id)
+                value = snap.value
+        self._close(dropped)
+        return value
+
+    def discard(self, snapshot_id: str) -> None:
+        dropped: list[Any] = []
+        with self._lock:
+            self._drop(snapshot_id, dropped)
+        self._close(dropped)
+
+
+_GLOBAL_SNAPSHOTS: SnapshotStore | None = None
+_GLOBAL_STREAMS: SnapshotStore | None = None
+
+
+def get_snapshot_store() -> SnapshotStore:
+    global _GLOBAL_SNAPSHOTS
+    if _GLOBAL_SNAPSHOTS is None:
+        _GLOBAL_SNAPSHOTS = SnapshotStore()
+    return _GLOBAL_SNAPSHOTS
+
+
+def get_stream_store() -> SnapshotStore:
+    # Live streams pin a child process each; keep far fewer of them, for less time, and
+    # close them when they expire even if no other search comes along
+    global _GLOBAL_STREAMS
+    if _GLOBAL_STREAMS is None:
+        _GLOBAL_STREAMS = SnapshotStore(
+            max_entries=_STREAM_MAX_ENTRIES, ttl_seconds=_STREAM_TTL_SECONDS, reap_expired=True
+        )
+    return _GLOBAL_STREAMS
+
+
+@dataclass(frozen=True)
+class Page(Generic[T]):
+    items: list[T]
+    has_next: bool
+    next_cursor: str | None
+
+
+def paginate(
+    load: Callable[[], Sequence[T]],
+    *,
+    key: str,
+    cursor: str | None,
+    limit: int | None,
+    store: SnapshotStore | None = None,
+) -> Page[T]:
+    """Slice one page out of a result set, materializing it at most once per walk.
+
+    The first page calls ``load`` and, when more pages remain, parks the full result
+    in the snapshot store; the returned cursor carries the snapshot ID so later pages
+    are plain slices of the same (stable) result. An expired or unknown snapshot
+    falls back to ``load`` at the cursor's offset.
+    """
+    store = store if store is not None else get_snapshot_store()
+    decoded = decode_cursor(cursor)
+    start = max(decoded.index, 0)
+    snapshot = decoded.snapshot
+    items: Sequence[T] | None = store.get(snapshot, key) if snapshot else None
+    if items is None:
+        items = load()
+        snapshot = None
+    end = start + (limit or len(items))
+    page = list(items[start:end])
+    has_next = end < len(items)
+    if has_next and snapshot is None:
+        snapshot = store.put(key, items)
+    next_cur = encode_cursor(end, snapshot=snapshot) if has_next else None
+    return Page(items=page, has_next=has_next, next_cursor=next_cur)
+
+
+_END: Any = object()
+
+
+class _LiveStream(Generic[T]):
+    """A partially consumed iterator parked between pages, with one item of lookahead."""
+
+    def __init__(self, iterator: Iterator[T]) -> None:
+        self._it = iterator
+        self._ahead: Any = None
+        self.position = 0
+        self.lock = threading.Lock()
+
+    def _pull(self) -> Any:
+        if self._ahead is not None:
+            item, self._ahead = self._ahead, None
+            return item
+        return next(self._it, _END)
+
+    def skip(self, count: int) -> None:
+        while self.position < count and self._pull() is not _END:
+            self.position += 1
+
+    def take(self, limit: int | None) -> list[T]:
+        items: list[T] = []
+        while limit is None or len(items) < limit:
+            item = self._pull()
+            if item is _END:
+                break
+            items.append(item)
+        self.position += len(items)
+        return items
+
+    def has_more(self) -> bool:
+        if self._ahead is None:
+            self._ahead = next(self._it, _END)
+        return self._ahead is not _END
+
+    def close(self) -> None:
+        with self.lock:
+            close = getattr(self._it, "close", None)
+            if callable(close):
+                close()
+
+
+def paginate_stream(
+    open_stream: Callable[[], Iterator[T]],
+    *,
+    key: str,
+    cursor: str | None,
+    limit: int | None,
+    store: SnapshotStore | None = None,
+) -> Page[T]:
+    """Page through a lazily produced result without ever materializing all of it.
+
+    Only ``limit + 1`` items are pulled per page (the extra one answers ``has_next``).
+    The cursor's index is the resume point: the live iterator is parked in the stream
+    store under the cursor's snapshot ID and continued on the next page; if it was
+    evicted, a fresh stream is opened and advanced to the index.
+    """
+    store = store if store is not None else get_stream_store()
+    decoded = decode_cursor(cursor)
+    start = max(decoded.index, 0)
+    snapshot = decoded.snapshot
+    live: _LiveStream[T] | None = None
+    parked = store.get(snapshot, key) if snapshot else None
+    if isinstance(parked, _LiveStream) and parked.lock.acquire(blocking=False):
+        if parked.position == start:
+            live = parked
+        else:
+            parked.lock.release()
+    if live is None:
+        live = _LiveStream(open_stream())
+        live.lock.acquire()
+        snapshot = None
+    try:
+        live.skip(start)
+        items = live.take(limit)
+        has_next = live.has_more()
+    finally:
+        live.lock.release()
+    if not has_next:
+        if snapshot:
+            store.discard(snapshot)
+        else:
+            live.close()
+        return Page(items=items, has_next=False, next_cursor=None)
+    if snapshot is None:
+        snapshot = store.put(key, live, weight=1)
+        if snapshot is None:
+            # Not parked; the next page reopens the stream at the cursor's index
+            live.close()
+    return Page(
+        items=items,
+        has_next=True,
+        next_cursor=encode_cursor(live.position, snapshot=snapshot),
+    )
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from lite_github_mcp.utils.metrics import set_rate_limit
+
+# Request priorities: user-initiated writes may spend the last of the budget, ordinary
+# reads keep a small reserve for them, background work (revalidation, prefetch) a large one
+HIGH = 0
+NORMAL = 1
+LOW = 2
+_RESERVE_FRACTION = {HIGH: 0.0, NORMAL: 0.02, LOW: 0.25}
+
+# Below this share of the budget, requests are spread evenly until the reset
+_PACE_FRACTION = 0.1
+# Longest a call will wait for its paced slot; beyond it the caller gets RATE_LIMIT
+_MAX_PACE_SECONDS = 1.0
+# Secondary limits without Retry-After: GitHub asks clients to wait at least a minute
+_SECONDARY_RETRY_AFTER = 60.0
+
+_PRIORITY: contextvars.ContextVar[int] = contextvars.ContextVar("lgmcp_priority", default=NORMAL)
+
+
+class RateLimitError(Exception):
+    """The request would exceed (or has hit) a GitHub rate limit."""
+
+    def __init__(self, resource: str, retry_after: float, message: str | None = None) -> None:
+        self.resource = resource
+        self.retry_after = max(0.0, round(retry_after, 1))
+        super().__init__(
+            message or f"RATE_LIMIT: {resource} budget exhausted; retry after {self.retry_after}s"
+        )
+
+
+@contextlib.contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run the enclosed GitHub calls at ``priority`` (HIGH, NORMAL or LOW)."""
+    token = _PRIORITY.set(priority)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def resource_for_path(path: str) -> str:
+    path = path.lstrip("/")
+    if path == "graphql" or path.startswith("graphql?"):
+        return "graphql"
+    if path.startswith("search/"):
+        return "search"
+    return "core"
+
+
+def resource_for_args(args: list[str]) -> str:
+    # `gh pr|issue ...` subcommands are implemented on top of the GraphQL API
+    if args and args[0] == "api":
+        return resource_for_path(args[1]) if len(args) > 1 else "core"
+    return "graphql"
+
+
+@dataclass
+class _Budget:
+    limit: int | None = None
+    remaining: int | None = None
+    reset: float | None = None  # epoch seconds
+    blocked_until: float = 0.0
+    next_slot: float = 0.0
+
+
+class RateLimiter:
+    """Process-wide view of the GitHub rate budget, one entry per resource.
+
+    Every response's ``x-ratelimit-*`` headers refresh the budget. Before a request,
+    ``acquire`` spends from it: it paces calls once the budget runs low, keeps a
+    reserve for higher priorities, and raises ``RateLimitError`` (with ``retry_after``)
+    rather than blocking when the budget is gone or a secondary limit is in force.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] | None = None,
+        sleep: Callable[[float], None] | None = None,
+    ) -> None:
+        self._clock = clock or time.time
+        self._sleep = sleep or time.sleep
+        self._budgets: dict[str, _Budget] = {}
+        self._lock = threading.Lock()
+
+    def _budget(self, resource: str) -> _Budget:
+        return self._budgets.setdefault(resource, _Budget())
+
+    def acquire(self, resource: str, priority: int | None = None) -> None:
+        prio = _PRIORITY.get() if priority is None else priority
+        with self._lock:
+            now = self._clock()
+            budget = self._budget(resource)
+            if budget.blocked_until > now:
+                raise RateLimitError(resource, budget.blocked_until - now)
+            if budget.reset is not None and budget.reset <= now:
+                # Window rolled over: the next response reports the fresh budget
+                budget.remaining = budget.limit
+                budget.reset = None
+            if budget.remaining is None or budget.limit is None or budget.reset is None:
+                return
+            until_reset = budget.reset - now
+            reserve = int(budget.limit * _RESERVE_FRACTION.get(prio, 0.0))
+            if budget.remaining <= reserve:
+                raise RateLimitError(resource, until_reset)
+            delay = 0.0
+            if budget.remaining < budget.limit * _PACE_FRACTION:
+                interval = until_reset / budget.remaining
+                start = max(now, budget.next_slot)
+                delay = start - now
+                if delay > _MAX_PACE_SECONDS:
+                    raise RateLimitError(resource, delay)
+                budget.next_slot = start + interval
+            # Count the call now so concurrent callers see it before the response lands
+            budget.remaining -= 1
+        if delay > 0:
+            self._sleep(delay)
+
+    def update(self, headers: Mapping[str, str], resource: str | None = None) -> None:
+        """Record the budget reported by a response's (lower-cased) headers."""
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        name = headers.get("x-ratelimit-resource") or resource or "core"
+        with self._lock:
+            budget = self._budget(name)
+            try:
+                budget.remaining = int(remaining)
+                budget.limit = int(headers.get("x-ratelimit-limit") or budget.limit or 0) or None
+                reset = headers.get("x-ratelimit-reset")
+                budget.reset = float(reset) if reset else budget.reset
+            except ValueError:
+                return
+            set_rate_limit(name, budget.limit, budget.remaining, budget.reset)
+
+    def block(self, resource: str, retry_after: float | None) -> RateLimitError:
+        """Note a rate-limit response; later calls fail fast until it expires."""
+        wait = _SECONDARY_RETRY_AFTER if retry_after is None else retry_after
+        with self._lock:
+            budget = self._budget(resource)
+            budget.blocked_until = max(budget.blocked_until, self._clock() + wait)
+        return RateLimitError(resource, wait)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            now = self._clock()
+            out: dict[str, dict[str, Any]] = {}
+            for name, budget in sorted(self._budgets.items()):
+                out[name] = {
+                    "limit": budget.limit,
+                    "remaining": budget.remaining,
+                    "reset_in": (
+                        round(budget.reset - now, 1)
+                        if budget.reset is not None and budget.reset > now
+                        else None
+                    ),
+                    "blocked_for": (
+                        round(budget.blocked_until - now, 1) if budget.blocked_until > now else None
+                    ),
+                }
+            return out
+
+
+_GLOBAL_LIMITER: RateLimiter | None = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    global _GLOBAL_LIMITER
+    if _GLOBAL_LIMITER is None:
+        _GLOBAL_LIMITER = RateLimiter()
+    return _GLOBAL_LIMITER
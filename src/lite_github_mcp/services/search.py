@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+from lite_github_mcp.services.cache import get_cache, ttl_for_category
+from lite_github_mcp.services.git_cli import GitRepo, grep_iter, rev_parse
+from lite_github_mcp.services.pager import Page, decode_cursor, encode_cursor, paginate_stream
+from lite_github_mcp.services.trigram import candidate_paths
+
+Match = tuple[str, int, str]
+
+# Longest match prefix persisted per (commit, pattern, paths)
+_REF_CACHE_MAX_MATCHES = 10_000
+
+
+def _query_id(pattern: str, paths: list[str]) -> str:
+    raw = json.dumps([pattern, sorted(paths)], separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def search_page(
+    repo: GitRepo,
+    pattern: str,
+    paths: list[str] | None,
+    *,
+    ref: str | None,
+    cursor: str | None,
+    limit: int | None,
+) -> Page[Match]:
+    """Return one page of (path, line, excerpt) matches for the working tree or a ref."""
+    targets = list(paths or [])
+    if ref is None:
+        return paginate_stream(
+            lambda: grep_iter(repo, pattern=pattern, paths=targets),
+            key=f"search:{repo.path}:{json.dumps([pattern, targets])}",
+            cursor=cursor,
+            limit=limit,
+        )
+    commit = rev_parse(repo, f"{ref}^{{commit}}")
+    if commit is None:
+        return Page(items=[], has_next=False, next_cursor=None)
+    return _search_commit(repo, commit, pattern, targets, cursor=cursor, limit=limit)
+
+
+def _search_commit(
+    repo: GitRepo,
+    commit: str,
+    pattern: str,
+    paths: list[str],
+    *,
+    cursor: str | None,
+    limit: int | None,
+) -> Page[Match]:
+    # A commit's tree never changes, so the matches for (commit, pattern, paths) can
+    # be cached indefinitely. Pages are cached as a growing prefix of the full match
+    # list; `complete` marks that the prefix is the whole result.
+    cache = get_cache()
+    cache_key = f"grep:{commit}:{_query_id(pattern, paths)}"
+    start = max(decode_cursor(cursor).index, 0)
+    cached: Any = cache.get_json(cache_key, "blobs")
+    prefix: list[Match] = []
+    complete = False
+    if isinstance(cached, dict):
+        prefix = [(str(p), int(ln), str(ex)) for p, ln, ex in cached.get("matches", [])]
+        complete = bool(cached.get("complete"))
+    if complete or (limit is not None and len(prefix) > start + limit):
+        end = start + (limit or len(prefix))
+        has_next = end < len(prefix)
+        return Page(
+            items=prefix[start:end],
+            has_next=has_next,
+            next_cursor=encode_cursor(end) if has_next else None,
+        )
+
+    # With a ready trigram index, only files holding every required trigram are read
+    narrowed = candidate_paths(repo, commit, pattern, paths)
+    if narrowed is not None and not narrowed:
+        cache.set_json(
+            cache_key,
+            {"matches": [], "complete": True},
+            ttl_for_category("blobs"),
+            category="blobs",
+        )
+        return Page(items=[], has_next=False, next_cursor=None)
+    page = paginate_stream(
+        lambda: grep_iter(repo, pattern=pattern, paths=narrowed or paths, ref=commit),
+        key=f"search@{commit}:{cache_key}",
+        cursor=cursor,
+        limit=limit,
+    )
+    if len(prefix) == start and start + len(page.items) <= _REF_CACHE_MAX_MATCHES:
+        cache.set_json(
+            cache_key,
+            {"matches": prefix + page.items, "complete": not page.has_next},
+            ttl_for_category("blobs"),
+            category="blobs",
+        )
+    return page
@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import overload
+
+from lite_github_mcp.services.cache import _default_cache_dir
+from lite_github_mcp.services.git_cli import (
+    GitRepo,
+    TreeItem,
+    is_object_id,
+    is_partial_clone,
+    ls_tree,
+    object_infos,
+    rev_parse,
+)
+from lite_github_mcp.utils.subprocess import run_command
+
+# On-disk format: magic + zlib(header, raw oids, modes, sizes, NUL-joined paths)
+_MAGIC = b"LGTI\x01"
+_HEADER = struct.Struct("<II")  # entry count, oid length in bytes
+_MAX_LOADED = 16
+_MAX_RESOLVED = 4096
+
+
+def _type_for_mode(mode: str) -> str:
+    if mode == "160000":
+        return "commit"
+    if mode == "040000":
+        return "tree"
+    return "blob"
+
+
+@dataclass(frozen=True)
+class TreeIndex:
+    """Immutable listing of a tree object, sorted by path.
+
+    Columns are parallel lists so that prefix filtering is a pair of bisects and a
+    page is a slice; ``sizes`` uses -1 for entries without a blob size.
+    """
+
+    tree: str
+    paths: list[str]
+    oids: list[str]
+    modes: list[str]
+    sizes: list[int]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def item(self, i: int) -> TreeItem:
+        mode = self.modes[i]
+        size = self.sizes[i]
+        return TreeItem(
+            path=self.paths[i],
+            mode=mode,
+            type=_type_for_mode(mode),
+            oid=self.oids[i],
+            size=size if size >= 0 else None,
+        )
+
+    def select(self, base_path: str | None = None) -> range:
+        """Return the positions of entries at or below ``base_path`` (all when empty)."""
+        base = (base_path or "").strip("/")
+        if not base:
+            return range(len(self.paths))
+        exact = bisect_left(self.paths, base)
+        if exact < len(self.paths) and self.paths[exact] == base:
+            # A tree cannot hold both a file and a directory with the same name
+            return range(exact, exact + 1)
+        # "/" sorts immediately before "0", so children form one contiguous run
+        lo = bisect_left(self.paths, base + "/")
+        return range(lo, bisect_left(self.paths, base + "0", lo))
+
+    def view(self, base_path: str | None = None) -> TreeView:
+        return TreeView(self, self.select(base_path))
+
+    @classmethod
+    def from_items(cls, tree: str, items: list[TreeItem]) -> TreeIndex:
+        ordered = sorted(items, key=lambda it: it.path)
+        return cls(
+            tree=tree,
+            paths=[it.path for it in ordered],
+            oids=[it.oid for it in ordered],
+            modes=[it.mode for it in ordered],
+            sizes=[it.size if it.size is not None else -1 for it in ordered],
+        )
+
+    def to_bytes(self) -> bytes:
+        oid_len = len(self.oids[0]) // 2 if self.oids else 20
+        modes = array("I", (int(m, 8) for m in self.modes))
+        sizes = array("q", self.sizes)
+        if sys.byteorder == "big":
+            modes.byteswap()
+            sizes.byteswap()
+        raw = b"".join(
+            [
+                _HEADER.pack(len(self.paths), oid_len),
+                bytes.fromhex("".join(self.oids)),
+                modes.tobytes(),
+                sizes.tobytes(),
+                "\x00".join(self.paths).encode("utf-8", "surrogateescape"),
+            ]
+        )
+        return _MAGIC + zlib.compress(raw)
+
+    @classmethod
+    def from_bytes(cls, tree: str, blob: bytes) -> TreeIndex:
+        if not blob.startswith(_MAGIC):
+            raise ValueError("not a tree index")
+        raw = zlib.decompress(blob[len(_MAGIC) :])
+        count, oid_len = _HEADER.unpack_from(raw)
+        pos = _HEADER.size
+        oid_blob = raw[pos : pos + count * oid_len]
+        pos += count * oid_len
+        modes = array("I")
+        modes.frombytes(raw[pos : pos + count * modes.itemsize])
+        pos += count * modes.itemsize
+        sizes = array("q")
+        sizes.frombytes(raw[pos : pos + count * sizes.itemsize])
+        pos += count * sizes.itemsize
+        if sys.byteorder == "big":
+            modes.byteswap()
+            sizes.byteswap()
+        paths_text = raw[pos:].decode("utf-8", "surrogateescape")
+        return cls(
+            tree=tree,
+            paths=paths_text.split("\x00") if count else [],
+            oids=[oid_blob[i : i + oid_len].hex() for i in range(0, len(oid_blob), oid_len)],
+            modes=[format(m, "06o") for m in modes],
+            sizes=list(sizes),
+        )
+
+
+class TreeView(Sequence[TreeItem]):
+    """Lazy sequence of TreeItems over a contiguous run of a TreeIndex."""
+
+    def __init__(self, index: TreeIndex, positions: range) -> None:
+        self._index = index
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @overload
+    def __getitem__(self, i: int) -> TreeItem: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[TreeItem]: ...
+
+    def __getitem__(self, i: int | slice) -> TreeItem | list[TreeItem]:
+        if isinstance(i, slice):
+            return [self._index.item(pos) for pos in self._positions[i]]
+        return self._index.item(self._positions[i])
+
+
+class TreeIndexStore:
+    """Tree indexes keyed by tree object ID: an in-memory LRU over files on disk."""
+
+    def __init__(self, path: Path, max_loaded: int = _MAX_LOADED) -> None:
+        self.path = path
+        self._max_loaded = max_loaded
+        self._loaded: OrderedDict[str, TreeIndex] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _file_for(self, tree: str) -> Path:
+        return self.path / tree[:2] / f"{tree[2:]}.idx"
+
+    def _remember(self, index: TreeIndex) -> None:
+        with self._lock:
+            self._loaded[index.tree] = index
+            self._loaded.move_to_end(index.tree)
+            while len(self._loaded) > self._max_loaded:
+                self._loaded.popitem(last=False)
+
+    def get(self, tree: str) -> TreeIndex | None:
+        with self._lock:
+            index = self._loaded.get(tree)
+            if index is not None:
+                self._loaded.move_to_end(tree)
+                return index
+        try:
+            index = TreeIndex.from_bytes(tree, self._file_for(tree).read_bytes())
+        except (OSError, ValueError, zlib.error, struct.error):
+            return None
+        self._remember(index)
+        return index
+
+    def put(self, index: TreeIndex) -> None:
+        self._remember(index)
+        target = self._file_for(index.tree)
+        try:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(index.to_bytes())
+            os.replace(tmp, target)
+        except OSError:
+            # Disk persistence is best-effort; the in-memory copy still serves lookups
+            pass
+
+
+_GLOBAL_STORE: TreeIndexStore | None = None
+# Full commit/tree SHAs never change what they point at; memoize their tree IDs
+_RESOLVED: OrderedDict[tuple[str, str], str] = OrderedDict()
+_RESOLVED_LOCK = threading.Lock()
+
+
+def get_tree_index_store() -> TreeIndexStore:
+    global _GLOBAL_STORE
+    if _GLOBAL_STORE is None:
+        _GLOBAL_STORE = TreeIndexStore(path=_default_cache_dir() / "trees")
+    return _GLOBAL_STORE
+
+
+def resolve_tree(repo: GitRepo, ref: str) -> str | None:
+    key = (str(repo.path), ref)
+    if is_object_id(ref):
+        with _RESOLVED_LOCK:
+            cached = _RESOLVED.get(key)
+        if cached is not None:
+            return cached
+    tree = rev_parse(repo, f"{ref}^{{tree}}")
+    if tree is not None and is_object_id(ref):
+        with _RESOLVED_LOCK:
+            _RESOLVED[key] = tree
+            while len(_RESOLVED) > _MAX_RESOLVED:
+                _RESOLVED.popitem(last=False)
+    return tree
+
+
+def _parent_tree(repo: GitRepo, ref: str) -> str | None:
+    return rev_parse(repo, f"{ref}^{{commit}}^1^{{tree}}")
+
+
+def _derive_from_parent(repo: GitRepo, parent: TreeIndex, tree: str) -> TreeIndex | None:
+    result = run_command(
+        ["git", "diff-tree", "-r", "-z", "--no-renames", "--raw", parent.tree, tree],
+        cwd=repo.path,
+    )
+    if result.returncode != 0:
+        return None
+    fields = result.stdout.split("\x00")
+    entries: dict[str, tuple[str, str, int]] = {
+        p: (parent.modes[i], parent.oids[i], parent.sizes[i]) for i, p in enumerate(parent.paths)
+    }
+    pending: dict[str, tuple[str, str]] = {}
+    for meta, path in zip(fields[0::2], fields[1::2], strict=False):
+        if not meta.startswith(":"):
+            continue
+        try:
+            _src_mode, dst_mode, _src_oid, dst_oid, status = meta[1:].split(" ")
+        except ValueError:
+            return None
+        if status.startswith("D"):
+            entries.pop(path, None)
+            pending.pop(path, None)
+        else:
+            pending[path] = (dst_mode, dst_oid)
+    blob_oids = sorted({oid for mode, oid in pending.values() if _type_for_mode(mode) == "blob"})
+    if is_partial_clone(repo):
+        # Sizes of blobs that were never fetched are unknown without faulting them in
+        blob_oids = []
+    sizes = {
+        oid: info.size
+        for oid, info in zip(blob_oids, object_infos(repo, blob_oids), strict=True)
+        if info is not None
+    }
+    for path, (mode, oid) in pending.items():
+        entries[path] = (mode, oid, sizes.get(oid, -1))
+    paths = sorted(entries)
+    return TreeIndex(
+        tree=tree,
+        paths=paths,
+        oids=[entries[p][1] for p in paths],
+        modes=[entries[p][0] for p in paths],
+        sizes=[entries[p][2] for p in paths],
+    )
+
+
+def load_tree_index(
+    repo: GitRepo, ref: str, store: TreeIndexStore | None = None
+) -> TreeIndex | None:
+    """Return the index for the tree at ``ref``, building it at most once per tree ID.
+
+    A tree seen before is a memory (or single file) lookup. Otherwise, when the first
+    parent's tree is already indexed, the new index is derived from it plus
+    ``git diff-tree``; only as a last resort is the full tree re-listed. A listing that
+    fails raises RuntimeError and is not stored.
+    """
+    store = store or get_tree_index_store()
+    tree = resolve_tree(repo, ref)
+    if tree is None:
+        return None
+    index = store.get(tree)
+    if index is not None:
+        return index
+    parent_tree = _parent_tree(repo, ref)
+    parent = store.get(parent_tree) if parent_tree else None
+    if parent is not None:
+        index = _derive_from_parent(repo, parent, tree)
+    if index is None:
+        index = TreeIndex.from_items(tree, ls_tree(repo, ref=tree))
+    store.put(index)
+    return index
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import os
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from lite_github_mcp.services.cache import _default_cache_dir
+from lite_github_mcp.services.git_cli import GitRepo, read_blob
+from lite_github_mcp.services.tree_index import load_tree_index, resolve_tree
+
+if TYPE_CHECKING:  # mypy: avoid importing third-party lib without stubs
+    _diskcache: Any = None
+else:
+    import diskcache as _diskcache
+
+# Blobs above this size are not indexed and always remain search candidates
+_MAX_INDEXED_BYTES = 1 << 20
+# Binary sniffing window, matching git's own heuristic
+_BINARY_SNIFF_BYTES = 8000
+# Past this many candidates, a narrowed pathspec stops paying for itself
+_MAX_CANDIDATES = 2000
+_MAX_LOADED = 4
+# Per-blob record markers: "*" = always a candidate, "-" = never (binary)
+_ALWAYS = b"*"
+_NEVER = b"-"
+# Escaped characters that are operators in BRE/ERE rather than literals
+_ESCAPED_OPERATORS = set("(){}|+?<>`'")
+
+
+def trigram_index_enabled() -> bool:
+    return os.environ.get("LGMCP_TRIGRAM_INDEX") in {"1", "true", "TRUE", "yes"}
+
+
+def trigrams(data: bytes) -> set[int]:
+    low = data.lower()
+    return {(low[i] << 16) | (low[i + 1] << 8) | low[i + 2] for i in range(len(low) - 2)}
+
+
+def _quantifier_length(pattern: str, i: int) -> int:
+    """Length of a quantifier that allows zero repeats starting at ``i`` (0 if none).
+
+    Covers both syntaxes: ``?``/``*``/``{m,n}`` and their BRE spellings ``\\?``/``\\{m,n\\}``.
+    ``\\*`` counts too: a literal star in either syntax, so treating it as one only loses
+    narrowing. Intervals are treated as optional whatever their bounds.
+    """
+    if i >= len(pattern):
+        return 0
+    if pattern[i] in "?*":
+        return 1
+    if pattern[i] == "{":
+        close = pattern.find("}", i)
+        return close - i + 1 if close >= 0 else len(pattern) - i
+    if pattern.startswith(("\\?", "\\*"), i):
+        return 2
+    if pattern.startswith("\\{", i):
+        close = pattern.find("\\}", i)
+        return close - i + 2 if close >= 0 else len(pattern) - i
+    return 0
+
+
+def required_literals(pattern: str) -> list[str] | None:
+    """Return literal substrings every match of ``pattern`` must contain.
+
+    Conservative for both basic and extended regex syntax: anything that could be an
+    operator ends the current literal, optional atoms and groups are dropped, and
+    alternation disables narrowing entirely. Returns None when no literal of 3+ chars
+    survives.
+    """
+    literals: list[str] = []
+    current: list[str] = []
+    # Index into ``literals`` where each open group started
+    groups: list[int] = []
+
+    def flush() -> None:
+        if len(current) >= 3:
+            literals.append("".join(current))
+        current.clear()
+
+    def close_group(end: int) -> int:
+        flush()
+        # An unbalanced close is a literal paren in one syntax; treat it as closing
+        # everything before it, which only loses narrowing
+        start = groups.pop() if groups else 0
+        skip = _quantifier_length(pattern, end)
+        if skip:
+            del literals[start:]
+        return end + skip
+
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "\\":
+            nxt = pattern[i + 1] if i + 1 < len(pattern) else ""
+            if nxt == "|":
+                return None
+            if nxt == "(":
+                flush()
+                groups.append(len(literals))
+            elif nxt == ")":
+                i = close_group(i + 2)
+                continue
+            elif nxt in "?{":
+                # BRE (GNU) optional atom and interval, like ERE ``?`` and ``{``
+                if current:
+                    current.pop()
+                flush()
+                i += _quantifier_length(pattern, i)
+                continue
+            elif nxt and not nxt.isalnum() and nxt not in _ESCAPED_OPERATORS:
+                current.append(nxt)
+            else:
+                flush()
+            i += 2
+            continue
+        if c == "|":
+            return None
+        if c == "(":
+            flush()
+            groups.append(len(literals))
+        elif c == ")":
+            i = close_group(i + 1)
+            continue
+        elif c in "*?":
+            if current:
+                current.pop()
+            flush()
+        elif c == "{":
+            if current:
+                current.pop()
+            flush()
+            close = pattern.find("}", i)
+            i = close if close >= 0 else len(pattern)
+        elif c == "[":
+            flush()
+            j = i + 1
+            if j < len(pattern) and pattern[j] == "^":
+                j += 1
+            if j < len(pattern) and pattern[j] == "]":
+                j += 1
+            while j < len(pattern) and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            i = j
+        elif c in ".^$+]}":
+            flush()
+        else:
+            current.append(c)
+        i += 1
+    flush()
+    return literals or None
+
+
+@dataclass(frozen=True)
+class TrigramIndex:
+    """Inverted trigram index over the blobs of one tree."""
+
+    tree: str
+    paths: list[str]
+    postings: dict[int, array[int]]
+    always: frozenset[int]
+
+    def candidates(self, literals: Iterable[str]) -> list[str]:
+        selected: set[int] | None = None
+        for literal in literals:
+            for gram in trigrams(literal.encode("utf-8")):
+                posting = self.postings.get(gram)
+                ids = set(posting) if posting is not None else set()
+                selected = ids if selected is None else selected & ids
+                if not selected:
+                    break
+            if selected is not None and not selected:
+                break
+        ids = (selected or set()) | self.always
+        return [self.paths[i] for i in sorted(ids)]
+
+
+class TrigramIndexer:
+    """Builds tree indexes in the background from per-blob trigram sets.
+
+    Trigram sets are persisted keyed by blob SHA, so a file that is unchanged
+    between commits is read and tokenized only once.
+    """
+
+    def __init__(self, path: Path, max_loaded: int = _MAX_LOADED) -> None:
+        self._blobs: Any = _diskcache.Cache(str(path))
+        self._max_loaded = max_loaded
+        self._ready: OrderedDict[str, TrigramIndex] = OrderedDict()
+        self._building: set[str] = set()
+        self._lock = threading.Lock()
+        self._build_slot = threading.Semaphore(1)
+
+    def get(self, tree: str) -> TrigramIndex | None:
+        with self._lock:
+            index = self._ready.get(tree)
+            if index is not None:
+                self._ready.move_to_end(tree)
+            return index
+
+    def schedule(self, repo: GitRepo, tree: str) -> None:
+        with self._lock:
+            if tree in self._ready or tree in self._building:
+                return
+            self._building.add(tree)
+        threading.Thread(target=self._run, args=(repo, tree), daemon=True).start()
+
+    def _run(self, repo: GitRepo, tree: str) -> None:
+        try:
+            with self._build_slot:
+                index = self.build(repo, tree)
+            if index is not None:
+                with self._lock:
+                    self._ready[tree] = index
+                    while len(self._ready) > self._max_loaded:
+                        self._ready.popitem(last=False)
+        finally:
+            with self._lock:
+                self._building.discard(tree)
+
+    def _blob_record(self, repo: GitRepo, oid: str, size: int | None) -> bytes:
+        record: bytes | None = self._blobs.get(oid)
+        if record is not None:
+            return record
+        if size is None or size > _MAX_INDEXED_BYTES:
+            record = _ALWAYS
+        else:
+            found = read_blob(repo, oid)
+            if found is None:
+                record = _ALWAYS
+            elif b"\x00" in found[0][:_BINARY_SNIFF_BYTES]:
+                record = _NEVER
+            else:
+                grams = array("I", sorted(trigrams(found[0])))
+                record = zlib.compress(grams.tobytes())
+        self._blobs.set(oid, record)
+        return record
+
+    def build(self, repo: GitRepo, tree: str) -> TrigramIndex | None:
+        try:
+            listing = load_tree_index(repo, tree)
+        except RuntimeError:
+            # Retried by the next search that schedules this tree
+            return None
+        if listing is None:
+            return None
+        paths: list[str] = []
+        postings: dict[int, array[int]] = {}
+        always: set[int] = set()
+        for pos in range(len(listing)):
+            item = listing.item(pos)
+            if item.type != "blob":
+                continue
+            file_id = len(paths)
+            paths.append(item.path)
+            record = self._blob_record(repo, item.oid, item.size)
+            if record == _ALWAYS:
+                always.add(file_id)
+                continue
+            if record == _NEVER:
+                continue
+            grams = array("I")
+            grams.frombytes(zlib.decompress(record))
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = posting = array("I")
+                posting.append(file_id)
+        return TrigramIndex(tree=tree, paths=paths, postings=postings, always=frozenset(always))
+
+
+_GLOBAL_INDEXER: TrigramIndexer | None = None
+
+
+def get_trigram_indexer() -> TrigramIndexer:
+    global _GLOBAL_INDEXER
+    if _GLOBAL_INDEXER is None:
+        _GLOBAL_INDEXER = TrigramIndexer(path=_default_cache_dir() / "trigrams")
+    return _GLOBAL_INDEXER
+
+
+def _within(path: str, scopes: list[str]) -> bool:
+    return any(path == s or path.startswith(s.rstrip("/") + "/") for s in scopes)
+
+
+def candidate_paths(repo: GitRepo, commit: str, pattern: str, paths: list[str]) -> list[str] | None:
+    """Narrow a search at ``commit`` to the files that can possibly match.
+
+    Returns literal pathspecs for ``git grep``, or None when the index is disabled,
+    not built yet (a background build is scheduled), or cannot narrow the search.
+    """
+    if not trigram_index_enabled():
+        return None
+    literals = required_literals(pattern)
+    if literals is None or any(ch in p for p in paths for ch in "*?[:"):
+        return None
+    tree = resolve_tree(repo, commit)
+    if tree is None:
+        return None
+    indexer = get_trigram_indexer()
+    index = indexer.get(tree)
+    if index is None:
+        indexer.schedule(repo, tree)
+        return None
+    matches = index.candidates(literals)
+    scopes = [p.strip("/").removeprefix("./") for p in paths]
+    if scopes and not any(s in ("", ".") for s in scopes):
+        matches = [m for m in matches if _within(m, scopes)]
+    if len(matches) > _MAX_CANDIDATES:
+        return None
+    return [f":(literal){m}" for m in matches]
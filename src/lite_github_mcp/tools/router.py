@@ -1,13 +1,19 @@
+import asyncio
+import functools
+import inspect
 import json
 import os
+import sys
 import time
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Any
 
+from fastmcp.exceptions import ToolError
 from fastmcp.tools.tool import Tool
 
-from lite_github_mcp.schemas.issue import CommentResult, IssueGet, IssueList
-from lite_github_mcp.schemas.pr import PRGet, PRList, PRTimeline
+from lite_github_mcp.schemas.issue import CommentResult, IssueGet, IssueGetBatch, IssueList
+from lite_github_mcp.schemas.pr import PRGet, PRGetBatch, PRList, PRTimeline
 from lite_github_mcp.schemas.repo import (
     BlobResult,
     BranchList,
@@ -18,12 +24,16 @@ from lite_github_mcp.schemas.repo import (
     TreeEntry,
     TreeList,
 )
+from lite_github_mcp.services.cache import get_cache
 from lite_github_mcp.services.gh_cli import (
     issue_comment as gh_issue_comment,
 )
 from lite_github_mcp.services.gh_cli import (
     issue_get as gh_issue_get,
 )
+from lite_github_mcp.services.gh_cli import (
+    issue_get_batch as gh_issue_get_batch,
+)
 from lite_github_mcp.services.gh_cli import (
     issue_list as gh_issue_list,
 )
@@ -36,6 +46,9 @@ from lite_github_mcp.services.gh_cli import (
 from lite_github_mcp.services.gh_cli import (
     pr_get as gh_pr_get,
 )
+from lite_github_mcp.services.gh_cli import (
+    pr_get_batch as gh_pr_get_batch,
+)
 from lite_github_mcp.services.gh_cli import (
     pr_list as gh_pr_list,
 )
@@ -50,18 +63,26 @@ from lite_github_mcp.services.gh_cli import (
 )
 from lite_github_mcp.services.gh_cli import repo_ref_get_remote
 from lite_github_mcp.services.git_cli import (
+    GitRepo,
+    TreeItem,
     default_branch,
+    default_branch_async,
     ensure_repo,
     get_remote_origin_url,
-    grep,
+    get_remote_origin_url_async,
     list_branches,
-    ls_tree,
     parse_owner_repo_from_url,
+    read_blob,
     rev_parse,
-    show_blob,
+    rev_parse_async,
 )
-from lite_github_mcp.services.pager import decode_cursor, encode_cursor
-from lite_github_mcp.utils.errors import GH_ERROR, ErrorEnvelope
+from lite_github_mcp.services.mirror import get_mirror_store, parse_repo_slug
+from lite_github_mcp.services.pager import paginate
+from lite_github_mcp.services.ratelimit import RateLimitError, get_rate_limiter
+from lite_github_mcp.services.search import search_page
+from lite_github_mcp.services.tree_index import load_tree_index
+from lite_github_mcp.utils.errors import GH_ERROR, RATE_LIMIT, ErrorEnvelope
+from lite_github_mcp.utils.metrics import observe_tool
 
 
 def ping() -> dict[str, Any]:
@@ -71,7 +92,16 @@ def ping() -> dict[str, Any]:
 def whoami() -> dict[str, Any]:
     from lite_github_mcp.services.gh_cli import gh_auth_status
 
-    status = gh_auth_status()
+    return _whoami_payload(gh_auth_status())
+
+
+async def whoami_async() -> dict[str, Any]:
+    from lite_github_mcp.services.gh_cli import gh_auth_status_async
+
+    return _whoami_payload(await gh_auth_status_async())
+
+
+def _whoami_payload(status: dict[str, Any]) -> dict[str, Any]:
     if not status.get("ok"):
         return ErrorEnvelope(
             code=status.get("code") or GH_ERROR,
@@ -84,6 +114,8 @@ def whoami() -> dict[str, Any]:
         "user": status.get("user"),
         "scopes": status.get("scopes") or [],
         "host": status.get("host"),
+        "rate_limit": get_rate_limiter().snapshot(),
+        "cache": get_cache().stats(),
     }
 
 
@@ -92,39 +124,87 @@ def _should_log() -> bool:
 
 
 def _log_event(event: dict[str, Any]) -> None:
+    # stderr: stdout is the MCP stdio transport, and a stray line there breaks the client
     try:
-        print(json.dumps(event, separators=(",", ":")))
+        print(json.dumps(event, separators=(",", ":")), file=sys.stderr)
     except Exception:
         # Do not fail server if logging fails
         pass
 
 
+def _rate_limit_error(exc: RateLimitError) -> ToolError:
+    envelope = ErrorEnvelope(
+        code=RATE_LIMIT,
+        message=str(exc),
+        details={"resource": exc.resource},
+        retry_after=exc.retry_after,
+    )
+    return ToolError(json.dumps(envelope.to_dict(), separators=(",", ":")))
+
+
+# Label for failures that carry no error envelope
+_UNHANDLED = "UNHANDLED"
+
+
+def _envelope_code(value: Any) -> str | None:
+    """Error code of a tool result or ``ToolError`` message that is an error envelope."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if isinstance(value, dict) and not value.get("ok") and isinstance(value.get("code"), str):
+        return str(value["code"])
+    return None
+
+
 def _instrument_tool(func: Any, tool_name: str) -> Any:
-    if not _should_log():
-        return func
+    """Adapt ``func`` into an async tool that never blocks the event loop.
 
-    def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
+    Coroutine functions are awaited; synchronous ones run in a worker thread, so a slow
+    ``gh`` or ``git`` call no longer stalls other requests. Each call's latency, and its
+    error envelope code if it fails, is recorded in the metrics.
+    """
+    log = _should_log()
+    native = inspect.iscoroutinefunction(func)
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:  # noqa: ANN401
         start = time.perf_counter()
         error: str | None = None
+        code: str | None = None
         try:
-            result = func(*args, **kwargs)
+            if native:
+                result = await func(*args, **kwargs)
+            else:
+                result = await asyncio.to_thread(func, *args, **kwargs)
+            code = _envelope_code(result)
             return result
+        except RateLimitError as exc:
+            # Hand the client a RATE_LIMIT envelope with retry_after instead of waiting
+            error = f"{type(exc).__name__}: {exc}"
+            code = RATE_LIMIT
+            raise _rate_limit_error(exc) from exc
         except Exception as exc:
             error = f"{type(exc).__name__}: {exc}"
+            code = _envelope_code(str(exc)) if isinstance(exc, ToolError) else None
+            code = code or _UNHANDLED
             raise
         finally:
-            duration_ms = (time.perf_counter() - start) * 1000.0
-            # Keep args minimal to avoid leaking content; only log keys
-            arg_keys = list(kwargs.keys())
-            event = {
-                "type": "tool_call",
-                "tool": tool_name,
-                "duration_ms": round(duration_ms, 2),
-                "arg_keys": arg_keys,
-            }
-            if error is not None:
-                event["error"] = error
-            _log_event(event)
+            observe_tool(tool_name, time.perf_counter() - start, code)
+            if log:
+                duration_ms = (time.perf_counter() - start) * 1000.0
+                # Keep args minimal to avoid leaking content; only log keys
+                arg_keys = list(kwargs.keys())
+                event = {
+                    "type": "tool_call",
+                    "tool": tool_name,
+                    "duration_ms": round(duration_ms, 2),
+                    "arg_keys": arg_keys,
+                }
+                if error is not None:
+                    event["error"] = error
+                _log_event(event)
 
     return wrapper
 
@@ -138,7 +218,9 @@ def register_tools(app: Any) -> None:
     )
     app.add_tool(
         Tool.from_function(
-            _instrument_tool(whoami, "gh.whoami"), name="gh.whoami", description="gh auth status"
+            _instrument_tool(whoami_async, "gh.whoami"),
+            name="gh.whoami",
+            description="gh auth status",
         )
     )
     # Repo / file / search tools (registered regardless; description kept minimal)
@@ -172,7 +254,7 @@ def register_tools(app: Any) -> None:
     )
     app.add_tool(
         Tool.from_function(
-            _instrument_tool(repo_resolve, "gh.repo.resolve"),
+            _instrument_tool(repo_resolve_async, "gh.repo.resolve"),
             name=("repo.resolve" if multi_mode else "gh.repo.resolve"),
             description="Resolve repo info",
         )
@@ -198,6 +280,13 @@ def register_tools(app: Any) -> None:
             description="Get PR meta",
         )
     )
+    app.add_tool(
+        Tool.from_function(
+            _instrument_tool(pr_get_batch, "gh.pr.get.batch"),
+            name=("pr.get.batch" if multi_mode else "gh.pr.get.batch"),
+            description="Get meta for many PRs",
+        )
+    )
     app.add_tool(
         Tool.from_function(
             _instrument_tool(pr_timeline, "gh.pr.timeline"),
@@ -247,6 +336,13 @@ def register_tools(app: Any) -> None:
             description="Get issue",
         )
     )
+    app.add_tool(
+        Tool.from_function(
+            _instrument_tool(issue_get_batch, "gh.issue.get.batch"),
+            name=("issue.get.batch" if multi_mode else "gh.issue.get.batch"),
+            description="Get many issues",
+        )
+    )
     app.add_tool(
         Tool.from_function(
             _instrument_tool(issue_comment, "gh.issue.comment"),
@@ -260,32 +356,43 @@ def repo_branches_list(
     repo_path: str, prefix: str | None = None, limit: int | None = None, cursor: str | None = None
 ) -> BranchList:
     repo = ensure_repo(Path(repo_path))
-    names = list_branches(repo, prefix=prefix)
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(names))
-    page = names[start:end]
-    has_next = end < len(names)
-    next_cur = encode_cursor(end) if has_next else None
+    page = paginate(
+        lambda: list_branches(repo, prefix=prefix),
+        key=f"branches:{repo.path}:{prefix or ''}",
+        cursor=cursor,
+        limit=limit,
+    )
     return BranchList(
         repo=str(repo.path),
         prefix=prefix,
-        names=page,
-        count=len(page),
-        has_next=has_next,
-        next_cursor=next_cur,
+        names=page.items,
+        count=len(page.items),
+        has_next=page.has_next,
+        next_cursor=page.next_cursor,
     )
 
 
+def _open_repo(repo_path: str | None, repo: str | None) -> tuple[GitRepo, str]:
+    # Either a local checkout or an owner/name served from the mirror store
+    if (repo_path and repo) or (not repo_path and not repo):
+        raise ValueError("Specify exactly one of repo_path or repo")
+    if repo is not None:
+        owner, name = parse_repo_slug(repo)
+        return get_mirror_store().open(owner, name), f"{owner}/{name}"
+    assert repo_path is not None
+    local = ensure_repo(Path(repo_path))
+    return local, str(local.path)
+
+
 def file_tree(
-    repo_path: str,
-    ref: str,
+    repo_path: str | None = None,
+    ref: str = "HEAD",
     base_path: str | None = None,
     limit: int | None = None,
     cursor: str | None = None,
+    repo: str | None = None,
 ) -> TreeList:
-    repo = ensure_repo(Path(repo_path))
+    git_repo, label = _open_repo(repo_path, repo)
     # Basic base_path validation to avoid invalid path specs
     if base_path:
         p = Path(base_path)
@@ -294,34 +401,44 @@ def file_tree(
     # Enforce limit semantics
     if limit is not None and limit < 1:
         raise ValueError("Invalid limit: must be >= 1")
-    all_entries = [
-        TreeEntry(path=p, blob_sha=sha) for p, sha in ls_tree(repo, ref=ref, path=base_path or "")
+
+    def load() -> Sequence[TreeItem]:
+        index = load_tree_index(git_repo, ref)
+        return index.view(base_path) if index is not None else []
+
+    page = paginate(
+        load, key=f"tree:{git_repo.path}:{ref}:{base_path or ''}", cursor=cursor, limit=limit
+    )
+    entries = [
+        TreeEntry(path=item.path, blob_sha=item.oid, mode=item.mode, size=item.size)
+        for item in page.items
     ]
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(all_entries))
-    page = all_entries[start:end]
-    has_next = end < len(all_entries)
-    next_cur = encode_cursor(end) if has_next else None
     return TreeList(
-        repo=str(repo.path),
+        repo=label,
         ref=ref,
         base_path=base_path,
-        entries=page,
-        count=len(page),
-        has_next=has_next,
-        next_cursor=next_cur,
+        entries=entries,
+        count=len(entries),
+        has_next=page.has_next,
+        next_cursor=page.next_cursor,
     )
 
 
-def file_blob(repo_path: str, blob_sha: str, max_bytes: int = 32768, offset: int = 0) -> BlobResult:
+def file_blob(
+    repo_path: str | None = None,
+    blob_sha: str = "",
+    max_bytes: int = 32768,
+    offset: int = 0,
+    repo: str | None = None,
+) -> BlobResult:
     import base64
 
-    repo = ensure_repo(Path(repo_path))
-    data = show_blob(repo, blob_sha=blob_sha, max_bytes=max_bytes, offset=offset)
-    total = len(show_blob(repo, blob_sha=blob_sha))
-    not_found = total == 0 and len(data) == 0
+    if not blob_sha:
+        raise ValueError("Invalid blob_sha: must be non-empty")
+    git_repo, _label = _open_repo(repo_path, repo)
+    offset = max(offset, 0)
+    found = read_blob(git_repo, blob_sha=blob_sha, max_bytes=max(max_bytes, 0), offset=offset)
+    data, total = found if found is not None else (b"", 0)
     next_off = offset + len(data)
     has_next = next_off < total
     return BlobResult(
@@ -333,54 +450,69 @@ def file_blob(repo_path: str, blob_sha: str, max_bytes: int = 32768, offset: int
         total_size=total,
         has_next=has_next,
         next_offset=next_off if has_next else None,
-        not_found=not_found,
+        not_found=found is None,
     )
 
 
 def search_files(
-    repo_path: str,
-    pattern: str,
+    repo_path: str | None = None,
+    pattern: str = "",
     paths: list[str] | None = None,
     limit: int | None = None,
     cursor: str | None = None,
+    ref: str | None = None,
+    repo: str | None = None,
 ) -> SearchResult:
-    repo = ensure_repo(Path(repo_path))
     if not pattern:
         raise ValueError("Invalid pattern: must be non-empty")
-    matches = grep(repo, pattern=pattern, paths=paths or [])
-    converted = [SearchMatch(path=p, line=ln, excerpt=ex) for (p, ln, ex) in matches]
-    start = decode_cursor(cursor).index
-    if start < 0:
-        start = 0
-    end = start + (limit or len(converted))
-    page = converted[start:end]
-    has_next = end < len(converted)
-    next_cur = encode_cursor(end) if has_next else None
+    git_repo, label = _open_repo(repo_path, repo)
+    if repo is not None:
+        # Mirrors are bare: there is no working tree, so search a ref, with its blobs
+        # fetched in one batch instead of faulted in one at a time by git grep
+        ref = ref or "HEAD"
+        get_mirror_store().ensure_blobs(git_repo, ref, paths)
+    page = search_page(git_repo, pattern, paths, ref=ref, cursor=cursor, limit=limit)
+    matches = [SearchMatch(path=p, line=ln, excerpt=ex) for (p, ln, ex) in page.items]
     return SearchResult(
-        repo=str(repo.path),
+        repo=label,
         pattern=pattern,
-        matches=page,
-        count=len(page),
-        has_next=has_next,
-        next_cursor=next_cur,
+        matches=matches,
+        count=len(matches),
+        has_next=page.has_next,
+        next_cursor=page.next_cursor,
     )
 
 
 def repo_resolve(repo_path: str) -> RepoResolve:
     repo = ensure_repo(Path(repo_path))
     origin = get_remote_origin_url(repo)
+    head = rev_parse(repo, "HEAD")
+    return _repo_resolve_result(repo, origin, head, default_branch(repo))
+
+
+async def repo_resolve_async(repo_path: str) -> RepoResolve:
+    repo = await asyncio.to_thread(ensure_repo, Path(repo_path))
+    # Independent lookups: run the git children side by side
+    origin, head, branch = await asyncio.gather(
+        get_remote_origin_url_async(repo), rev_parse_async(repo, "HEAD"), default_branch_async(repo)
+    )
+    return _repo_resolve_result(repo, origin, head, branch)
+
+
+def _repo_resolve_result(
+    repo: GitRepo, origin: str | None, head: str | None, branch: str | None
+) -> RepoResolve:
     owner: str | None
     name: str | None
     owner, name = (None, None)
     if origin:
         owner, name = parse_owner_repo_from_url(origin)
-    head = rev_parse(repo, "HEAD")
     return RepoResolve(
         repo_path=str(repo.path),
         origin_url=origin,
         owner=owner,
         name=name,
-        default_branch=default_branch(repo),
+        default_branch=branch,
         head=head,
     )
 
@@ -392,7 +524,12 @@ def repo_refs_get(
     if (repo_path and repo) or (not repo_path and not repo):
         raise ValueError("Specify exactly one of repo_path or repo")
     if repo is not None:
-        owner, name = repo.split("/", 1)
+        owner, name = parse_repo_slug(repo)
+        store = get_mirror_store()
+        if store.exists(owner, name):
+            # Already mirrored: resolve locally (after an incremental fetch if stale)
+            sha = rev_parse(store.open(owner, name), ref)
+            return RefResolve(repo_path=repo, ref=ref, sha=sha)
         remote = repo_ref_get_remote(owner, name, ref)
         return RefResolve(repo_path=repo, ref=ref, sha=remote.get("sha"))
     assert repo_path is not None
@@ -422,6 +559,11 @@ def pr_get(repo: str, number: int) -> PRGet:
     return PRGet(**data)
 
 
+def pr_get_batch(repo: str, numbers: list[int]) -> PRGetBatch:
+    owner, name = repo.split("/", 1)
+    return PRGetBatch(**gh_pr_get_batch(owner, name, numbers))
+
+
 def pr_timeline(
     repo: str,
     number: int,
@@ -482,6 +624,11 @@ def issue_get(repo: str, number: int) -> IssueGet:
     return IssueGet(**data)
 
 
+def issue_get_batch(repo: str, numbers: list[int]) -> IssueGetBatch:
+    owner, name = repo.split("/", 1)
+    return IssueGetBatch(**gh_issue_get_batch(owner, name, numbers))
+
+
 def issue_comment(repo: str, number: int, body: str) -> CommentResult:
     owner, name = repo.split("/", 1)
     data = gh_issue_comment(owner, name, number, body)
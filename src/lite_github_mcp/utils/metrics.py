@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import atexit
+import contextlib
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+# Seconds; 0.5 and 2.0 are edges so the p50 < 500ms / p95 < 2s targets can be read off
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+_DEFAULT_INTERVAL_SECONDS = 15.0
+
+
+class Metrics:
+    """Prometheus collectors for tool calls, child processes and the rate budget."""
+
+    def __init__(self, registry: Any) -> None:
+        from prometheus_client import Counter, Gauge, Histogram
+
+        self.registry = registry
+        self.tool_latency = Histogram(
+            "lgmcp_tool_duration_seconds",
+            "Tool call latency",
+            ["tool"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.tool_errors = Counter(
+            "lgmcp_tool_errors",
+            "Failed tool calls by error envelope code",
+            ["tool", "code"],
+            registry=registry,
+        )
+        self.subprocess_latency = Histogram(
+            "lgmcp_subprocess_duration_seconds",
+            "Child process run time (each observation is one spawn)",
+            ["binary"],
+            buckets=_LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.rate_limit = Gauge(
+            "lgmcp_rate_limit_limit",
+            "GitHub rate budget per window",
+            ["resource"],
+            registry=registry,
+        )
+        self.rate_remaining = Gauge(
+            "lgmcp_rate_limit_remaining",
+            "GitHub rate budget left in the current window",
+            ["resource"],
+            registry=registry,
+        )
+        self.rate_reset = Gauge(
+            "lgmcp_rate_limit_reset_timestamp_seconds",
+            "When the current rate window resets (epoch seconds)",
+            ["resource"],
+            registry=registry,
+        )
+
+
+_METRICS: Metrics | None = None
+_LOCK = threading.Lock()
+
+
+def enable_metrics(registry: Any = None) -> Metrics:
+    """Start collecting into ``registry`` (default: the prometheus_client global one)."""
+    global _METRICS
+    with _LOCK:
+        if _METRICS is None:
+            try:
+                from prometheus_client import REGISTRY
+            except ImportError as exc:
+                raise RuntimeError(
+                    "metrics export needs prometheus-client; install the metrics extra"
+                ) from exc
+            _METRICS = Metrics(registry if registry is not None else REGISTRY)
+        return _METRICS
+
+
+def observe_tool(tool: str, seconds: float, error_code: str | None = None) -> None:
+    metrics = _METRICS
+    if metrics is None:
+        return
+    metrics.tool_latency.labels(tool).observe(seconds)
+    if error_code is not None:
+        metrics.tool_errors.labels(tool, error_code).inc()
+
+
+def set_rate_limit(
+    resource: str, limit: int | None, remaining: int | None, reset: float | None
+) -> None:
+    metrics = _METRICS
+    if metrics is None:
+        return
+    if limit is not None:
+        metrics.rate_limit.labels(resource).set(limit)
+    if remaining is not None:
+        metrics.rate_remaining.labels(resource).set(remaining)
+    if reset is not None:
+        metrics.rate_reset.labels(resource).set(reset)
+
+
+def observe_subprocess(binary: str, seconds: float) -> None:
+    """Count one spawn of ``binary`` that lived ``seconds`` (for long-lived children)."""
+    metrics = _METRICS
+    if metrics is not None:
+        metrics.subprocess_latency.labels(binary).observe(seconds)
+
+
+@contextlib.contextmanager
+def subprocess_timer(binary: str) -> Iterator[None]:
+    """Count one spawn of ``binary`` and its run time (a binary that fails to start is not)."""
+    start = time.perf_counter()
+    spawned = True
+    try:
+        yield
+    except OSError:
+        spawned = False
+        raise
+    finally:
+        if spawned:
+            observe_subprocess(binary, time.perf_counter() - start)
+
+
+def _write_file(path: Path, registry: Any) -> None:
+    from prometheus_client import write_to_textfile
+
+    # Written to a temporary file and renamed, so readers never see a partial file
+    with contextlib.suppress(OSError):
+        write_to_textfile(str(path), registry)
+
+
+def _write_file_until(path: Path, registry: Any, interval: float, stop: threading.Event) -> None:
+    while True:
+        _write_file(path, registry)
+        if stop.wait(interval):
+            return
+
+
+def start_metrics_export() -> Callable[[], None] | None:
+    """Export metrics as configured: a scrape endpoint and/or a periodically written file.
+
+    ``LGMCP_METRICS_PORT`` serves them over HTTP on ``LGMCP_METRICS_ADDR`` (default
+    127.0.0.1). ``LGMCP_METRICS_FILE`` rewrites that file (atomically) every
+    ``LGMCP_METRICS_INTERVAL`` seconds and at exit. Nothing is ever written to stdout,
+    which carries the MCP stdio transport. Without either setting, nothing is collected
+    and None is returned; otherwise a function that stops the export (writing the file
+    one last time).
+    """
+    port = os.environ.get("LGMCP_METRICS_PORT")
+    out = os.environ.get("LGMCP_METRICS_FILE")
+    if not port and not out:
+        return None
+    metrics = enable_metrics()
+    stops: list[Callable[[], None]] = []
+    if port:
+        from prometheus_client import start_http_server
+
+        addr = os.environ.get("LGMCP_METRICS_ADDR") or "127.0.0.1"
+        server, _thread = start_http_server(int(port), addr=addr, registry=metrics.registry)
+        stops.append(server.shutdown)
+        stops.append(server.server_close)
+    if out:
+        try:
+            interval = float(os.environ.get("LGMCP_METRICS_INTERVAL") or 0)
+        except ValueError:
+            interval = 0.0
+        path = Path(out)
+        stop = threading.Event()
+        writer = threading.Thread(
+            target=_write_file_until,
+            args=(path, metrics.registry, interval or _DEFAULT_INTERVAL_SECONDS, stop),
+            name="lgmcp-metrics",
+            daemon=True,
+        )
+        writer.start()
+        stops.append(stop.set)
+        stops.append(writer.join)
+        stops.append(lambda: _write_file(path, metrics.registry))
+
+    def stop_export() -> None:
+        atexit.unregister(stop_export)
+        for step in stops:
+            step()
+
+    atexit.register(stop_export)
+    return stop_export
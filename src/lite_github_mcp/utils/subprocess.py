@@ -1,10 +1,19 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import os
 import subprocess
-from collections.abc import Mapping, Sequence
+import threading
+from collections.abc import AsyncIterator, Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
+from lite_github_mcp.utils.metrics import subprocess_timer
+
+# Concurrent child processes allowed per binary (git, gh, rg, ...)
+_DEFAULT_MAX_PROCS = 8
+
 
 @dataclass(frozen=True)
 class CommandResult:
@@ -14,25 +23,122 @@ class CommandResult:
     stderr: str
 
 
+def max_procs() -> int:
+    try:
+        return max(1, int(os.environ.get("LGMCP_MAX_PROCS") or _DEFAULT_MAX_PROCS))
+    except ValueError:
+        return _DEFAULT_MAX_PROCS
+
+
+def _binary(args: Sequence[str]) -> str:
+    return os.path.basename(args[0]) if args else ""
+
+
+# Keyed by limit too, so a changed LGMCP_MAX_PROCS takes effect for new callers
+_SLOTS: dict[tuple[str, int], threading.BoundedSemaphore] = {}
+_SLOTS_LOCK = threading.Lock()
+_POLL_MIN_SECONDS = 0.005
+_POLL_MAX_SECONDS = 0.05
+
+
+def process_slot(binary: str) -> threading.BoundedSemaphore:
+    """The semaphore bounding concurrent children of ``binary`` (``LGMCP_MAX_PROCS``).
+
+    One per binary for the whole process: threads, the event loop and children started
+    outside ``run_command`` (search streams, ``git cat-file`` workers) all draw from it.
+    """
+    limit = max_procs()
+    with _SLOTS_LOCK:
+        slot = _SLOTS.get((binary, limit))
+        if slot is None:
+            slot = _SLOTS[(binary, limit)] = threading.BoundedSemaphore(limit)
+        return slot
+
+
+@contextlib.asynccontextmanager
+async def _async_slot(binary: str) -> AsyncIterator[None]:
+    slot = process_slot(binary)
+    # Shared with threads, so it cannot be awaited; poll rather than park a worker thread
+    # on it (worker threads also run the sync tools)
+    delay = _POLL_MIN_SECONDS
+    while not slot.acquire(blocking=False):
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _POLL_MAX_SECONDS)
+    try:
+        yield
+    finally:
+        slot.release()
+
+
 def run_command(
     args: Sequence[str],
     *,
     cwd: str | Path | None = None,
     timeout_seconds: float | None = 30.0,
     env: Mapping[str, str] | None = None,
+    input_text: str | None = None,
 ) -> CommandResult:
-    completed = subprocess.run(
-        list(args),
-        cwd=str(cwd) if cwd is not None else None,
-        timeout=timeout_seconds,
-        env=dict(env) if env is not None else None,
-        check=False,
-        capture_output=True,
-        text=True,
-    )
+    binary = _binary(args)
+    with process_slot(binary), subprocess_timer(binary):
+        completed = subprocess.run(
+            list(args),
+            cwd=str(cwd) if cwd is not None else None,
+            timeout=timeout_seconds,
+            env=dict(env) if env is not None else None,
+            input=input_text,
+            check=False,
+            capture_output=True,
+            text=True,
+        )
     return CommandResult(
         args=tuple(args),
         returncode=completed.returncode,
         stdout=completed.stdout,
         stderr=completed.stderr,
     )
+
+
+async def run_command_async(
+    args: Sequence[str],
+    *,
+    cwd: str | Path | None = None,
+    timeout_seconds: float | None = 30.0,
+    env: Mapping[str, str] | None = None,
+    input_text: str | None = None,
+) -> CommandResult:
+    """``run_command`` for the event loop: awaits the child instead of blocking on it.
+
+    At most ``LGMCP_MAX_PROCS`` children per binary run at once; further calls wait
+    for a slot. On timeout the child is killed and ``subprocess.TimeoutExpired`` raised.
+    """
+    binary = _binary(args)
+    async with _async_slot(binary):
+        with subprocess_timer(binary):
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                cwd=str(cwd) if cwd is not None else None,
+                env=dict(env) if env is not None else None,
+                stdin=subprocess.PIPE if input_text is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+            data = input_text.encode("utf-8") if input_text is not None else None
+            try:
+                out, err = await asyncio.wait_for(proc.communicate(data), timeout_seconds)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise subprocess.TimeoutExpired(list(args), timeout_seconds or 0.0) from None
+            except asyncio.CancelledError:
+                # The caller went away (e.g. the client cancelled the tool call); reap the
+                # child before giving its slot back
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+                raise
+    return CommandResult(
+        args=tuple(args),
+        returncode=proc.returncode if proc.returncode is not None else -1,
+        stdout=out.decode("utf-8", errors="replace"),
+        stderr=err.decode("utf-8", errors="replace"),
+    )
@@ -0,0 +1,36 @@
+from typing import Any
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _gh_cli_transport(monkeypatch: Any) -> None:
+    # Keep tests hermetic: never pick up a real token and talk to api.github.com
+    monkeypatch.setenv("LGMCP_HTTP_TRANSPORT", "gh")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rate_limiter(monkeypatch: Any) -> None:
+    # A rate limit recorded by one test must not block the next
+    from lite_github_mcp.services import ratelimit
+
+    monkeypatch.setattr(ratelimit, "_GLOBAL_LIMITER", None)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(tmp_path_factory: Any, monkeypatch: Any) -> None:
+    # Fresh entries are served without a request; never reuse another test's (or run's)
+    from lite_github_mcp.services import cache
+
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("xdg-cache")))
+    monkeypatch.setattr(cache, "_GLOBAL_CACHE", None)
+    monkeypatch.setattr(cache, "_GLOBAL_CHURN", None)
+
+
+@pytest.fixture
+def always_revalidate(monkeypatch: Any) -> None:
+    # Lists never fresh and no background refresh: every read sends a conditional request
+    from lite_github_mcp.services import cache
+
+    policy = cache.CachePolicy(fresh=0, retain=600, background=False)
+    monkeypatch.setitem(cache._TTLS, "lists", policy)
@@ -0,0 +1,203 @@
+import asyncio
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastmcp.client.client import Client
+from fastmcp.server.server import FastMCP
+
+from lite_github_mcp.services import gh_cli
+from lite_github_mcp.services.git_cli import GitRepo, grep_iter, read_blob, rev_parse
+from lite_github_mcp.tools import router
+from lite_github_mcp.utils.subprocess import (
+    CommandResult,
+    process_slot,
+    run_command,
+    run_command_async,
+)
+
+
+def _git_repo(path: Path) -> Path:
+    run_command(["git", "init", "-q", "-b", "main"], cwd=path)
+    (path / "a.txt").write_text("a\n")
+    run_command(["git", "add", "-A"], cwd=path)
+    run_command(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            "init",
+        ],
+        cwd=path,
+    )
+    run_command(["git", "remote", "add", "origin", "git@github.com:acme/widget.git"], cwd=path)
+    return path
+
+
+def test_run_command_async_matches_sync(tmp_path: Path) -> None:
+    args = ["git", "hash-object", "--stdin"]
+    sync = run_command(args, cwd=tmp_path, input_text="hello\n")
+    result = asyncio.run(run_command_async(args, cwd=tmp_path, input_text="hello\n"))
+    assert result == sync
+    assert result.returncode == 0
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        asyncio.run(
+            run_command_async(
+                [sys.executable, "-c", "import time; time.sleep(5)"], timeout_seconds=0.2
+            )
+        )
+
+
+def test_run_command_async_bounds_each_binary(monkeypatch: Any) -> None:
+    monkeypatch.setenv("LGMCP_MAX_PROCS", "2")
+    nap = [sys.executable, "-c", "import time; time.sleep(0.2)"]
+
+    async def main() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_command_async(nap) for _ in range(6)))
+        return time.perf_counter() - start
+
+    # Six 0.2s children, two at a time: at least three rounds
+    assert asyncio.run(main()) >= 0.55
+
+
+def test_threads_and_event_loop_share_one_limit(monkeypatch: Any) -> None:
+    monkeypatch.setenv("LGMCP_MAX_PROCS", "1")
+    nap = [sys.executable, "-c", "import time; time.sleep(0.3)"]
+
+    async def main() -> float:
+        start = time.perf_counter()
+        await asyncio.gather(asyncio.to_thread(run_command, nap), run_command_async(nap))
+        return time.perf_counter() - start
+
+    assert asyncio.run(main()) >= 0.55
+
+
+def test_cancelled_child_is_reaped(monkeypatch: Any) -> None:
+    spawned: list[asyncio.subprocess.Process] = []
+    real_exec = asyncio.create_subprocess_exec
+
+    async def recording_exec(*args: Any, **kwargs: Any) -> asyncio.subprocess.Process:  # noqa: ANN401
+        proc = await real_exec(*args, **kwargs)
+        spawned.append(proc)
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", recording_exec)
+
+    async def main() -> None:
+        task = asyncio.create_task(
+            run_command_async([sys.executable, "-c", "import time; time.sleep(5)"])
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert spawned and spawned[0].returncode is not None
+
+
+def _in_thread(fn: Any) -> threading.Thread:  # noqa: ANN401
+    thread = threading.Thread(target=fn, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_search_streams_and_cat_file_count_against_the_git_limit(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    monkeypatch.setenv("LGMCP_MAX_PROCS", "1")
+    repo = GitRepo(_git_repo(tmp_path))
+    blob = rev_parse(repo, "HEAD:a.txt")
+    assert blob is not None
+    results: list[Any] = []
+    with process_slot("git"):
+        waiting = [
+            _in_thread(lambda: results.append(read_blob(repo, blob))),
+            _in_thread(lambda: results.append(list(grep_iter(repo, "a")))),
+        ]
+        time.sleep(0.3)
+        assert all(t.is_alive() for t in waiting)
+    for t in waiting:
+        t.join(10)
+    assert (b"a\n", 2) in results and [("a.txt", 1, "a")] in results
+
+    # A stream suspended between matches gives its slot back
+    stream = grep_iter(repo, "a")
+    assert next(stream) == ("a.txt", 1, "a")
+    other = _in_thread(lambda: results.append(rev_parse(repo)))
+    other.join(10)
+    assert not other.is_alive()
+    stream.close()
+
+
+def test_rate_pacing_does_not_block_the_event_loop(monkeypatch: Any) -> None:
+    class SlowLimiter:
+        def acquire(self, resource: str, priority: int | None = None) -> None:
+            time.sleep(0.3)
+
+    async def fake_gh(args: list[str]) -> CommandResult:
+        return CommandResult(args=tuple(args), returncode=0, stdout="{}", stderr="")
+
+    monkeypatch.setattr(gh_cli, "get_http_client", lambda: None)
+    monkeypatch.setattr(gh_cli, "get_rate_limiter", lambda: SlowLimiter())
+    monkeypatch.setattr(gh_cli, "_run_gh_async", fake_gh)
+
+    async def main() -> int:
+        start = time.perf_counter()
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while time.perf_counter() - start < 0.25:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(gh_cli.run_gh_json_async(["api", "user"]), ticker())
+        return ticks
+
+    # The loop kept running while the call waited on the rate budget
+    assert asyncio.run(main()) >= 5
+
+
+def test_async_repo_resolve_matches_sync(tmp_path: Path) -> None:
+    repo = _git_repo(tmp_path)
+    assert asyncio.run(router.repo_resolve_async(str(repo))) == router.repo_resolve(str(repo))
+    assert router.repo_resolve(str(repo)).owner == "acme"
+
+
+def test_slow_tool_does_not_block_others(monkeypatch: Any) -> None:
+    def slow_pr_get(owner: str, name: str, number: int) -> dict[str, Any]:
+        time.sleep(1.0)
+        return {}
+
+    monkeypatch.setattr(router, "gh_pr_get", slow_pr_get)
+    app = FastMCP(name="test")
+    router.register_tools(app)
+
+    async def main() -> tuple[float, float]:
+        async with Client(app) as client:
+            start = time.perf_counter()
+
+            async def timed(name: str, args: dict[str, Any]) -> float:
+                await client.call_tool(name, args)
+                return time.perf_counter() - start
+
+            slow, fast = await asyncio.gather(
+                timed("gh.pr.get", {"repo": "o/n", "number": 1}), timed("gh.ping", {})
+            )
+            return slow, fast
+
+    slow, fast = asyncio.run(main())
+    assert slow >= 1.0
+    assert fast < 0.5
@@ -1,6 +1,7 @@
 from typing import Any
 
 from lite_github_mcp.services import gh_cli
+from lite_github_mcp.services.ratelimit import RateLimitError
 
 
 class Res:
@@ -44,9 +45,17 @@ def test_backoff_exhaustion(monkeypatch: Any) -> None:
         gh_cli.pr_files("o", "n", 1, limit=10, cursor=None)
         # Some environments may mask the error; assert we attempted multiple times
         assert len(calls) >= 3
-    except RuntimeError as exc:  # RATE_LIMIT bubble-up
+    except RateLimitError as exc:  # RATE_LIMIT bubble-up
         assert "RATE_LIMIT" in str(exc)
+        assert exc.retry_after > 0
         assert len(calls) >= 3
+    # The limit is remembered: the next call fails fast without another request
+    before = len(calls)
+    try:
+        gh_cli.pr_files("o", "n", 1, limit=10, cursor=None)
+    except RateLimitError:
+        pass
+    assert len(calls) == before
 
 
 def test_etag_304_uses_cache(monkeypatch: Any) -> None:
@@ -54,12 +63,15 @@ def test_etag_304_uses_cache(monkeypatch: Any) -> None:
 
     def fake_run(args: list[str]) -> Any:  # noqa: ANN401
         calls.append(" ".join(args))
-        # First 200 with ETag and one item
+        if "/files" in args[1]:
+            headers = "HTTP/1.1 200 OK\r\n\r\n"
+            body = '[{"filename":"a.txt","status":"modified",' '"additions":1,"deletions":0}]'
+            return Res(headers + body)
+        # PR meta: first 200 with ETag, then 304 Not Modified
         if len(calls) == 1:
             headers = 'HTTP/1.1 200 OK\r\nETag: "e1"\r\n\r\n'
-            body = '[{"filename":"a.txt","status":"modified",' '"additions":1,"deletions":0}]'
+            body = '{"head":{"sha":"h1"},"base":{"sha":"b1"},"changed_files":1}'
             return Res(headers + body)
-        # Then 304 Not Modified
         return Res("HTTP/1.1 304 Not Modified\r\n\r\n")
 
     monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
@@ -67,3 +79,5 @@ def test_etag_304_uses_cache(monkeypatch: Any) -> None:
     out2 = gh_cli.pr_files("o", "n", 1, limit=10, cursor=None)
     assert out1["count"] == 1
     assert out2["count"] == 1
+    # Files are keyed by head SHA: the revisit only revalidated the PR itself
+    assert sum("/files" in c for c in calls) <= 1
@@ -0,0 +1,186 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from lite_github_mcp.services import cache_backend
+from lite_github_mcp.services.cache import CacheStore
+from lite_github_mcp.services.cache_backend import (
+    CacheBackendError,
+    DiskBackend,
+    RedisBackend,
+    disk_backends,
+    redis_backends,
+)
+
+_WRITER = """
+import sys
+from pathlib import Path
+from lite_github_mcp.services.cache import CacheStore
+
+store = CacheStore(path=Path(sys.argv[1]))
+for i in range(50):
+    store.set_json(f"w{sys.argv[2]}-{i}", {"i": i}, 60, category="meta")
+"""
+
+
+def test_sharded_disk_backend_is_shared_by_processes(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setenv("LGMCP_CACHE_SHARDS", "4")
+    monkeypatch.setenv("LGMCP_CACHE_WRITE_TIMEOUT", "5")
+    root = tmp_path / "cache"
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)}
+    writers = [
+        subprocess.Popen([sys.executable, "-c", _WRITER, str(root), str(n)], env=env)
+        for n in range(3)
+    ]
+    assert [w.wait(60) for w in writers] == [0, 0, 0]
+
+    store = CacheStore(path=root)
+    assert sorted(p.name for p in (root / "meta").iterdir() if p.is_dir()) == [
+        "000",
+        "001",
+        "002",
+        "003",
+    ]
+    for n in range(3):
+        for i in (0, 49):
+            assert store.get_json(f"w{n}-{i}", "meta") == {"i": i}
+    store.set_json("x", 1, 60, tag="t", category="meta")
+    assert store.invalidate_tag("t") == 1
+    assert store.invalidate_prefix("w1-") == 50
+
+
+def test_disk_backend_drops_writes_to_a_busy_shard(tmp_path: Path) -> None:
+    backend = DiskBackend(tmp_path / "c", size_limit=1 << 20, timeout=0.01)
+    assert backend.set("k", "v", tag="t")
+    assert backend.get("k") == ("v", "t")
+    other = DiskBackend(tmp_path / "c", size_limit=1 << 20, timeout=0.01)
+    with backend._cache.transact():
+        # Another writer holds the lock: the write is dropped rather than waited out
+        assert other.set("k2", "v") is False
+    assert backend.get("k2") == (None, None)
+
+
+def test_redis_backend_shares_hits_and_invalidation_across_nodes(tmp_path: Path) -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    node_a = CacheStore(
+        path=tmp_path / "a",
+        backend=redis_backends(fakeredis.FakeRedis(server=server)),
+        compress_min_bytes=256,
+    )
+    node_b = CacheStore(
+        path=tmp_path / "b", backend=redis_backends(fakeredis.FakeRedis(server=server))
+    )
+    rows = [{"path": f"src/f{i}.py"} for i in range(50)]
+    node_a.put_record("api:repos/o/n/pulls", rows, 30, 600, etag='"e1"', tag="lists:o/n")
+    node_a.set_json("small", [1], 60, category="meta")
+
+    record = node_b.get_record("api:repos/o/n/pulls")
+    assert record is not None and record.value == rows and record.etag == '"e1"'
+    assert node_b.get_json("small", "meta") == [1]
+    assert node_b.stats()["l2"]["hits"] == 2
+
+    # Invalidating on one node removes the shared entry for every node
+    assert node_a.invalidate_tag("lists:o/n") == 1
+    assert (
+        CacheStore(
+            path=tmp_path / "c", backend=redis_backends(fakeredis.FakeRedis(server=server))
+        ).get_record("api:repos/o/n/pulls")
+        is None
+    )
+    assert node_a.invalidate_prefix("sma") == 1
+
+
+def test_unreachable_redis_is_a_miss(tmp_path: Path) -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    backend = RedisBackend(fakeredis.FakeRedis(server=server), "lgmcp:meta")
+    server.connected = False
+    assert backend.get("k") == (None, None)
+    assert backend.set("k", "v", 60) is False
+    with pytest.raises(CacheBackendError):
+        backend.evict("t")
+    with pytest.raises(CacheBackendError):
+        backend.delete_prefix("k")
+    store = CacheStore(
+        path=tmp_path / "c", backend=redis_backends(fakeredis.FakeRedis(server=server))
+    )
+    assert store.invalidate_tag("t") == 0
+    assert store.stats()["l2"]["failed_invalidations"] == 4
+
+
+def test_redis_tag_set_outlives_its_longest_entry() -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    client = fakeredis.FakeRedis()
+    backend = RedisBackend(client, "lgmcp:meta")
+    backend.set("long", "v", 600, tag="t")
+    backend.set("short", "v", 30, tag="t")
+    # A shorter-lived entry never shortens the set
+    assert 590_000 < client.pttl("lgmcp:meta:t:t") <= 600_000
+    backend.set("forever", "v", None, tag="t")
+    assert client.pttl("lgmcp:meta:t:t") == -1
+    backend.set("later", "v", 30, tag="t")
+    assert client.pttl("lgmcp:meta:t:t") == -1
+    assert backend.evict("t") == 4
+
+
+def test_busy_shard_does_not_fail_invalidation(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(cache_backend, "_MAINTENANCE_SECONDS", 0.05)
+    root = tmp_path / "c"
+    store = CacheStore(path=root, backend=disk_backends(root, timeout=0.01))
+    store.set_json("k", 1, 60, tag="t")
+    holder = DiskBackend(root, size_limit=1 << 20, timeout=0.01)
+    culler = DiskBackend(root, size_limit=0, timeout=0.01)
+    with holder._cache.transact():
+        # The "other" category's database is locked: both invalidations give up on it
+        assert store.invalidate_tag("t") == 0
+        assert store.invalidate_prefix("k") == 0
+        with pytest.raises(CacheBackendError):
+            culler.cull(0)
+    assert store.stats()["l2"]["failed_invalidations"] == 2
+    assert store.invalidate_tag("t") == 1
+
+
+def test_single_directory_invalidation_reaches_other_workers(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    monkeypatch.setenv("LGMCP_CACHE_L1_SHARED_MAX_AGE", "0.05")
+    writer, reader = CacheStore(path=tmp_path / "cache"), CacheStore(path=tmp_path / "cache")
+    writer.set_json("k", 1, 60, tag="t", category="meta")
+    assert reader.get_json("k", "meta") == 1
+    writer.invalidate_tag("t")
+    time.sleep(0.06)
+    assert reader.get_json("k", "meta") is None
+
+
+def test_memory_tier_is_short_lived_over_a_shared_backend(tmp_path: Path) -> None:
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+
+    def node(name: str, **kwargs: Any) -> CacheStore:  # noqa: ANN401
+        factory = redis_backends(fakeredis.FakeRedis(server=server))
+        return CacheStore(path=tmp_path / name, backend=factory, **kwargs)
+
+    assert node("default")._l1.max_age == 5.0
+    # Worker processes can share a directory even without LGMCP_CACHE_SHARDS
+    assert CacheStore(path=tmp_path / "local")._l1.max_age == 5.0
+
+    writer, reader = node("a"), node("b", l1_max_age=0.05)
+    writer.set_json("k", 1, 60, tag="t", category="meta")
+    assert reader.get_json("k", "meta") == 1
+    writer.invalidate_tag("t")
+    # Another worker's invalidation reaches this memory tier once the entry ages out
+    assert reader.get_json("k", "meta") == 1
+    time.sleep(0.06)
+    assert reader.get_json("k", "meta") is None
+
+    uncached = node("c", l1_max_age=0)
+    writer.set_json("k", 2, 60, category="meta")
+    assert uncached.get_json("k", "meta") == 2
+    assert uncached.get_json("k", "meta") == 2
+    assert uncached.stats()["l2"]["hits"] == 2
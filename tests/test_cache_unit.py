@@ -0,0 +1,255 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from lite_github_mcp.services import cache as cache_mod
+from lite_github_mcp.services import gh_cli
+from lite_github_mcp.services.cache import CachePolicy, CacheStore, ChurnTracker
+from lite_github_mcp.utils.subprocess import CommandResult
+
+
+def _wait_until(predicate: Any) -> None:
+    deadline = time.monotonic() + 5
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_stale_entries_are_retained_but_not_fresh(tmp_path: Path) -> None:
+    store = CacheStore(path=tmp_path / "cache")
+    store.set_json("k", [1], ttl_seconds=0, retain_seconds=60)
+    assert store.get_json("k") is None
+    assert store.get_json_entry("k") == ([1], False)
+    store.set_json("k", [2], ttl_seconds=60)
+    assert store.get_json("k") == [2]
+    store.set_json("immutable", {"a": 1}, ttl_seconds=None)
+    assert store.get_json_entry("immutable") == ({"a": 1}, True)
+
+
+def test_stale_while_revalidate_serves_cache_and_refreshes(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    monkeypatch.setitem(cache_mod._TTLS, "lists", CachePolicy(fresh=0, retain=600))
+    calls: list[list[str]] = []
+    release = threading.Event()
+    release.set()
+
+    def fake_run(args: list[str]) -> CommandResult:
+        calls.append(args)
+        release.wait(5)
+        etag = f'"e{len(calls)}"'
+        head = f"HTTP/1.1 200 OK\r\nETag: {etag}\r\n\r\n"
+        return CommandResult(
+            args=tuple(args), returncode=0, stdout=head + json.dumps([len(calls)]), stderr=""
+        )
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    assert gh_cli._api_get_json_cached("repos/o/n/pulls", None, "lists") == [1]
+
+    # Stale: answered from the cache at once while the refresh waits on upstream
+    release.clear()
+    assert gh_cli._api_get_json_cached("repos/o/n/pulls", None, "lists") == [1]
+    _wait_until(lambda: len(calls) == 2)
+    assert 'If-None-Match: "e1"' in calls[1]
+    release.set()
+    _wait_until(lambda: not gh_cli._REFRESHING)
+
+    assert gh_cli._api_get_json_cached("repos/o/n/pulls", None, "lists") == [2]
+    _wait_until(lambda: not gh_cli._REFRESHING)
+
+
+def test_records_keep_etag_and_body_together(tmp_path: Path) -> None:
+    store = CacheStore(path=tmp_path / "cache")
+    record = store.put_record("k", [1], 0, 60, etag='"e1"', meta={"next": "p2"})
+    assert record.evict_after is not None and record.fresh_until is not None
+    assert record.evict_after - record.fresh_until == 60
+    assert store.get_record("k") == record
+    assert not record.is_fresh()
+    # Anything not written as a record reads as a miss rather than a bogus value
+    store._cache.set("legacy", "[1, 2]")
+    assert store.get_record("legacy") is None and store.get_json("legacy") is None
+
+
+def test_304_after_freshness_serves_the_stored_body(
+    tmp_path: Path, monkeypatch: Any, always_revalidate: None
+) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    calls: list[list[str]] = []
+
+    def fake_run(args: list[str]) -> CommandResult:
+        calls.append(args)
+        if 'If-None-Match: "e1"' in args:
+            out = "HTTP/1.1 304 Not Modified\r\n\r\n"
+        else:
+            link = 'Link: <https://api.github.com/repositories/1/pulls?page=2>; rel="next"'
+            out = f'HTTP/1.1 200 OK\r\nETag: "e1"\r\n{link}\r\n\r\n[{{"number": 1}}]'
+        return CommandResult(args=tuple(args), returncode=0, stdout=out, stderr="")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    first = gh_cli._api_get_cached("repos/o/n/pulls", None, "lists")
+    # Past the freshness window the ETag still validates the body it came with
+    again = gh_cli._api_get_cached("repos/o/n/pulls", None, "lists")
+    assert first == again == ([{"number": 1}], "repositories/1/pulls?page=2")
+    assert len(calls) == 2 and 'If-None-Match: "e1"' in calls[1]
+
+
+def test_tag_invalidation_touches_only_its_namespace(tmp_path: Path, monkeypatch: Any) -> None:
+    store = CacheStore(path=tmp_path / "cache")
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: store)
+    first = "repos/o/n/issues/7/timeline?per_page=100"
+    pages = {
+        first: ([{"number": 1}], "/repositories/9/issues/7/timeline?page=2"),
+        "repos/o/n/issues/7/timeline?page=2&per_page=100": ([{"number": 2}], None),
+        "repos/o/n/issues/8/timeline?per_page=100": ([{"number": 3}], None),
+    }
+
+    def fake_run(args: list[str]) -> CommandResult:
+        if args[0] != "api":
+            return CommandResult(args=tuple(args), returncode=0, stdout="", stderr="")
+        rows, next_url = pages[args[1]]
+        link = f'Link: <https://api.github.com{next_url}>; rel="next"\r\n' if next_url else ""
+        out = f"HTTP/1.1 200 OK\r\n{link}\r\n" + json.dumps(rows)
+        return CommandResult(args=tuple(args), returncode=0, stdout=out, stderr="")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    page = gh_cli._paged_numbers(first, cursor=None, limit=1)
+    gh_cli._paged_numbers(first, cursor=page.next_cursor, limit=1)
+    gh_cli._paged_numbers("repos/o/n/issues/8/timeline?per_page=100", cursor=None, limit=None)
+    store.set_json("unrelated", 1, 60)
+
+    # The comment drops PR 7's pages, including the ones after a Link to page 2
+    assert gh_cli.pr_comment("o", "n", 7, "hi") == {"ok": True}
+    assert store.get_record(f"api:{first}", "lists") is None
+    page_two = "api:repos/o/n/issues/7/timeline?page=2&per_page=100"
+    assert store.get_record(page_two, "lists") is None
+    assert store.get_record("api:repos/o/n/issues/8/timeline?per_page=100", "lists") is not None
+    assert store.get_json("unrelated") == 1
+    assert store.invalidate_tag("item:o/n#8") == 1
+
+
+def test_memory_tier_serves_decoded_records_and_tracks_hits(tmp_path: Path) -> None:
+    store = CacheStore(path=tmp_path / "cache", l1_max_entries=2)
+    value = {"a": [1]}
+    store.set_json("k", value, 60, tag="t")
+    value["a"].append(2)  # the caller's object is not what the cache holds
+    assert store.get_json("k") == {"a": [1]}
+    assert store.get_record("k") is store.get_record("k")
+
+    # A second store over the same directory starts with an empty memory tier
+    other = CacheStore(path=tmp_path / "cache")
+    assert other.get_json("k") == {"a": [1]} and other.get_json("missing") is None
+    assert other.get_json("k") == {"a": [1]}
+    stats = other.stats()
+    assert stats["lookups"] == 3
+    assert stats["l1"]["hits"] == 1 and stats["l1"]["entries"] == 1
+    assert stats["l2"]["hits"] == 1 and stats["l2"]["hit_ratio"] == 0.5
+
+    # Invalidation reaches both tiers, including entries promoted from disk
+    assert other.invalidate_tag("t") == 1
+    assert other.get_record("k") is None
+    assert store.invalidate_tag("t") == 0 and store.get_record("k") is None
+
+
+def test_memory_tier_is_bounded_by_count_and_bytes(tmp_path: Path) -> None:
+    store = CacheStore(path=tmp_path / "cache", l1_max_entries=2, l1_max_bytes=300)
+    for key in ("a", "b", "c"):
+        store.set_json(key, key, 60)
+    store.get_record("b")
+    assert store.stats()["l1"]["entries"] == 2
+    assert list(store._l1._entries) == ["c", "b"]
+
+    # Oversized values skip the memory tier but are still served from disk
+    store.set_json("big", "x" * 400, 60)
+    assert "big" not in store._l1._entries
+    assert store.get_json("big") == "x" * 400
+    assert store._l1.bytes <= 300
+
+    # Expired records fall out of memory exactly as they do on disk
+    store.set_json("gone", 1, 0, 0)
+    assert store.get_record("gone") is None
+
+
+def test_large_records_are_compressed_transparently(tmp_path: Path) -> None:
+    store = CacheStore(path=tmp_path / "cache", compress_min_bytes=1024)
+    rows = [{"path": f"src/module_{i}.py", "status": "modified"} for i in range(200)]
+    store.set_json("files", rows, None, category="blobs")
+    store.set_json("small", [1], 60, category="blobs")
+    assert isinstance(store._shards["blobs"].get("files")[0], bytes)
+    assert isinstance(store._shards["blobs"].get("small")[0], str)
+
+    # A fresh process decodes the packed entry from disk
+    assert CacheStore(path=tmp_path / "cache").get_json("files", "blobs") == rows
+    disk = store.stats()["l2"]
+    assert disk["compressed"] == 1 and disk["compression_ratio"] > 5
+
+
+def test_each_category_is_evicted_within_its_own_budget(tmp_path: Path) -> None:
+    store = CacheStore(
+        path=tmp_path / "cache",
+        category_limits={"blobs": 200_000},
+        compress_min_bytes=1 << 30,
+        eviction_policy="lru",
+    )
+    store.set_json("meta-item", {"title": "x"}, 60, category="meta")
+    for i in range(100):
+        store.set_json(f"blob-{i}", os.urandom(2000).hex(), None, category="blobs")
+
+    categories = store.stats()["l2"]["categories"]
+    assert categories["blobs"]["evictions"] > 0
+    assert categories["blobs"]["bytes"] <= 200_000
+    assert categories["meta"]["evictions"] == 0
+    # The most recent blobs survive; the oldest went first
+    assert CacheStore(path=tmp_path / "cache").get_json("blob-99", "blobs") is not None
+    assert store._shards["blobs"].get("blob-0") == (None, None)
+    assert store.get_json("meta-item", "meta") == {"title": "x"}
+
+
+def test_churn_tracker_moves_fresh_window_within_bounds(monkeypatch: Any) -> None:
+    policy = CachePolicy(fresh=30, retain=600, min_fresh=10, max_fresh=300)
+    tracker = ChurnTracker()
+    assert tracker.fresh_for("quiet", policy) == 30
+    tracker.observe("quiet", policy, changed=False)
+    assert tracker.fresh_for("quiet", policy) > 30
+    for _ in range(20):
+        tracker.observe("quiet", policy, changed=False)
+        tracker.observe("busy", policy, changed=True)
+    assert 250 <= tracker.fresh_for("quiet", policy) <= 300
+    assert 10 <= tracker.fresh_for("busy", policy) <= 12
+
+    # Fixed policies and a disabled switch keep the configured window
+    assert tracker.fresh_for("quiet", CachePolicy(fresh=30, retain=600)) == 30
+    monkeypatch.setenv("LGMCP_ADAPTIVE_TTL", "0")
+    assert tracker.fresh_for("quiet", policy) == 30
+
+
+def test_revalidation_outcomes_set_each_resource_ttl(tmp_path: Path, monkeypatch: Any) -> None:
+    store = CacheStore(path=tmp_path / "cache")
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: store)
+    policy = CachePolicy(fresh=30, retain=600, background=False, min_fresh=10, max_fresh=300)
+    monkeypatch.setitem(cache_mod._TTLS, "lists", policy)
+    served = {"quiet": 0, "busy": 0}
+
+    def fake_run(args: list[str]) -> CommandResult:
+        repo = args[1].split("/")[2]
+        if repo == "quiet" and any(a.startswith("If-None-Match") for a in args):
+            out = "HTTP/1.1 304 Not Modified\r\n\r\n"
+        else:
+            served[repo] += 1
+            out = f'HTTP/1.1 200 OK\r\nETag: "{served[repo]}"\r\n\r\n[]'
+        return CommandResult(args=tuple(args), returncode=0, stdout=out, stderr="")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+
+    def fresh_for(repo: str) -> float:
+        for _ in range(8):
+            gh_cli._revalidate(f"repos/o/{repo}/pulls?state=open", None, "lists", None)
+        record = store.get_record(f"api:repos/o/{repo}/pulls?state=open", "lists")
+        assert record is not None and record.fresh_until is not None
+        return record.fresh_until - time.time()
+
+    # Unchanged on every check: kept far longer than the default 30s; changing: less
+    assert fresh_for("quiet") > 150
+    assert fresh_for("busy") < 20
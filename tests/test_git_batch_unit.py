@@ -0,0 +1,69 @@
+import base64
+from pathlib import Path
+
+from lite_github_mcp.services.git_batch import CatFilePool
+from lite_github_mcp.services.git_cli import GitRepo, object_infos, read_blob
+from lite_github_mcp.tools.router import file_blob
+from lite_github_mcp.utils.subprocess import run_command
+
+
+def _repo_with_binary(tmp_path: Path) -> tuple[Path, str, bytes]:
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    run_command(["git", "init"], cwd=repo_path)
+    payload = bytes(range(256)) * 40 + b"\x00\xff\xfe tail"
+    (repo_path / "data.bin").write_bytes(payload)
+    sha = run_command(["git", "hash-object", "-w", "data.bin"], cwd=repo_path).stdout.strip()
+    return repo_path, sha, payload
+
+
+def test_read_blob_ranges_are_binary_safe(tmp_path: Path) -> None:
+    repo_path, sha, payload = _repo_with_binary(tmp_path)
+    repo = GitRepo(repo_path)
+
+    found = read_blob(repo, sha, max_bytes=100, offset=250)
+    assert found is not None
+    data, total = found
+    assert total == len(payload)
+    assert data == payload[250:350]
+
+    # Offset past the end yields an empty slice but still reports the size
+    tail = read_blob(repo, sha, max_bytes=10, offset=len(payload) + 5)
+    assert tail == (b"", len(payload))
+    assert read_blob(repo, "0" * 40) is None
+
+
+def test_object_infos_batch_check(tmp_path: Path) -> None:
+    repo_path, sha, payload = _repo_with_binary(tmp_path)
+    infos = object_infos(GitRepo(repo_path), [sha, "deadbeef", sha])
+    assert infos[0] is not None and infos[0].size == len(payload) and infos[0].type == "blob"
+    assert infos[1] is None
+    assert infos[2] == infos[0]
+
+
+def test_pool_reuses_worker_process(tmp_path: Path) -> None:
+    repo_path, sha, _payload = _repo_with_binary(tmp_path)
+    pool = CatFilePool()
+    try:
+        with pool.worker(repo_path, "--batch") as w1:
+            assert w1.read_range(sha, max_bytes=1) is not None
+        with pool.worker(repo_path, "--batch") as w2:
+            assert w2.read_range(sha, max_bytes=1) is not None
+        assert w1 is w2 and w2.alive()
+    finally:
+        pool.close_all()
+
+
+def test_file_blob_pages_through_binary(tmp_path: Path) -> None:
+    repo_path, sha, payload = _repo_with_binary(tmp_path)
+    collected = b""
+    offset = 0
+    while True:
+        page = file_blob(str(repo_path), blob_sha=sha, max_bytes=4000, offset=offset)
+        assert page.total_size == len(payload) and not page.not_found
+        collected += base64.b64decode(page.content_b64)
+        if not page.has_next:
+            break
+        assert page.next_offset is not None
+        offset = page.next_offset
+    assert collected == payload
@@ -1,11 +1,14 @@
 import shutil
+import subprocess
 from pathlib import Path
 
+from lite_github_mcp.services import git_cli
 from lite_github_mcp.services.git_cli import (
     GitRepo,
     current_branch,
     default_branch,
     get_remote_origin_url,
+    ls_tree,
     parse_owner_repo_from_url,
     rev_parse,
 )
@@ -51,3 +54,95 @@ def test_grep_git_fallback_no_rg(tmp_path: Path, monkeypatch) -> None:  # type:
 
     matches = git_grep(GitRepo(repo_path), pattern="hello", paths=None)
     assert matches and matches[0][0].endswith("readme.txt")
+
+
+def _commit_all(repo_path: Path, message: str = "init") -> None:
+    run_command(["git", "add", "-A"], cwd=repo_path)
+    run_command(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            message,
+        ],
+        cwd=repo_path,
+    )
+
+
+def test_ls_tree_single_process_with_mode_and_size(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "src").mkdir()
+    (repo_path / "src" / "a file.py").write_text("print(1)\n")
+    (repo_path / "run.sh").write_text("#!/bin/sh\n")
+    (repo_path / "run.sh").chmod(0o755)
+    _commit_all(repo_path)
+
+    calls: list[tuple[str, ...]] = []
+    orig_run = git_cli.run_command
+
+    def counting_run(args, **kwargs):  # type: ignore[no-untyped-def]
+        calls.append(tuple(args))
+        return orig_run(args, **kwargs)
+
+    monkeypatch.setattr(git_cli, "run_command", counting_run)
+    items = ls_tree(GitRepo(repo_path), ref="HEAD")
+    assert len(calls) == 1
+    assert [i.path for i in items] == ["run.sh", "src/a file.py"]
+    script, module = items
+    assert script.mode == "100755" and script.size == len("#!/bin/sh\n")
+    expected = run_command(["git", "rev-parse", "HEAD:src/a file.py"], cwd=repo_path)
+    assert module.oid == expected.stdout.strip() and module.type == "blob"
+
+    scoped = ls_tree(GitRepo(repo_path), ref="HEAD", path="src")
+    assert [i.path for i in scoped] == ["src/a file.py"]
+
+
+def test_grep_iter_stops_child_when_closed(tmp_path: Path, monkeypatch) -> None:  # type: ignore[no-untyped-def]
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "big.txt").write_text("needle\n" * 200_000)
+
+    procs: list[subprocess.Popen[bytes]] = []
+    orig_popen = subprocess.Popen
+
+    def tracking_popen(*args, **kwargs):  # type: ignore[no-untyped-def]
+        proc = orig_popen(*args, **kwargs)
+        procs.append(proc)
+        return proc
+
+    monkeypatch.setattr(git_cli.subprocess, "Popen", tracking_popen)
+    stream = git_cli.grep_iter(GitRepo(repo_path), pattern="needle")
+    first = [next(stream) for _ in range(3)]
+    assert [m[1] for m in first] == [1, 2, 3]
+    stream.close()
+    assert procs and all(p.poll() is not None for p in procs)
+
+
+def test_search_files_pages_cover_all_matches(tmp_path: Path) -> None:
+    from lite_github_mcp.tools.router import search_files
+
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "a.txt").write_text("x: hit\nmiss\nhit\n")
+    (repo_path / "b.txt").write_text("hit\nhit\n")
+
+    full = search_files(str(repo_path), pattern="hit")
+    seen: list[tuple[str, int, str]] = []
+    cursor = None
+    while True:
+        page = search_files(str(repo_path), pattern="hit", limit=2, cursor=cursor)
+        seen.extend((m.path, m.line, m.excerpt) for m in page.matches)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+    assert seen == [(m.path, m.line, m.excerpt) for m in full.matches]
+    assert len(seen) == 4 and ("x: hit" in [e for _p, _l, e in seen])
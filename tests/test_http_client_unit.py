@@ -0,0 +1,106 @@
+import json
+import threading
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from lite_github_mcp.services import gh_cli, http_client
+from lite_github_mcp.services.cache import CacheStore
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    seen: list[dict[str, Any]] = []
+    fail_next: list[int] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        _Handler.seen.append(
+            {
+                "path": self.path,
+                "auth": self.headers.get("Authorization"),
+                "inm": self.headers.get("If-None-Match"),
+                "port": self.client_address[1],
+            }
+        )
+        if _Handler.fail_next:
+            self._send(_Handler.fail_next.pop(0), b"", {"Retry-After": "0"})
+        elif self.path.endswith("/missing"):
+            self._send(404, b'{"message":"Not Found"}', {})
+        elif self.headers.get("If-None-Match") == '"v1"':
+            self._send(304, b"", {"ETag": '"v1"'})
+        else:
+            body = json.dumps([{"filename": "a.py", "status": "added"}]).encode()
+            self._send(200, body, {"ETag": '"v1"', "X-RateLimit-Remaining": "4999"})
+
+    def _send(self, status: int, body: bytes, headers: dict[str, str]) -> None:
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_a: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def stand_in(tmp_path: Path, monkeypatch: Any) -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    _Handler.seen = []
+    _Handler.fail_next = []
+    base = f"http://127.0.0.1:{server.server_address[1]}/api/v3"
+    monkeypatch.setenv("LGMCP_HTTP_TRANSPORT", "http")
+    monkeypatch.setenv("LGMCP_GITHUB_API_URL", base)
+    monkeypatch.setenv("GH_TOKEN", "t0ken")
+    monkeypatch.setattr(http_client, "_GLOBAL_CLIENT", None)
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+
+    def no_gh(_args: list[str]) -> Any:  # noqa: ANN401
+        raise AssertionError("expected the native transport")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", no_gh)
+    yield base
+    client = http_client._GLOBAL_CLIENT
+    if client is not None:
+        client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_native_transport_reuses_connection_and_etags(
+    stand_in: str, always_revalidate: None
+) -> None:
+    first = gh_cli._api_get_json_cached("repos/o/n/pulls/1/files", None, "lists")
+    second = gh_cli._api_get_json_cached("repos/o/n/pulls/1/files", None, "lists")
+    assert first == second == [{"filename": "a.py", "status": "added"}]
+    assert [s["path"] for s in _Handler.seen] == ["/api/v3/repos/o/n/pulls/1/files"] * 2
+    assert all(s["auth"] == "Bearer t0ken" for s in _Handler.seen)
+    assert [s["inm"] for s in _Handler.seen] == [None, '"v1"']
+    # Keep-alive: both requests went over the same pooled connection
+    assert len({s["port"] for s in _Handler.seen}) == 1
+
+    resp = gh_cli._api_request("repos/o/n", ["If-None-Match: nope"])
+    assert resp.status == 200
+    assert resp.headers["x-ratelimit-remaining"] == "4999"
+
+
+def test_native_transport_backoff_and_errors(stand_in: str, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli.time, "sleep", lambda s: None)
+    _Handler.fail_next = [429]
+    assert gh_cli._api_get_json_cached("repos/o/n/a", None, "lists") == [
+        {"filename": "a.py", "status": "added"}
+    ]
+    with pytest.raises(RuntimeError, match=r"Not Found \(HTTP 404\)"):
+        gh_cli.run_gh_json(["api", "missing"])
+
+
+def test_gh_fallback_when_forced(monkeypatch: Any) -> None:
+    monkeypatch.setattr(http_client, "_GLOBAL_CLIENT", None)
+    monkeypatch.setenv("GH_TOKEN", "t0ken")
+    assert http_client.get_http_client() is None
@@ -1,6 +1,12 @@
+import json
+from pathlib import Path
 from typing import Any
 
+import pytest
+
 import lite_github_mcp.tools.router as router_mod
+from lite_github_mcp.services import gh_cli
+from lite_github_mcp.services.cache import CacheStore
 from lite_github_mcp.tools.router import issue_comment, issue_get, issue_list
 
 
@@ -35,3 +41,56 @@ def test_issue_comment(monkeypatch: Any) -> None:
     monkeypatch.setattr(router_mod, "gh_issue_comment", lambda *a, **k: {"ok": True})
     res = issue_comment("o/n", 10, body="Thanks")
     assert res.ok
+
+
+def test_issue_list_pages_revalidate_with_etags(
+    tmp_path: Path, monkeypatch: Any, always_revalidate: None
+) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    calls: list[list[str]] = []
+
+    class Res:
+        def __init__(self, stdout: str) -> None:
+            self.stdout = stdout
+            self.returncode = 0
+            self.stderr = ""
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        calls.append(args)
+        if 'If-None-Match: "e1"' in args:
+            return Res("HTTP/1.1 304 Not Modified\r\n\r\n")
+        rows = [{"number": 1}, {"number": 2, "pull_request": {}}, {"number": 3}]
+        return Res('HTTP/1.1 200 OK\r\nETag: "e1"\r\n\r\n' + json.dumps(rows))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    first = issue_list("o/n", state="any", label="bug")
+    # Filters are normalized into one page key, whatever order they arrive in
+    assert calls[0][1] == "repos/o/n/issues?labels=bug&per_page=100&state=all"
+    again = issue_list("o/n", state="any", label="bug")
+    assert first.ids == again.ids == [1, 3]
+    assert len(calls) == 2 and 'If-None-Match: "e1"' in calls[1]
+
+
+def test_issue_list_rejects_merged_and_survives_upstream_errors(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+
+    class Res:
+        stdout = 'HTTP/1.1 422 Unprocessable Entity\r\n\r\n{"message": "Validation Failed"}'
+        returncode = 1
+        stderr = "gh: Validation Failed (HTTP 422)"
+
+    calls: list[list[str]] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        calls.append(args)
+        return Res()
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    with pytest.raises(ValueError, match="merged"):
+        issue_list("o/n", state="merged")
+    assert calls == []
+
+    out = issue_list("o/n", state="open", label="no such label")
+    assert out.ids == [] and out.has_next is False
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from lite_github_mcp.services.git_batch import CatFilePool
+from lite_github_mcp.services.git_cli import GitRepo, grep_iter
+from lite_github_mcp.services.ratelimit import RateLimiter, RateLimitError
+from lite_github_mcp.tools import router
+from lite_github_mcp.utils import metrics
+from lite_github_mcp.utils.errors import GH_ERROR, ErrorEnvelope
+from lite_github_mcp.utils.subprocess import run_command, run_command_async
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+
+@pytest.fixture
+def registry(monkeypatch: Any) -> Any:
+    monkeypatch.setattr(metrics, "_METRICS", None)
+    reg = prometheus_client.CollectorRegistry()
+    metrics.enable_metrics(reg)
+    return reg
+
+
+def test_tool_latency_and_errors_by_envelope_code(registry: Any) -> None:
+    def ok() -> dict[str, Any]:
+        return {"ok": True}
+
+    def envelope() -> dict[str, Any]:
+        return ErrorEnvelope(code=GH_ERROR, message="boom", details={}).to_dict()
+
+    def limited() -> dict[str, Any]:
+        raise RateLimitError("core", 30)
+
+    def broken() -> dict[str, Any]:
+        raise ValueError("bad")
+
+    asyncio.run(router._instrument_tool(ok, "gh.t")())
+    asyncio.run(router._instrument_tool(envelope, "gh.t")())
+    with pytest.raises(ToolError):
+        asyncio.run(router._instrument_tool(limited, "gh.t")())
+    with pytest.raises(ValueError):
+        asyncio.run(router._instrument_tool(broken, "gh.t")())
+
+    def sample(name: str, **labels: str) -> Any:
+        return registry.get_sample_value(name, labels)
+
+    assert sample("lgmcp_tool_duration_seconds_count", tool="gh.t") == 4
+    assert sample("lgmcp_tool_duration_seconds_bucket", tool="gh.t", le="0.5") == 4
+    assert sample("lgmcp_tool_errors_total", tool="gh.t", code="GH_ERROR") == 1
+    assert sample("lgmcp_tool_errors_total", tool="gh.t", code="RATE_LIMIT") == 1
+    assert sample("lgmcp_tool_errors_total", tool="gh.t", code="UNHANDLED") == 1
+
+
+def test_subprocess_spawns_and_rate_limit_gauges(registry: Any) -> None:
+    run_command(["git", "--version"])
+    asyncio.run(run_command_async(["git", "--version"]))
+    with pytest.raises(OSError):
+        run_command(["lgmcp-no-such-binary"])
+    count = "lgmcp_subprocess_duration_seconds_count"
+    assert registry.get_sample_value(count, {"binary": "git"}) == 2
+    assert registry.get_sample_value(count, {"binary": "lgmcp-no-such-binary"}) is None
+
+    RateLimiter().update(
+        {
+            "x-ratelimit-limit": "30",
+            "x-ratelimit-remaining": "7",
+            "x-ratelimit-reset": "1700000000",
+            "x-ratelimit-resource": "search",
+        }
+    )
+    labels = {"resource": "search"}
+    assert registry.get_sample_value("lgmcp_rate_limit_remaining", labels) == 7
+    assert registry.get_sample_value("lgmcp_rate_limit_limit", labels) == 30
+    assert registry.get_sample_value("lgmcp_rate_limit_reset_timestamp_seconds", labels) == 1.7e9
+
+
+def test_search_streams_and_cat_file_workers_are_counted(registry: Any, tmp_path: Path) -> None:
+    run_command(["git", "init", "-q"], cwd=tmp_path)
+    (tmp_path / "a.txt").write_text("needle\n")
+    run_command(["git", "add", "a.txt"], cwd=tmp_path)
+    blob = run_command(["git", "rev-parse", ":a.txt"], cwd=tmp_path).stdout.strip()
+    count = "lgmcp_subprocess_duration_seconds_count"
+    before = registry.get_sample_value(count, {"binary": "git"})
+
+    assert list(grep_iter(GitRepo(tmp_path), "needle")) == [("a.txt", 1, "needle")]
+    assert registry.get_sample_value(count, {"binary": "git"}) == before + 1
+    pool = CatFilePool()
+    for _ in range(2):
+        with pool.worker(tmp_path, "--batch") as worker:
+            assert worker.read_range(blob) is not None
+    # One worker, reused: counted once, with its lifetime, when it exits
+    assert registry.get_sample_value(count, {"binary": "git"}) == before + 1
+    pool.close_all()
+    assert registry.get_sample_value(count, {"binary": "git"}) == before + 2
+
+
+def test_metrics_file_export_and_logs_stay_off_stdout(
+    registry: Any, tmp_path: Path, monkeypatch: Any, capsys: Any
+) -> None:
+    out = tmp_path / "lgmcp.prom"
+    monkeypatch.setenv("LGMCP_METRICS_FILE", str(out))
+    monkeypatch.setenv("LGMCP_METRICS_INTERVAL", "0.05")
+    hooks: list[Any] = []
+    monkeypatch.setattr(metrics.atexit, "register", hooks.append)
+    monkeypatch.setattr(metrics.atexit, "unregister", hooks.remove)
+    stop = metrics.start_metrics_export()
+    assert stop is not None and hooks == [stop]
+    try:
+        metrics.observe_tool("gh.ping", 0.01)
+        deadline = time.monotonic() + 5
+        while "gh.ping" not in (out.read_text() if out.exists() else ""):
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        assert "lgmcp_tool_duration_seconds_bucket" in out.read_text()
+    finally:
+        metrics.observe_tool("gh.final", 0.01)
+        stop()
+    # Stopping writes the file one last time, ends the writer and drops the exit hook
+    assert "gh.final" in out.read_text()
+    assert not any(t.name == "lgmcp-metrics" for t in threading.enumerate())
+    assert hooks == []
+
+    router._log_event({"type": "tool_call", "tool": "gh.ping"})
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert json.loads(captured.err)["tool"] == "gh.ping"
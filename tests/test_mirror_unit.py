@@ -0,0 +1,101 @@
+from pathlib import Path
+from typing import Any
+
+from lite_github_mcp.services.git_cli import GitRepo
+from lite_github_mcp.services.mirror import MirrorStore
+from lite_github_mcp.tools import router
+from lite_github_mcp.tools.router import file_blob, file_tree, repo_refs_get, search_files
+from lite_github_mcp.utils.subprocess import run_command
+
+
+def _commit(repo_path: Path, message: str) -> str:
+    run_command(["git", "add", "-A"], cwd=repo_path)
+    run_command(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            message,
+        ],
+        cwd=repo_path,
+    )
+    return run_command(["git", "rev-parse", "HEAD"], cwd=repo_path).stdout.strip()
+
+
+def _make_remote(tmp_path: Path, owner: str, name: str) -> Path:
+    work = tmp_path / "work" / name
+    (work / "src").mkdir(parents=True)
+    run_command(["git", "init", "-q"], cwd=work)
+    (work / "src" / "app.py").write_text("def main():\n    return 'needle'\n")
+    (work / "README").write_text("readme\n")
+    _commit(work, "one")
+    bare = tmp_path / "remotes" / owner / f"{name}.git"
+    run_command(["git", "clone", "-q", "--bare", str(work), str(bare)])
+    run_command(["git", "config", "uploadpack.allowFilter", "true"], cwd=bare)
+    run_command(["git", "remote", "add", "mirror", str(bare)], cwd=work)
+    return work
+
+
+def _missing_blobs(repo_path: Path) -> int:
+    out = run_command(
+        ["git", "rev-list", "--objects", "--no-walk", "--missing=print", "HEAD"], cwd=repo_path
+    ).stdout
+    return sum(1 for line in out.splitlines() if line.startswith("?"))
+
+
+def test_mirror_serves_tree_blob_search_and_refs(tmp_path: Path, monkeypatch: Any) -> None:
+    work = _make_remote(tmp_path, "acme", "widget")
+    store = MirrorStore(
+        tmp_path / "mirrors", base_url=(tmp_path / "remotes").as_uri(), fetch_interval=0
+    )
+    monkeypatch.setattr(router, "get_mirror_store", lambda: store)
+
+    tree = file_tree(repo="acme/widget")
+    assert tree.repo == "acme/widget"
+    assert [e.path for e in tree.entries] == ["README", "src/app.py"]
+    mirror = store.path_for("acme", "widget")
+    # Blobless: listing the tree fetched no file contents
+    assert _missing_blobs(mirror) == 2
+
+    readme = next(e for e in tree.entries if e.path == "README")
+    blob = file_blob(repo="acme/widget", blob_sha=readme.blob_sha)
+    assert not blob.not_found and blob.total_size == len("readme\n")
+    assert _missing_blobs(mirror) == 1
+
+    found = search_files(repo="acme/widget", pattern="needle")
+    assert [(m.path, m.line) for m in found.matches] == [("src/app.py", 2)]
+    assert _missing_blobs(mirror) == 0
+
+    # New upstream commits arrive through an incremental fetch
+    (work / "NEW").write_text("new\n")
+    head = _commit(work, "two")
+    run_command(["git", "push", "-q", "mirror", "HEAD"], cwd=work)
+    assert repo_refs_get(repo="acme/widget").sha == head
+    assert "NEW" in [e.path for e in file_tree(repo="acme/widget").entries]
+
+
+def test_mirror_budget_evicts_least_recently_used(tmp_path: Path) -> None:
+    _make_remote(tmp_path, "acme", "one")
+    _make_remote(tmp_path, "acme", "two")
+    store = MirrorStore(tmp_path / "mirrors", base_url=(tmp_path / "remotes").as_uri())
+    first = store.open("acme", "one")
+    assert isinstance(first, GitRepo) and store.exists("acme", "one")
+
+    store.max_bytes = 1
+    store.open("acme", "two")
+    assert store.exists("acme", "two")
+    assert not store.exists("acme", "one")
+
+
+def test_repo_slug_validation(tmp_path: Path) -> None:
+    from pytest import raises
+
+    with raises(ValueError):
+        file_tree(repo="../etc")
+    with raises(ValueError):
+        file_blob(repo_path=str(tmp_path), blob_sha="")
@@ -1,4 +1,13 @@
-from lite_github_mcp.services.pager import decode_cursor, encode_cursor
+import threading
+from collections.abc import Iterator
+
+from lite_github_mcp.services.pager import (
+    SnapshotStore,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+    paginate_stream,
+)
 
 
 def test_pager_encode_decode_basic() -> None:
@@ -18,3 +27,100 @@ def test_pager_start_beyond_length_is_ok() -> None:
     cur = encode_cursor(10)
     decoded = decode_cursor(cur)
     assert decoded.index == 10
+
+
+def test_paginate_loads_once_and_stays_stable() -> None:
+    store = SnapshotStore()
+    data = list(range(5))
+    loads: list[int] = []
+
+    def load() -> list[int]:
+        loads.append(1)
+        return list(data)
+
+    p1 = paginate(load, key="q", cursor=None, limit=2, store=store)
+    data.clear()  # upstream changes mid-walk
+    p2 = paginate(load, key="q", cursor=p1.next_cursor, limit=2, store=store)
+    p3 = paginate(load, key="q", cursor=p2.next_cursor, limit=2, store=store)
+    assert p1.items + p2.items + p3.items == [0, 1, 2, 3, 4]
+    assert p3.has_next is False and p3.next_cursor is None
+    assert len(loads) == 1
+
+
+def test_snapshot_store_bounds_and_key_binding() -> None:
+    store = SnapshotStore(max_entries=2, ttl_seconds=60)
+    first = store.put("a", [1])
+    store.put("b", [2])
+    store.put("c", [3])
+    assert first is not None
+    assert len(store) == 2 and store.get(first, "a") is None
+
+    short_lived = SnapshotStore(ttl_seconds=0)
+    expired = short_lived.put("a", [1])
+    assert expired is not None
+    assert short_lived.get(expired, "a") is None
+
+    sid = store.put("k", [9])
+    assert sid is not None
+    assert store.get(sid, "other") is None
+    assert store.get(sid, "k") == [9]
+    # A cursor for another query falls back to recomputing that query
+    cur = encode_cursor(0, snapshot=sid)
+    page = paginate(lambda: [7, 8], key="other", cursor=cur, limit=5, store=store)
+    assert page.items == [7, 8]
+
+
+def test_snapshot_store_skips_values_larger_than_itself() -> None:
+    store = SnapshotStore(max_items=3, ttl_seconds=60)
+    kept = store.put("a", [1, 2])
+    assert store.put("b", [1, 2, 3, 4]) is None
+    # The oversized value evicted nothing, and the store is still usable
+    assert kept is not None and store.get(kept, "a") == [1, 2]
+    newest = store.put("c", [3, 4, 5])
+    assert newest is not None and store.get(newest, "c") == [3, 4, 5]
+    assert len(store) == 1
+
+    page = paginate(lambda: list(range(10)), key="q", cursor=None, limit=4, store=store)
+    assert page.items == [0, 1, 2, 3]
+    # Not parked, so the next page recomputes from the cursor's offset
+    assert page.next_cursor and decode_cursor(page.next_cursor).snapshot is None
+    nxt = paginate(lambda: list(range(10)), key="q", cursor=page.next_cursor, limit=4, store=store)
+    assert nxt.items == [4, 5, 6, 7]
+
+
+def test_paginate_stream_pulls_only_page_plus_one() -> None:
+    store = SnapshotStore()
+    pulled: list[int] = []
+    opened: list[int] = []
+
+    def open_stream() -> Iterator[int]:
+        opened.append(1)
+        for i in range(100):
+            pulled.append(i)
+            yield i
+
+    p1 = paginate_stream(open_stream, key="q", cursor=None, limit=3, store=store)
+    assert p1.items == [0, 1, 2] and p1.has_next and len(pulled) == 4
+    p2 = paginate_stream(open_stream, key="q", cursor=p1.next_cursor, limit=3, store=store)
+    assert p2.items == [3, 4, 5] and len(opened) == 1 and len(pulled) == 7
+
+    # Replaying an older cursor re-opens the stream and resumes at its index
+    again = paginate_stream(open_stream, key="q", cursor=p1.next_cursor, limit=3, store=store)
+    assert again.items == [3, 4, 5] and len(opened) == 2
+
+
+def test_expired_streams_are_closed_without_further_use() -> None:
+    store = SnapshotStore(ttl_seconds=0.05, reap_expired=True)
+    closed = threading.Event()
+
+    def open_stream() -> Iterator[int]:
+        try:
+            yield from range(10)
+        finally:
+            closed.set()
+
+    page = paginate_stream(open_stream, key="q", cursor=None, limit=2, store=store)
+    assert page.has_next and not closed.is_set()
+    # No later page or search touches the store; the timer still closes the stream
+    assert closed.wait(5)
+    assert len(store) == 0
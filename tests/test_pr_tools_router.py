@@ -1,28 +1,85 @@
+import json
+from pathlib import Path
 from typing import Any
 
 from lite_github_mcp.services import gh_cli
-from lite_github_mcp.tools.router import pr_get, pr_list, pr_timeline
+from lite_github_mcp.services.cache import CacheStore
+from lite_github_mcp.services.pager import encode_cursor
+from lite_github_mcp.tools.router import pr_get, pr_get_batch, pr_list, pr_timeline
 
 
-def test_pr_list_paging_monkeypatched(monkeypatch: Any) -> None:
-    sample = [
-        {"number": 1, "state": "OPEN", "author": {"login": "a"}, "createdAt": "t1"},
-        {"number": 2, "state": "OPEN", "author": {"login": "b"}, "createdAt": "t2"},
-        {"number": 3, "state": "OPEN", "author": {"login": "c"}, "createdAt": "t3"},
-    ]
+class Res:
+    def __init__(self, stdout: str, returncode: int = 0) -> None:
+        self.stdout = stdout
+        self.returncode = returncode
+        self.stderr = ""
 
-    def fake_run_gh_json(args: list[str]) -> Any:  # noqa: ANN401
-        return sample
 
-    monkeypatch.setattr(gh_cli, "run_gh_json", fake_run_gh_json)
+def test_pr_list_paging_monkeypatched(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    pages = {
+        "repos/o/n/pulls?per_page=100&state=open": ([1, 2, 3], "/repositories/9/pulls?page=2"),
+        "repos/o/n/pulls?page=2&per_page=100&state=open": ([4], None),
+    }
+    calls: list[str] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        calls.append(args[1])
+        numbers, next_url = pages[args[1]]
+        link = f'Link: <https://api.github.com{next_url}>; rel="next"\r\n' if next_url else ""
+        body = json.dumps([{"number": n, "state": "open"} for n in numbers])
+        return Res(f"HTTP/1.1 200 OK\r\n{link}\r\n{body}")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
 
     out = pr_list("o/n", state="open", author=None, label=None, limit=2, cursor=None)
     assert out.ids == [1, 2]
     assert out.has_next is True and out.next_cursor
+    # Only the upstream page holding the first two rows was fetched
+    assert len(calls) == 1
 
     out2 = pr_list("o/n", state="open", author=None, label=None, limit=2, cursor=out.next_cursor)
-    assert out2.ids == [3]
+    assert out2.ids == [3, 4]
     assert out2.has_next is False
+    # The first upstream page is still fresh in the cache; only the next one is fetched
+    assert calls[1:] == ["repos/o/n/pulls?page=2&per_page=100&state=open"]
+
+
+def test_forged_list_cursor_cannot_redirect_the_request(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    calls: list[str] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        calls.append(args[1])
+        return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps([{"number": 1, "state": "open"}]))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    forged = [
+        encode_cursor(5, upstream={"path": "repos/other/secret/pulls?state=all", "tag": "x"}),
+        encode_cursor(5, upstream={"path": "user/repos?visibility=private", "page": 2}),
+        encode_cursor(5, upstream={"query": "0" * 16, "page": 2}),
+        encode_cursor(5, upstream={"query": "0" * 16, "page": "x"}),
+    ]
+    for cursor in forged:
+        out = pr_list("o/n", state="open", author=None, label=None, limit=5, cursor=cursor)
+        assert out.ids == [1]
+    # Every request stayed on the queried endpoint, from its first page
+    assert set(calls) == {"repos/o/n/pulls?per_page=100&state=open"}
+
+
+def test_pr_list_author_filter_uses_issues_endpoint(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    rows = [{"number": 5, "pull_request": {}}, {"number": 6}, {"number": 7, "pull_request": {}}]
+    seen: list[str] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        seen.append(args[1])
+        return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(rows))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    out = pr_list("o/n", state="closed", author="me", label=None, limit=None, cursor=None)
+    assert out.ids == [5, 7] and out.has_next is False
+    assert seen == ["repos/o/n/issues?creator=me&per_page=100&state=closed"]
 
 
 def test_pr_get_monkeypatched(monkeypatch: Any) -> None:
@@ -37,31 +94,221 @@ def test_pr_get_monkeypatched(monkeypatch: Any) -> None:
     assert out.number == 42 and out.state == "OPEN" and out.title == "T"
 
 
-def test_pr_timeline_monkeypatched(monkeypatch: Any) -> None:
-    rest_events = [
-        {"event": "commented", "created_at": "t1", "actor": {"login": "a"}},
-        {"event": "merged", "created_at": "t2", "actor": {"login": "b"}},
-    ]
+def test_pr_timeline_monkeypatched(
+    tmp_path: Path, monkeypatch: Any, always_revalidate: None
+) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    first = "repos/o/n/issues/7/timeline?per_page=100"
+    pages = {
+        first: (
+            [{"event": "commented", "created_at": "t1", "actor": {"login": "a"}}],
+            "/repositories/9/issues/7/timeline?page=2&per_page=100",
+        ),
+        "repos/o/n/issues/7/timeline?page=2&per_page=100": (
+            [
+                {"event": "committed", "created_at": None, "actor": {"login": None}},
+                {"event": "merged", "created_at": "t2", "actor": {"login": "b"}},
+            ],
+            None,
+        ),
+    }
+    calls: list[list[str]] = []
 
-    def fake_run_gh_json(args: list[str]) -> Any:  # noqa: ANN401
-        return rest_events
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        calls.append(args)
+        if 'If-None-Match: "e"' in args:
+            return Res("HTTP/1.1 304 Not Modified\r\n\r\n")
+        rows, next_url = pages[args[1]]
+        link = f'Link: <https://api.github.com{next_url}>; rel="next"\r\n' if next_url else ""
+        return Res(f'HTTP/1.1 200 OK\r\nETag: "e"\r\n{link}\r\n' + json.dumps(rows))
 
-    monkeypatch.setattr(gh_cli, "run_gh_json", fake_run_gh_json)
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
 
     out = pr_timeline("o/n", number=7, limit=1)
     assert out.count == 1 and out.has_next is True and out.next_cursor
-    out2 = pr_timeline("o/n", number=7, limit=1, cursor=out.next_cursor)
-    assert out2.count == 1 and out2.has_next is False
+    # Later upstream pages are only fetched once a cursor reaches them
+    assert [c[1] for c in calls] == [first]
+    out2 = pr_timeline("o/n", number=7, limit=5, cursor=out.next_cursor)
+    assert [e["type"] for e in out2.events] == ["committed", "merged"]
+    assert out2.has_next is False
 
-    # With filter_nulls=True, events with any nulls should be excluded
-    rest_events2 = [
-        {"event": "committed", "created_at": None, "actor": {"login": None}},
-        {"event": "merged", "created_at": "t", "actor": {"login": "ok"}},
-    ]
+    # Revisiting an unchanged timeline costs only conditional requests
+    calls.clear()
+    out3 = pr_timeline("o/n", number=7, limit=5, filter_nulls=True)
+    assert [e["type"] for e in out3.events] == ["commented", "merged"]
+    assert len(calls) == 2 and all('If-None-Match: "e"' in c for c in calls)
+
+
+def test_pr_files_fetches_only_needed_pages_by_head(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    pages: list[int] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        path = args[1]
+        if "/files" not in path:
+            meta = {"head": {"sha": "h"}, "base": {"sha": "b"}, "changed_files": 250}
+            return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(meta))
+        page = int(path.rsplit("page=", 1)[1])
+        pages.append(page)
+        count = min(100, 250 - (page - 1) * 100)
+        rows = [{"filename": f"f{(page - 1) * 100 + i}"} for i in range(count)]
+        return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(rows))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    first = gh_cli.pr_files("o", "n", 1, limit=120, cursor=None)
+    assert first["count"] == 120 and first["files"][-1]["path"] == "f119"
+    assert pages == [1, 2]
+    rest = gh_cli.pr_files("o", "n", 1, limit=None, cursor=first["next_cursor"])
+    assert [f["path"] for f in rest["files"]] == [f"f{i}" for i in range(120, 250)]
+    assert not rest["has_next"]
+    # Pages 1-2 were served from the head-keyed cache; only page 3 was new
+    assert pages == [1, 2, 3]
+
+
+def test_pr_files_follows_a_force_push(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    head = {"sha": "h1"}
+    requests: list[list[str]] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        requests.append(args)
+        if "/files" not in args[1]:
+            etag = f'"{head["sha"]}"'
+            if f"If-None-Match: {etag}" in args:
+                return Res("HTTP/1.1 304 Not Modified\r\n\r\n")
+            meta = {"head": dict(head), "base": {"sha": "b"}, "changed_files": 1}
+            return Res(f"HTTP/1.1 200 OK\r\nETag: {etag}\r\n\r\n" + json.dumps(meta))
+        rows = [{"filename": f"{head['sha']}.py"}]
+        return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(rows))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    assert gh_cli.pr_files("o", "n", 1, limit=None, cursor=None)["files"][0]["path"] == "h1.py"
+    again = gh_cli.pr_files("o", "n", 1, limit=None, cursor=None)
+    assert again["files"][0]["path"] == "h1.py"
+    # Unchanged: one conditional request for the PR, the files come from the cache
+    assert len(requests) == 3 and 'If-None-Match: "h1"' in requests[-1]
+
+    head["sha"] = "h2"
+    moved = gh_cli.pr_files("o", "n", 1, limit=None, cursor=None)
+    assert moved["files"][0]["path"] == "h2.py"
+
+
+def test_pr_files_failed_page_returns_a_retry_cursor(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    failing = {2}
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        path = args[1]
+        if "/files" not in path:
+            meta = {"head": {"sha": "h"}, "base": {"sha": "b"}, "changed_files": 250}
+            return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(meta))
+        page = int(path.rsplit("page=", 1)[1])
+        if page in failing:
+            return Res("", returncode=1)
+        count = min(100, 250 - (page - 1) * 100)
+        rows = [{"filename": f"f{(page - 1) * 100 + i}"} for i in range(count)]
+        return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(rows))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    monkeypatch.setattr(gh_cli.time, "sleep", lambda s: None)
+    partial = gh_cli.pr_files("o", "n", 1, limit=None, cursor=None)
+    # Page 1 is kept; the list is not silently cut short
+    assert partial["count"] == 100 and partial["has_next"] is True
+    assert partial["error"]["code"] == "GH_ERROR"
+    assert partial["error"]["details"] == {"page": 2}
+
+    failing.clear()
+    rest = gh_cli.pr_files("o", "n", 1, limit=None, cursor=partial["next_cursor"])
+    assert [f["path"] for f in rest["files"]] == [f"f{i}" for i in range(100, 250)]
+    assert not rest["has_next"] and "error" not in rest
+
+
+def test_pr_get_batch_one_query_per_chunk_and_item_cache(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    monkeypatch.setattr(gh_cli, "_GRAPHQL_BATCH", 2)
+    queries: list[str] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        assert args[:2] == ["api", "graphql"]
+        query = args[3]
+        queries.append(query)
+        repo: dict[str, Any] = {}
+        for n in (1, 2, 3):
+            if f"n{n}: pullRequest(number: {n})" in query:
+                repo[f"n{n}"] = None if n == 2 else {"number": n, "state": "OPEN", "title": "T"}
+        # gh exits non-zero on a partial NOT_FOUND but still prints the data
+        return Res(json.dumps({"data": {"repository": repo}}), returncode=1)
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    out = pr_get_batch("o/n", numbers=[1, 2, 3, 1])
+    assert [(i.number, i.not_found) for i in out.items] == [(1, False), (2, True), (3, False)]
+    assert len(queries) == 2
+
+    def no_gh(_args: list[str]) -> Any:  # noqa: ANN401
+        raise AssertionError("expected a cache hit")
+
+    monkeypatch.setattr(gh_cli, "run_gh_json", no_gh)
+    assert pr_get("o/n", number=3).title == "T"
+
+
+def test_pr_get_batch_isolates_a_failing_item(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    queries: list[str] = []
+
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        query = args[3]
+        queries.append(query)
+        if "n2: pullRequest" in query:
+            # The whole query fails, with no partial data to fall back on
+            return Res("", returncode=1)
+        author = {"login": "me"}
+        repo = {"n1": {"number": 1, "state": "OPEN", "title": "T", "author": author}}
+        return Res(json.dumps({"data": {"repository": repo}}))
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    out = pr_get_batch("o/n", numbers=[1, 2])
+    one, two = out.items
+    assert one.title == "T" and one.error is None
+    assert two.error is not None and two.error["code"] == "GH_ERROR"
+    assert two.not_found is False and two.title is None
+    # One chunk query, then each of its numbers alone
+    assert len(queries) == 3
+
+
+def test_pr_get_and_batch_cache_the_same_record(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    viewed = {"id": "U_1", "is_bot": False, "login": "me", "name": "Me"}
+    fields = {"number": 5, "state": "OPEN", "title": "T", "additions": 1, "deletions": 0}
+    monkeypatch.setattr(gh_cli, "run_gh_json", lambda args: {**fields, "author": viewed})
+    single = gh_cli.pr_get("o", "n", 5)
+
+    batch_cache = CacheStore(path=tmp_path / "batch")
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: batch_cache)
+    node = {**fields, "author": {"login": "me"}}
+    monkeypatch.setattr(
+        gh_cli,
+        "_run_gh",
+        lambda args: Res(json.dumps({"data": {"repository": {"n5": node}}})),
+    )
+    (batched,) = gh_cli.pr_get_batch("o", "n", [5])["items"]
+    assert single == batched
+    assert single["author"] == {"login": "me"}
+
+
+def test_merged_search_pages_are_dropped_with_the_repo_lists(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    cache = CacheStore(path=tmp_path / "cache")
+    monkeypatch.setattr(gh_cli, "get_cache", lambda: cache)
+    calls: list[str] = []
 
-    def fake_run_gh_json2(args: list[str]) -> Any:  # noqa: ANN401
-        return rest_events2
+    def fake_run(args: list[str]) -> Any:  # noqa: ANN401
+        calls.append(args[1])
+        body = {"total_count": 1, "items": [{"number": 4}]}
+        return Res("HTTP/1.1 200 OK\r\n\r\n" + json.dumps(body))
 
-    monkeypatch.setattr(gh_cli, "run_gh_json", fake_run_gh_json2)
-    out3 = pr_timeline("o/n", number=8, limit=5, filter_nulls=True)
-    assert out3.count == 1
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    out = pr_list("o/n", state="merged", author=None, label=None, limit=None, cursor=None)
+    assert out.ids == [4] and calls[0].startswith("search/issues?")
+    # A merge (or any write that drops the repo's lists) reaches the search page too
+    assert cache.invalidate_tag("lists:o/n") == 1
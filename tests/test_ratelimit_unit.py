@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+from typing import Any
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from lite_github_mcp.services import gh_cli
+from lite_github_mcp.services.ratelimit import (
+    HIGH,
+    LOW,
+    RateLimiter,
+    RateLimitError,
+    get_rate_limiter,
+    request_priority,
+    resource_for_args,
+    resource_for_path,
+)
+from lite_github_mcp.tools import router
+from lite_github_mcp.utils.subprocess import CommandResult
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.slept: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+
+
+def _headers(remaining: int, limit: int = 5000, reset: float = 1100.0) -> dict[str, str]:
+    return {
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-reset": str(reset),
+    }
+
+
+def test_resources_are_tracked_separately() -> None:
+    assert resource_for_path("search/issues?q=x") == "search"
+    assert resource_for_path("graphql") == "graphql"
+    assert resource_for_args(["pr", "view", "1"]) == "graphql"
+    assert resource_for_args(["api", "repos/o/n"]) == "core"
+
+    clock = _Clock()
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.update({**_headers(0, limit=30), "x-ratelimit-resource": "search"})
+    with pytest.raises(RateLimitError) as exc:
+        limiter.acquire("search")
+    assert exc.value.retry_after == 100.0
+    limiter.acquire("core")  # unknown budget: not throttled
+    assert limiter.snapshot()["search"] == {
+        "limit": 30,
+        "remaining": 0,
+        "reset_in": 100.0,
+        "blocked_for": None,
+    }
+
+
+def test_paces_when_low_and_keeps_reserve_for_priority() -> None:
+    clock = _Clock()
+    limiter = RateLimiter(clock=clock, sleep=clock.sleep)
+    limiter.update(_headers(400))
+    # 400 left of 5000 (below 10%) with 100s to go: one call every 0.25s
+    limiter.acquire("core")
+    limiter.acquire("core")
+    assert clock.slept == [pytest.approx(0.25)]
+
+    # Background work stops well before the budget is gone; writes may finish it
+    with request_priority(LOW), pytest.raises(RateLimitError):
+        limiter.acquire("core")
+    limiter.update(_headers(1))
+    with pytest.raises(RateLimitError):
+        limiter.acquire("core")
+    limiter.acquire("core", HIGH)
+
+    # Once the window resets the budget is usable again
+    clock.now = 1200.0
+    limiter.acquire("core")
+
+
+def test_exhausted_budget_fails_fast_with_envelope(monkeypatch: Any) -> None:
+    calls: list[list[str]] = []
+    reset = time.time() + 120
+
+    def fake_run(args: list[str]) -> CommandResult:
+        calls.append(args)
+        head = (
+            'HTTP/1.1 200 OK\r\nETag: "e"\r\nX-RateLimit-Limit: 5000\r\n'
+            f"X-RateLimit-Remaining: 0\r\nX-RateLimit-Reset: {reset}\r\n\r\n"
+        )
+        return CommandResult(args=tuple(args), returncode=0, stdout=head + "[]", stderr="")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run)
+    assert gh_cli._api_get("repos/o/n/pulls", []).status == 200
+    with pytest.raises(RateLimitError):
+        gh_cli._api_get("repos/o/n/issues", [])
+    assert len(calls) == 1
+
+    def tool() -> dict[str, Any]:
+        gh_cli._api_get("repos/o/n/issues", [])
+        return {}
+
+    with pytest.raises(ToolError) as exc:
+        asyncio.run(router._instrument_tool(tool, "gh.test")())
+    envelope = json.loads(str(exc.value))
+    assert envelope["code"] == "RATE_LIMIT"
+    assert envelope["details"] == {"resource": "core"}
+    assert 0 < envelope["retry_after"] <= 120
+
+    monkeypatch.setattr(
+        gh_cli, "gh_auth_status", lambda: {"ok": True, "user": {"login": "me"}, "scopes": []}
+    )
+    # reset_in is rounded against the wall clock, so only the budget itself is compared
+    reported = router.whoami()["rate_limit"]
+    snapshot = get_rate_limiter().snapshot()
+    assert reported.keys() == snapshot.keys()
+    for name, budget in snapshot.items():
+        assert reported[name]["limit"] == budget["limit"]
+        assert reported[name]["remaining"] == budget["remaining"]
+    assert reported["core"]["remaining"] == 0
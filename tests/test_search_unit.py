@@ -0,0 +1,104 @@
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from lite_github_mcp.services import git_cli, search
+from lite_github_mcp.services.cache import CacheStore
+from lite_github_mcp.services.git_cli import GitRepo, grep_iter, rev_parse
+from lite_github_mcp.services.mirror import MirrorStore
+from lite_github_mcp.tools.router import search_files
+from lite_github_mcp.utils.subprocess import run_command
+
+
+def _commit(repo_path: Path, message: str) -> str:
+    run_command(["git", "add", "-A"], cwd=repo_path)
+    run_command(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            message,
+        ],
+        cwd=repo_path,
+    )
+    return run_command(["git", "rev-parse", "HEAD"], cwd=repo_path).stdout.strip()
+
+
+def test_search_at_ref_reads_commit_tree_and_caches(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(search, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    repo_path = tmp_path / "repo"
+    (repo_path / "src").mkdir(parents=True)
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "src" / "a.py").write_text("token = 1\nother\ntoken = 2\n")
+    (repo_path / "b.py").write_text("token = 3\n")
+    first = _commit(repo_path, "one")
+    (repo_path / "src" / "a.py").write_text("nothing here\n")
+    _commit(repo_path, "two")
+
+    p1 = search_files(str(repo_path), pattern="token", limit=2, ref=first)
+    assert [(m.path, m.line) for m in p1.matches] == [("b.py", 1), ("src/a.py", 1)]
+    assert p1.has_next
+    p2 = search_files(str(repo_path), pattern="token", limit=2, cursor=p1.next_cursor, ref=first)
+    assert [(m.path, m.line) for m in p2.matches] == [("src/a.py", 3)]
+    assert not p2.has_next
+
+    # The working tree and HEAD no longer contain the old matches
+    assert search_files(str(repo_path), pattern="token", ref="HEAD").count == 1
+
+    def no_grep(*_a: Any, **_k: Any) -> Any:  # noqa: ANN401
+        raise AssertionError("expected a cache hit")
+
+    monkeypatch.setattr(search, "grep_iter", no_grep)
+    again = search_files(str(repo_path), pattern="token", ref=first)
+    assert [(m.path, m.line) for m in again.matches] == [
+        ("b.py", 1),
+        ("src/a.py", 1),
+        ("src/a.py", 3),
+    ]
+    assert search_files(str(repo_path), pattern="token", ref="no-such-ref").count == 0
+
+
+def test_ripgrep_output_is_ordered_by_path(tmp_path: Path, monkeypatch: Any) -> None:
+    # Reopened streams resume by count, which is only sound for a fixed order
+    spawned: list[list[str]] = []
+
+    class Recorded:
+        returncode = 0
+
+        def __init__(self, args: list[str], *_a: Any, **_k: Any) -> None:  # noqa: ANN401
+            spawned.append(list(args))
+
+        def __iter__(self) -> Iterator[tuple[str, int, str]]:
+            yield ("a.py", 1, "x")
+
+    monkeypatch.setattr(git_cli.shutil, "which", lambda _name: "/usr/bin/rg")
+    monkeypatch.setattr(git_cli, "_MatchStream", Recorded)
+    assert list(grep_iter(GitRepo(tmp_path), "x")) == [("a.py", 1, "x")]
+    assert spawned[0][0] == "rg"
+    assert spawned[0][spawned[0].index("--sort") + 1] == "path"
+
+
+def test_option_like_refs_are_rejected(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setattr(search, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "a.py").write_text("token\n")
+    _commit(repo_path, "one")
+    marker = tmp_path / "PWNED"
+
+    ref = f"--open-files-in-pager=touch {marker}"
+    assert search_files(str(repo_path), pattern="token", ref=ref).count == 0
+    assert rev_parse(GitRepo(path=repo_path), ref) is None
+    assert rev_parse(GitRepo(path=repo_path), "--git-dir") is None
+    with pytest.raises(ValueError):
+        list(grep_iter(GitRepo(path=repo_path), "token", ref="HEAD --no-index"))
+    assert MirrorStore(root=tmp_path / "mirrors").ensure_blobs(GitRepo(path=repo_path), ref) == 0
+    assert not list(tmp_path.glob("PWNED*"))
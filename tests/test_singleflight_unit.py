@@ -0,0 +1,81 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+
+from lite_github_mcp.services import gh_cli
+from lite_github_mcp.services.singleflight import SingleFlight
+from lite_github_mcp.utils.subprocess import CommandResult
+
+
+def _wait_for_shared(flights: SingleFlight, count: int) -> None:
+    # Let the other callers join the in-flight call before it completes
+    deadline = time.monotonic() + 5
+    while flights.shared < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_concurrent_callers_share_one_execution() -> None:
+    flights = SingleFlight()
+    calls = 0
+    release = threading.Event()
+
+    def slow() -> list[int]:
+        nonlocal calls
+        calls += 1
+        release.wait(5)
+        return [1, 2]
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(flights.do, "k", slow) for _ in range(8)]
+        _wait_for_shared(flights, 7)
+        release.set()
+        results = [f.result() for f in futures]
+    assert calls == 1
+    assert results == [[1, 2]] * 8
+    assert flights.stats() == {"executed": 1, "shared": 7, "inflight": 0}
+
+    # Completed calls are not retained: the next caller executes again
+    assert flights.do("k", lambda: [3]) == [3]
+
+
+def test_errors_reach_every_waiter() -> None:
+    flights = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def failing() -> None:
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first = pool.submit(flights.do, "k", failing)
+        started.wait(5)
+        second = pool.submit(flights.do, "k", failing)
+        _wait_for_shared(flights, 1)
+        release.set()
+        for future in (first, second):
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result()
+
+
+def test_gh_reads_coalesce(monkeypatch: Any) -> None:
+    calls: list[list[str]] = []
+    release = threading.Event()
+
+    def fake_run_gh(args: list[str]) -> CommandResult:
+        calls.append(args)
+        release.wait(5)
+        return CommandResult(args=tuple(args), returncode=0, stdout='{"login": "me"}', stderr="")
+
+    monkeypatch.setattr(gh_cli, "_run_gh", fake_run_gh)
+    monkeypatch.setattr(gh_cli, "_FLIGHTS", SingleFlight())
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(gh_cli.run_gh_json, ["api", "user"]) for _ in range(4)]
+        _wait_for_shared(gh_cli._FLIGHTS, 3)
+        release.set()
+        assert [f.result() for f in futures] == [{"login": "me"}] * 4
+    assert len(calls) == 1
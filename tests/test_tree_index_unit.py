@@ -0,0 +1,95 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from lite_github_mcp.services import git_cli, tree_index
+from lite_github_mcp.services.git_cli import GitRepo, ls_tree
+from lite_github_mcp.services.tree_index import TreeIndex, TreeIndexStore, load_tree_index
+from lite_github_mcp.utils.subprocess import CommandResult, run_command
+
+
+def _commit(repo_path: Path, message: str) -> None:
+    run_command(["git", "add", "-A"], cwd=repo_path)
+    run_command(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            message,
+        ],
+        cwd=repo_path,
+    )
+
+
+def _make_repo(tmp_path: Path) -> Path:
+    repo_path = tmp_path / "repo"
+    (repo_path / "src" / "pkg").mkdir(parents=True)
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "src" / "pkg" / "a.py").write_text("a\n")
+    (repo_path / "src" / "b.py").write_text("bb\n")
+    (repo_path / "src.txt").write_text("sibling\n")
+    (repo_path / "README").write_text("readme\n")
+    _commit(repo_path, "one")
+    return repo_path
+
+
+def test_index_roundtrip_and_prefix_select(tmp_path: Path) -> None:
+    repo = GitRepo(_make_repo(tmp_path))
+    store = TreeIndexStore(tmp_path / "trees")
+    index = load_tree_index(repo, "HEAD", store=store)
+    assert index is not None
+    assert [index.paths[i] for i in index.select("src")] == ["src/b.py", "src/pkg/a.py"]
+    assert [index.paths[i] for i in index.select("src/b.py")] == ["src/b.py"]
+    assert list(index.select("missing")) == []
+
+    # A fresh store reads the compact on-disk copy back without touching git
+    reloaded = TreeIndexStore(tmp_path / "trees").get(index.tree)
+    assert reloaded == index
+
+
+def test_new_commit_derived_from_parent_via_diff_tree(tmp_path: Path, monkeypatch: Any) -> None:
+    repo_path = _make_repo(tmp_path)
+    repo = GitRepo(repo_path)
+    store = TreeIndexStore(tmp_path / "trees")
+    assert load_tree_index(repo, "HEAD", store=store) is not None
+
+    (repo_path / "README").unlink()
+    (repo_path / "src" / "b.py").write_text("changed contents\n")
+    (repo_path / "src" / "pkg" / "c.py").write_text("new\n")
+    _commit(repo_path, "two")
+
+    def no_full_listing(*_a: Any, **_k: Any) -> Any:  # noqa: ANN401
+        raise AssertionError("expected an incremental rebuild")
+
+    monkeypatch.setattr(tree_index, "ls_tree", no_full_listing)
+    derived = load_tree_index(repo, "HEAD", store=store)
+    assert derived is not None
+    expected = TreeIndex.from_items(derived.tree, ls_tree(repo, "HEAD"))
+    assert derived == expected
+
+
+def test_failed_listing_raises_and_is_not_stored(tmp_path: Path, monkeypatch: Any) -> None:
+    repo = GitRepo(_make_repo(tmp_path))
+    store = TreeIndexStore(tmp_path / "trees")
+    orig_read = git_cli._read_git
+
+    def failing_ls_tree(repo: GitRepo, args: list[str]) -> CommandResult:
+        if "ls-tree" in args:
+            return CommandResult(tuple(args), 128, "", "fatal: unable to read tree")
+        return orig_read(repo, args)
+
+    monkeypatch.setattr(git_cli, "_read_git", failing_ls_tree)
+    with pytest.raises(RuntimeError, match="unable to read tree"):
+        load_tree_index(repo, "HEAD", store=store)
+    tree = tree_index.resolve_tree(repo, "HEAD")
+    assert tree is not None and store.get(tree) is None
+
+    monkeypatch.setattr(git_cli, "_read_git", orig_read)
+    index = load_tree_index(repo, "HEAD", store=store)
+    assert index is not None and len(index) == 4
@@ -0,0 +1,114 @@
+from pathlib import Path
+from typing import Any
+
+from lite_github_mcp.services import search, trigram
+from lite_github_mcp.services.cache import CacheStore
+from lite_github_mcp.services.git_cli import GitRepo
+from lite_github_mcp.services.tree_index import resolve_tree
+from lite_github_mcp.services.trigram import TrigramIndexer, required_literals
+from lite_github_mcp.tools.router import search_files
+from lite_github_mcp.utils.subprocess import run_command
+
+
+def _commit(repo_path: Path, message: str) -> str:
+    run_command(["git", "add", "-A"], cwd=repo_path)
+    run_command(
+        [
+            "git",
+            "-c",
+            "user.name=Test",
+            "-c",
+            "user.email=test@example.com",
+            "commit",
+            "-q",
+            "-m",
+            message,
+        ],
+        cwd=repo_path,
+    )
+    return run_command(["git", "rev-parse", "HEAD"], cwd=repo_path).stdout.strip()
+
+
+def test_required_literals() -> None:
+    assert required_literals("token") == ["token"]
+    assert required_literals("def +handler\\(") == ["def ", "handler"]
+    assert required_literals("colou?r_name") == ["colo", "r_name"]
+    assert required_literals("[a-z]+_value{2}") == ["_valu"]
+    assert required_literals("foo|barbaz") is None
+    assert required_literals("a.b") is None
+
+
+def test_required_literals_drop_optional_groups() -> None:
+    assert required_literals("\\(foobar\\)\\?baz") == ["baz"]
+    assert required_literals("\\(foobar\\)*baz") == ["baz"]
+    assert required_literals("\\(foobar\\)\\{0,1\\}baz") == ["baz"]
+    assert required_literals("(abc)?x") is None
+    assert required_literals("(abc)?xyz") == ["xyz"]
+    assert required_literals("((abc)?def)*ghi") == ["ghi"]
+    assert required_literals("colou\\?r_name") == ["colo", "r_name"]
+    assert required_literals("value\\{0,2\\}xyz") == ["valu", "xyz"]
+    # A group repeated at least once is still required
+    assert required_literals("(abcd)+xyz") == ["abcd", "xyz"]
+
+
+def test_index_narrows_ref_search_without_changing_results(
+    tmp_path: Path, monkeypatch: Any
+) -> None:
+    monkeypatch.setenv("LGMCP_TRIGRAM_INDEX", "1")
+    monkeypatch.setattr(search, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    indexer = TrigramIndexer(tmp_path / "trigrams")
+    monkeypatch.setattr(trigram, "get_trigram_indexer", lambda: indexer)
+    repo_path = tmp_path / "repo"
+    (repo_path / "src").mkdir(parents=True)
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "src" / "a.py").write_text("needle = 1\n")
+    (repo_path / "src" / "b.py").write_text("haystack\n")
+    (repo_path / "c.txt").write_text("NEEDLE in caps\n")
+    (repo_path / "d.bin").write_bytes(b"\x00needle")
+    commit = _commit(repo_path, "one")
+    repo = GitRepo(repo_path)
+
+    # Not built yet: the search falls back to a full scan
+    assert trigram.candidate_paths(repo, commit, "needle", []) is None
+    tree = resolve_tree(repo, commit)
+    assert tree is not None
+    index = indexer.build(repo, tree)
+    assert index is not None
+    assert index.candidates(["needle"]) == ["c.txt", "src/a.py"]
+    assert index.candidates(["missing"]) == []
+
+    monkeypatch.setattr(indexer, "get", lambda _tree: index)
+    assert trigram.candidate_paths(repo, commit, "needle", ["src"]) == [":(literal)src/a.py"]
+    result = search_files(str(repo_path), pattern="needle", ref=commit)
+    assert [(m.path, m.line) for m in result.matches] == [("src/a.py", 1)]
+
+    def no_grep(*_a: Any, **_k: Any) -> Any:  # noqa: ANN401
+        raise AssertionError("expected the index to rule out every file")
+
+    monkeypatch.setattr(search, "grep_iter", no_grep)
+    assert search_files(str(repo_path), pattern="absent_word", ref=commit).count == 0
+
+
+def test_optional_group_does_not_rule_out_files(tmp_path: Path, monkeypatch: Any) -> None:
+    monkeypatch.setenv("LGMCP_TRIGRAM_INDEX", "1")
+    monkeypatch.setattr(search, "get_cache", lambda: CacheStore(path=tmp_path / "cache"))
+    indexer = TrigramIndexer(tmp_path / "trigrams")
+    monkeypatch.setattr(trigram, "get_trigram_indexer", lambda: indexer)
+    repo_path = tmp_path / "repo"
+    repo_path.mkdir()
+    run_command(["git", "init"], cwd=repo_path)
+    (repo_path / "only_baz.txt").write_text("baz\n")
+    (repo_path / "other.txt").write_text("nothing here\n")
+    commit = _commit(repo_path, "one")
+    repo = GitRepo(repo_path)
+    tree = resolve_tree(repo, commit)
+    assert tree is not None
+    index = indexer.build(repo, tree)
+    assert index is not None
+    monkeypatch.setattr(indexer, "get", lambda _tree: index)
+
+    assert trigram.candidate_paths(repo, commit, "\\(foobar\\)\\?baz", []) == [
+        ":(literal)only_baz.txt"
+    ]
+    result = search_files(str(repo_path), pattern="\\(foobar\\)*baz", ref=commit)
+    assert [m.path for m in result.matches] == ["only_baz.txt"]